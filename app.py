@@ -1,37 +1,88 @@
 from flask import (
     Flask, render_template, request, redirect, url_for,
-    send_file, jsonify, Response, send_from_directory
+    send_file, jsonify, Response, send_from_directory, stream_with_context
 )
-from datetime import datetime
-import os, io, csv, xlsxwriter, re
-from werkzeug.utils import secure_filename
-
-from config import UPLOAD_FOLDER, SECRET_KEY, GMAPS_API_KEY
-from db import get_conn, init_db          # ensure your db.py defines init_db()
-from modules import calendar, messaging   # calendar + email helpers
-from locations_events import locations, event_types
+from datetime import datetime, timedelta, timezone
+import os, re   # csv, tempfile and xlsxwriter are imported by the export code on first use
+
+from config import (UPLOAD_FOLDER, SECRET_KEY, GMAPS_API_KEY, MAX_UPLOAD_BYTES, MAX_REQUEST_BYTES, USE_X_SENDFILE,
+                    CONFLICT_RADIUS_M, DB_AUTO_MIGRATE)
+from db import DIALECT, copy_csv, get_conn, init_db_once, insert_id, search_filter, stream_rows, table_version
+from modules import (calendar, conflicts, ics, importer, messaging, metrics, recurrence, reservations,
+                     respcache, rules, spatial, summary, uploads, venues)
 from dotenv import load_dotenv
 load_dotenv()
 
 
 app = Flask(__name__)
+app.request_class = uploads.UploadRequest   # file parts stream straight into the upload store
 app.secret_key = SECRET_KEY
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-
-# Ensure DB table exists (SQLite or Postgres, per your db.py)
-init_db()
+app.config["MAX_UPLOAD_BYTES"] = MAX_UPLOAD_BYTES
+app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+app.config["USE_X_SENDFILE"] = USE_X_SENDFILE
+metrics.init_app(app)
+
+# Schema check: once per process (once in the master under gunicorn --preload),
+# or never at import with DB_AUTO_MIGRATE=0 and scripts/init_db.py at deploy time
+if DB_AUTO_MIGRATE:
+    init_db_once()
+    with get_conn() as _conn:
+        calendar.ensure_built(_conn)
 
 # ---------------- Helpers ----------------
 def _save(file_field: str):
-    """Save an uploaded file (if provided) into UPLOAD_FOLDER; return stored filename or None."""
+    """Store an uploaded file (if provided) content-addressed under UPLOAD_FOLDER; return its relative path or None."""
     f = request.files.get(file_field)
     if not f or not f.filename:
         return None
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-    name = secure_filename(f.filename)
-    path = os.path.join(app.config["UPLOAD_FOLDER"], name)
-    f.save(path)
-    return name
+    return uploads.store(f)
+
+def _event_filters(args, series=False):
+    """
+    WHERE clause (starting with ' AND') + params for the common event filters:
+    start/end window (ISO date or FullCalendar datetime; end exclusive),
+    status and classification (comma lists), venue text, arcgis_feature_id.
+    With series=True the query joins event_recurrences as r, and a recurring
+    booking matches if any of its occurrences can fall in the window.
+    """
+    where, params = "", []
+    start = (args.get("start") or "")[:10]
+    end = (args.get("end") or "")[:10]
+    if end:
+        where += " AND start_date < ?"
+        params.append(end)
+    if start:
+        where += " AND COALESCE(r.last_date, end_date) >= ?" if series else " AND end_date >= ?"
+        params.append(start)
+    for col in ("status", "classification"):
+        values = [v.strip() for v in (args.get(col) or "").split(",") if v.strip()]
+        if values:
+            where += f" AND {col} IN ({','.join(['?'] * len(values))})"
+            params += values
+    venue = (args.get("venue") or "").strip().lower()
+    if venue:
+        where += " AND location_key = ?"
+        params.append(venue)
+    fid = (args.get("arcgis_feature_id") or "").strip()
+    if fid:
+        where += " AND arcgis_feature_id = ?"
+        params.append(fid)
+    return where, params
+
+def _not_modified(etag, last_modified=None):
+    """Return a 304 response if the client's validators match, else None."""
+    resp = Response(status=200)
+    _set_validators(resp, etag, last_modified)
+    resp.make_conditional(request)
+    return resp if resp.status_code == 304 else None
+
+def _set_validators(resp, etag, last_modified=None):
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = datetime.strptime(last_modified, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    resp.cache_control.no_cache = True   # reuse, but revalidate every time
+    return resp
 
 def _to_iso(d, t):
     if not d:
@@ -39,86 +90,108 @@ def _to_iso(d, t):
     tt = (t or "00:00")
     return f"{d}T{tt}:00"
 
-def _overlaps(a_start, a_end, b_start, b_end):
-    """Return True if two [start, end) ranges overlap (ISO strings)."""
-    if not a_start or not a_end or not b_start or not b_end:
-        return False
-    return a_start < b_end and a_end > b_start
-
 # ---------- Classification Rules ----------
 def classify_event(form):
-    attendance = int(form.get("attendance", 0) or 0)
-    alcohol = form.get("alcohol", "No")
-    high_risk = form.get("high_risk", "No")
-    traffic = form.get("traffic_mgmt", "No")
-    vehicle_access = form.get("vehicle_access", "No")
-    amplified = form.get("amplified_sound", "No")
-    noise_level = int(form.get("noise_level", 0) or 0)
-    total_days = int(form.get("total_days", 0) or 0)
-
-    classification = "Self-assessable"
-    if attendance >= 200: classification = "Assessable"
-    if alcohol == "Yes": classification = "Assessable"
-    if high_risk == "Yes": classification = "Assessable"
-    if traffic == "Yes": classification = "Assessable"
-    if vehicle_access == "Yes": classification = "Assessable"
-    if amplified == "Yes" and noise_level > 95: classification = "Assessable"
-    if total_days > 2: classification = "Assessable"
-    return classification
+    """Self-assessable / Assessable, per the shared rule table in modules/rules.py."""
+    return rules.classify(form)
 
 # ---------- Conflict check ----------
-def has_conflict(form):
+def has_conflict(form, radius_m=None):
     """Detect conflicts with APPROVED events at same place & overlapping time."""
+    return bool(conflicting_ids(form, radius_m))
+
+def conflicting_ids(form, radius_m=None):
+    """
+    IDs of APPROVED events at the same place (ArcGIS feature id or normalized
+    location text) & overlapping time. With a radius (default CONFLICT_RADIUS_M)
+    and the form's latitude/longitude, events that close by count as well.
+    """
+    # the index only re-reads the table when another worker has written to it
+    with get_conn() as conn:
+        conflicts.INDEX.sync(conn)
+        return _conflicting_ids(conn, form, radius_m)
+
+def _conflicting_ids(conn, form, radius_m=None):
+    keys, windows = _conflict_windows(form)
+    ids = set()
+    for start, end in windows:
+        ids.update(conflicts.INDEX.overlapping(keys, start, end))
+    radius_m = CONFLICT_RADIUS_M if radius_m is None else radius_m
+    p = spatial.point(form.get("latitude"), form.get("longitude"))
+    if radius_m > 0 and p and windows:
+        # one radius query over the whole series, then per-occurrence overlap
+        for h in spatial.nearby(conn, *p, radius_m, windows[0][0], windows[-1][1]):
+            if any(h["start"] < end and h["end"] > start for start, end in windows):
+                ids.add(h["id"])
+    metrics.CONFLICT_CHECKS.inc(result="conflict" if ids else "clear")
+    return sorted(ids)
+
+def _conflict_windows(form):
+    """
+    Normalize a booking request into (venue keys, [(start ISO, end ISO), ...]):
+    one window, or one per occurrence if the form repeats (rrule/rdates).
+    ValueError if the repeat rule is malformed.
+    """
     start_date = form.get("start_date")
     end_date   = form.get("end_date") or start_date
     start_time = form.get("start_time") or "00:00"
     end_time   = form.get("end_time") or "23:59"
 
-    new_start = _to_iso(start_date, start_time)
-    new_end   = _to_iso(end_date,   end_time)
-
-    # Prefer exact ArcGIS feature id match if provided, else normalized location text
-    fid = (form.get("arcgis_feature_id") or "").strip()
-    loc = (form.get("location") or "").strip().lower()
+    keys = conflicts.venue_keys(form.get("arcgis_feature_id"), form.get("location"))
+    rec = recurrence.Recurrence.from_form(form)
+    spans = rec.spans() if rec else [(start_date, end_date)]
+    windows = [(_to_iso(d0, start_time), _to_iso(d1, end_time)) for d0, d1 in spans]
+    return keys, [(start, end) for start, end in windows if start and end]
 
-    sql = """
-      SELECT start_date, end_date, start_time, end_time, location, arcgis_feature_id
-      FROM events
-      WHERE status='Approved'
-        AND (
-              (arcgis_feature_id IS NOT NULL AND arcgis_feature_id <> '' AND arcgis_feature_id = ?)
-           OR (LOWER(COALESCE(location,'')) = ?)
-        )
-        AND (
-              date(?) <= date(end_date) AND date(?) >= date(start_date)
-        )
-    """
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, (fid, loc, start_date, end_date))
-        rows = cur.fetchall()
+def _conflict_form(data):
+    """Map an API payload (venue or location, optional arcgis_feature_id) to has_conflict's form shape."""
+    return {
+        "start_date": data.get("start_date"),
+        "end_date": data.get("end_date") or data.get("start_date"),
+        "start_time": data.get("start_time") or "00:00",
+        "end_time": data.get("end_time") or "23:59",
+        "arcgis_feature_id": data.get("arcgis_feature_id") or "",
+        "location": data.get("location") or data.get("venue") or "",
+        "latitude": data.get("latitude"),
+        "longitude": data.get("longitude"),
+        "rrule": data.get("rrule") or "",
+        "rdates": data.get("rdates") or "",
+        "exdates": data.get("exdates") or "",
+        "repeat_until": data.get("repeat_until") or "",
+    }
 
-    # refine via time overlap
-    for r in rows:
-        r_start = _to_iso(r["start_date"], r["start_time"])
-        r_end   = _to_iso(r["end_date"],   r["end_time"])
-        if _overlaps(new_start, new_end, r_start, r_end):
-            return True
-    return False
+def _radius(value):
+    """Optional radius_m from a request; None (use the default) if absent or invalid."""
+    try:
+        return max(0.0, min(float(value), MAX_NEARBY_RADIUS_M))
+    except (TypeError, ValueError):
+        return None
 
 # ---------- Routes ----------
+# The form page and the catalogue only change with a deploy: rendered and
+# compressed once per worker, then served with strong ETags (see respcache)
 @app.route("/")
 def index():
-    return render_template(
+    return respcache.cached(("index", request.script_root), lambda: render_template(
         "index.html",
         gmaps_api_key=GMAPS_API_KEY,
-        locations=locations,
-        event_types=event_types,
-    )
+        event_types=venues.event_types(),
+    ), "text/html")
 
 @app.route("/api/locations")
 def api_locations():
-    return jsonify({"locations": locations, "event_types": event_types})
+    return respcache.cached("locations", lambda: app.json.dumps(
+        {"locations": venues.locations(), "event_types": venues.event_types()}), "application/json")
+
+@app.route("/api/venues/search")
+def api_venue_search():
+    """Typeahead: top-k venues for ?q= (name words, suburb or beach-access code prefixes)."""
+    q = request.args.get("q", "")
+    try:
+        limit = max(1, min(int(request.args.get("limit", 10)), 50))
+    except ValueError:
+        limit = 10
+    return jsonify({"venues": venues.search(q, limit)})
 
 @app.route("/submit", methods=["POST"])
 def submit():
@@ -130,16 +203,23 @@ def submit():
     form["applicant_phone"] = form.get("contact_phone", "")
     form["location"]        = form.get("venue", "")
 
-    # file uploads
+    # repeats: the row is the first occurrence, the rule goes in event_recurrences
+    try:
+        rec = recurrence.Recurrence.from_form(form)
+    except ValueError as e:
+        return str(e), 400
+
+    # file uploads, once the request is known to be acceptable (an unreferenced
+    # file is left for scripts/gc_uploads.py if the insert still fails)
     insurance_file = _save("insurance_doc")
     site_map       = _save("site_map")
     other_files    = _save("other_docs")
+    if rec:
+        form["total_days"] = rec.total_days()
+    # server-derived only: whatever the request sent under this name is overwritten
+    form["series_tag"] = rules.series_tag(rec)
 
-    # classification + conflict
     classification = classify_event(form)
-    conflict = has_conflict(form)
-    status = "Approved" if (classification == "Self-assessable" and not conflict) else "Pending"
-
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     # insert
@@ -178,47 +258,48 @@ def submit():
         request.form.get("arcgis_feature_id") or None,
         request.form.get("arcgis_feature_name") or None,
         request.form.get("arcgis_layer") or None,
-        classification, status, now
     )
     placeholders = ",".join(["?"] * len(cols))
     sql = f"INSERT INTO events ({','.join(cols)}) VALUES ({placeholders})"
 
+    keys, _ = _conflict_windows(form)
+    locks = reservations.lock_keys(keys, spatial.point(form.get("latitude"), form.get("longitude")),
+                                   CONFLICT_RADIUS_M)
     with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, vals)
-        conn.commit()
-        new_id = cur.lastrowid
+        conflicts.INDEX.sync(conn)   # catch up before taking the lock, so the sync under it is cheap
+        # conflict check + insert under the venue locks: no double auto-approval
+        reservations.begin(conn, locks)
+        try:
+            conflicts.INDEX.sync(conn)
+            conflict = bool(_conflicting_ids(conn, form))
+            status = "Approved" if (classification == "Self-assessable" and not conflict) else "Pending"
+            new_id = insert_id(conn.cursor(), sql, vals + (classification, status, now))
+            if rec:
+                recurrence.save(conn, new_id, rec)
+            calendar.refresh(conn, [new_id])
+            # the receipt is queued with the booking: both exist or neither does
+            messaging.enqueue_many(conn, [(form.get("applicant_email") or "",) + messaging.submission_receipt_message(
+                event_name=form.get("event_name") or "",
+                applicant_name=form.get("applicant_name") or "",
+                start_date=form.get("start_date") or "",
+                start_time=form.get("start_time") or "",
+                end_date=form.get("end_date") or form.get("start_date") or "",
+                end_time=form.get("end_time") or "",
+                venue=form.get("location") or form.get("venue") or "",
+                classification=classification,
+                conflict=bool(conflict),
+            )])
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        conflicts.INDEX.refresh(conn, new_id)
 
-    # email receipt (best-effort)
     try:
-        messaging.send_submission_receipt(
-            to_addr=form.get("applicant_email") or "",
-            event_name=form.get("event_name") or "",
-            applicant_name=form.get("applicant_name") or "",
-            start_date=form.get("start_date") or "",
-            start_time=form.get("start_time") or "",
-            end_date=form.get("end_date") or form.get("start_date") or "",
-            end_time=form.get("end_time") or "",
-            venue=form.get("location") or form.get("venue") or "",
-            classification=classification,
-            conflict=bool(conflict),
-        )
+        messaging.wake_sender()
     except Exception as e:
         print("Email send (receipt) failed:", e)
 
-    # auto-reserve calendar if self-assessable & no conflict
-    if classification == "Self-assessable" and not conflict:
-        try:
-            calendar.reserve(
-                title=form.get("event_name"),
-                date_str=form.get("start_date"),
-                start_time=form.get("start_time"),
-                finish_time=form.get("end_time"),
-                auto=True
-            )
-        except Exception as e:
-            print("Calendar reserve failed:", e)
-
     return redirect(url_for(
         "success",
         classification=classification,
@@ -230,19 +311,81 @@ def submit():
 @app.route("/api/check_conflict", methods=["POST"])
 def api_check_conflict():
     data = request.get_json(force=True)
-    form = {
-        "start_date": data.get("start_date"),
-        "end_date": data.get("end_date") or data.get("start_date"),
-        "start_time": data.get("start_time") or "00:00",
-        "end_time": data.get("end_time") or "23:59",
-        "arcgis_feature_id": data.get("arcgis_feature_id") or "",
-        "location": data.get("location") or data.get("venue") or "",
-    }
-    return jsonify({"conflict": has_conflict(form)})
+    try:
+        return jsonify({"conflict": has_conflict(_conflict_form(data), _radius(data.get("radius_m")))})
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+MAX_AVAILABILITY_SLOTS = 500
+
+@app.route("/api/check_availability", methods=["POST"])
+def api_check_availability():
+    """
+    Batch form of /api/check_conflict for series bookings:
+    {"slots": [{venue|location|arcgis_feature_id, start_date, end_date, start_time, end_time}, ...]}
+    (a slot may itself repeat, with rrule/rdates/exdates/repeat_until)
+    → {"results": [{"conflict": bool, "conflicting_ids": [...]}, ...]} in slot order.
+    """
+    data = request.get_json(force=True) or {}
+    slots = data.get("slots")
+    if not isinstance(slots, list) or not all(isinstance(s, dict) for s in slots):
+        return jsonify({"ok": False, "error": "slots must be a list of objects"}), 400
+    if len(slots) > MAX_AVAILABILITY_SLOTS:
+        return jsonify({"ok": False, "error": f"At most {MAX_AVAILABILITY_SLOTS} slots per request"}), 400
+
+    radius_m = _radius(data.get("radius_m"))
+    results = []
+    with get_conn() as conn:
+        conflicts.INDEX.sync(conn)
+        for n, slot in enumerate(slots):
+            try:
+                ids = _conflicting_ids(conn, _conflict_form(slot), radius_m)
+            except ValueError as e:
+                return jsonify({"ok": False, "error": f"slot {n + 1}: {e}"}), 400
+            results.append({"conflict": bool(ids), "conflicting_ids": ids})
+    return jsonify({"results": results})
+
+MAX_NEARBY_RADIUS_M = 50000
+
+@app.route("/api/events/nearby")
+def api_events_nearby():
+    """
+    Events within ?radius_m= (default 200) of ?lat=&lon=, nearest first,
+    optionally overlapping ?start=&end= (dates or ISO datetimes).
+    ?status= is a comma list (default Approved).
+    """
+    p = spatial.point(request.args.get("lat"), request.args.get("lon"))
+    if not p:
+        return jsonify({"ok": False, "error": "lat and lon are required"}), 400
+    radius_m = _radius(request.args.get("radius_m", 200))
+    if radius_m is None:
+        return jsonify({"ok": False, "error": "radius_m must be a number"}), 400
+    start = _to_iso(*_split_iso(request.args.get("start")))
+    end = _to_iso(*_split_iso(request.args.get("end"), "23:59"))
+    statuses = [s.strip() for s in request.args.get("status", "Approved").split(",") if s.strip()]
+    with get_conn() as conn:
+        hits = spatial.nearby(conn, *p, radius_m, start, end, statuses, limit=500)
+    return jsonify({"events": hits})
+
+def _split_iso(value, default_time=None):
+    """'2025-01-01' or '2025-01-01T09:30[:00]' -> (date, time)."""
+    value = (value or "").strip()
+    return value[:10], (value[11:16] or default_time)
 
 @app.route("/uploads/<path:filename>")
 def uploaded_file(filename):
-    return send_from_directory(app.config["UPLOAD_FOLDER"], filename, as_attachment=False)
+    """Serve an upload with Range/conditional support (sendfile via the server's file wrapper)."""
+    if uploads.is_content_addressed(filename):
+        # content-addressed names never change meaning: cache for a year
+        return send_from_directory(app.config["UPLOAD_FOLDER"], filename, as_attachment=False,
+                                   download_name=uploads.original_name(filename) or None,
+                                   conditional=True, max_age=31536000)
+    return send_from_directory(app.config["UPLOAD_FOLDER"], filename, as_attachment=False, conditional=True)
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape target (summed over all workers when METRICS_DIR is set)."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/success")
 def success():
@@ -251,16 +394,19 @@ def success():
         conflict=request.args.get("conflict","0")
     )
 
+ADMIN_PAGE_SIZE = 50
+ADMIN_COLUMNS = ("id, applicant_name, event_type, start_date, location, status, classification, "
+                 "insurance_file, site_map, created_at")
+
 @app.route("/admin")
 def admin():
+    """Dashboard list, newest first, one keyset page (?after=<created_at>|<id>) at a time."""
     q = request.args.get("q", "").strip()
     status = request.args.get("status", "").strip()
+    after = request.args.get("after", "").strip()
 
-    query = "SELECT * FROM events WHERE 1=1"
+    query = f"SELECT {ADMIN_COLUMNS} FROM events WHERE 1=1"
     params = []
-    if q:
-        query += " AND (applicant_name LIKE ? OR event_type LIKE ? OR event_name LIKE ?)"
-        params += [f"%{q}%", f"%{q}%", f"%{q}%"]
     if status:
         if status in ("Self-assessable", "Assessable"):
             query += " AND classification = ?"
@@ -268,60 +414,154 @@ def admin():
         elif status in ("Pending", "Approved", "Rejected", "Cancelled"):
             query += " AND status = ?"
             params.append(status)
-    query += " ORDER BY created_at DESC"
+    if "|" in after:
+        created_at, _, last_id = after.rpartition("|")
+        if last_id.isdigit():
+            query += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+            params += [created_at, created_at, int(last_id)]
 
     with get_conn() as conn:
+        where, search_params = search_filter(conn, q)
+        query += where + " ORDER BY created_at DESC, id DESC LIMIT ?"
         cur = conn.cursor()
-        cur.execute(query, params)
+        cur.execute(query, params + search_params + [ADMIN_PAGE_SIZE + 1])
         applications = cur.fetchall()
+        # header strip: bookings starting this week, from the counters
+        monday = summary.week_start().isoformat()
+        week_totals = summary.totals(summary.groups(conn, monday, monday))
+
+    next_after = None
+    if len(applications) > ADMIN_PAGE_SIZE:
+        applications = applications[:ADMIN_PAGE_SIZE]
+        last = applications[-1]
+        next_after = f"{last['created_at']}|{last['id']}"
 
-    return render_template("admin.html", applications=applications)
+    return render_template("admin.html", applications=applications, next_after=next_after,
+                           week_totals=week_totals, week_start=monday)
+
+@app.route("/api/admin/summary")
+def api_admin_summary():
+    """
+    Booking counts by ISO week (of the start date), status, classification,
+    event type and venue, read from the trigger-maintained counters:
+    ?week=<any day in the first week, default today>&weeks=<n, default 1>,
+    narrowed by ?status=, ?classification=, ?event_type=, ?venue=.
+    """
+    try:
+        first = summary.week_start(request.args.get("week") or None)
+        weeks = int(request.args.get("weeks") or 1)
+    except ValueError:
+        return jsonify({"ok": False, "error": "week must be YYYY-MM-DD and weeks a whole number"}), 400
+    if not 1 <= weeks <= summary.MAX_SUMMARY_WEEKS:
+        return jsonify({"ok": False, "error": f"weeks must be 1-{summary.MAX_SUMMARY_WEEKS}"}), 400
+    last = first + timedelta(weeks=weeks - 1)
+    venue = request.args.get("venue")
+    with get_conn() as conn:
+        rows = summary.groups(conn, first.isoformat(), last.isoformat(),
+                              status=request.args.get("status"),
+                              classification=request.args.get("classification"),
+                              event_type=request.args.get("event_type"),
+                              venue_key=calendar.venue_key(venue) if venue else None)
+    return jsonify({
+        "weeks": [{"week": summary.week_label(d.isoformat()), "start": d.isoformat()}
+                  for d in (first + timedelta(weeks=i) for i in range(weeks))],
+        "totals": summary.totals(rows),
+        "groups": [dict(r, week_label=summary.week_label(r["week"])) for r in rows],
+    })
+
+# Export columns, in the baseline events.db order; listed explicitly so derived
+# columns (location_key, Postgres' search_tsv and geog) never leak into exports.
+EXPORT_COLUMNS = (
+    "id", "event_type", "applicant_name", "applicant_email", "applicant_phone", "event_name",
+    "location", "start_date", "end_date", "attendance", "alcohol", "high_risk", "traffic_mgmt",
+    "vehicle_access", "amplified_sound", "noise_level", "total_days", "notes", "classification",
+    "status", "created_at", "start_time", "end_time", "insurance_file", "site_map", "other_files",
+    "latitude", "longitude", "arcgis_feature_id", "arcgis_feature_name", "arcgis_layer",
+)
 
 @app.route("/export/<format>")
 def export_data(format):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM events ORDER BY created_at DESC")
-        rows = cur.fetchall()
+    """Stream all events (narrowed by ?start=&end=&status=&classification=) as CSV or XLSX."""
+    where, params = _event_filters(request.args)
+    sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM events WHERE 1=1{where} ORDER BY created_at DESC"
 
     if format == "csv":
-        si = io.StringIO()
-        cw = csv.writer(si)
-        cw.writerow(list(rows[0].keys()) if rows else [])
-        for r in rows:
-            cw.writerow([r[k] for k in r.keys()])
-        return Response(si.getvalue(), mimetype="text/csv",
+        # Postgres writes the CSV itself (COPY ... TO STDOUT)
+        chunks = copy_csv(sql, params) if DIALECT == "postgres" else _csv_chunks(stream_rows(sql, params))
+        return Response(stream_with_context(chunks), mimetype="text/csv",
                         headers={"Content-Disposition":"attachment;filename=events.csv"})
 
     if format == "xlsx":
-        output = io.BytesIO()
-        wb = xlsxwriter.Workbook(output, {"in_memory": True})
-        ws = wb.add_worksheet("Events")
-        if rows:
-            for c, key in enumerate(rows[0].keys()):
-                ws.write(0, c, key)
-        for r_i, r in enumerate(rows, start=1):
-            for c, key in enumerate(r.keys()):
-                ws.write(r_i, c, r[key])
-        wb.close()
-        output.seek(0)
-        return send_file(output, as_attachment=True,
+        import tempfile, xlsxwriter
+        # constant_memory flushes each row to the temp file as soon as the next one starts
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+            ws = wb.add_worksheet("Events")
+            for r_i, r in enumerate(stream_rows(sql, params)):
+                ws.write_row(r_i, 0, r)
+            wb.close()
+            f = open(path, "rb")
+        finally:
+            _remove_quietly(path)   # POSIX: the open handle keeps the data until the response closes
+        return send_file(f, as_attachment=True,
                          download_name="events.xlsx",
                          mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
 
     return "Unsupported format", 400
 
+class _Echo:
+    """File-like object whose write() hands the CSV line back to the caller."""
+    def write(self, value):
+        return value
+
+def _csv_chunks(rows, lines_per_chunk=500):
+    import csv
+    cw = csv.writer(_Echo())
+    chunk = []
+    for r in rows:
+        chunk.append(cw.writerow(r))
+        if len(chunk) >= lines_per_chunk:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 @app.route("/api/events")
 def api_events():
+    """
+    FullCalendar feed for the visible range (?start=&end=), optionally
+    narrowed by ?status=, ?venue= or ?arcgis_feature_id=. Recurring bookings
+    are expanded to their occurrences in the range (sharing a groupId).
+    Answers 304 while the events table is unchanged.
+    """
+    where, params = _event_filters(request.args, series=True)
     with get_conn() as conn:
+        version, updated_at = table_version(conn)
+        etag = f"events-{version}"
+        cached = _not_modified(etag, updated_at)
+        if cached:
+            return cached
         cur = conn.cursor()
-        cur.execute("""
+        cur.execute(f"""
             SELECT id, event_name, start_date, end_date, start_time, end_time,
-                   classification, status, location
-            FROM events
+                   classification, status, location, {recurrence.COLUMNS}
+            FROM events LEFT JOIN event_recurrences r ON r.event_id = events.id
+            WHERE 1=1{where}
             ORDER BY start_date ASC, start_time ASC
-        """)
+        """, params)
         rows = cur.fetchall()
+    first = request.args.get("start") or None
+    end = request.args.get("end")
+    # the window's end is exclusive; spans() takes the last day touched
+    last = (datetime.strptime(end[:10], "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d") if end else None
 
     def to_iso(d, t):
         if not d: return None
@@ -335,46 +575,218 @@ def api_events():
     }
 
     # Title shows "Event – Location"
-    events = [{
-        "id": r["id"],
-        "title": f"{r['event_name']} – {r['location'] or ''}".strip(),
-        "start": to_iso(r["start_date"], r["start_time"]),
-        "end":   to_iso(r["end_date"],   r["end_time"]),
-        "extendedProps": {
-            "classification": r["classification"],
-            "status": r["status"],
-            "location": r["location"]
-        },
-        "className": status_class.get(r["status"], "fc-pending")
-    } for r in rows]
-
-    return jsonify(events)
+    events = []
+    for r in rows:
+        repeats = r["occurrences"] is not None
+        for start_date, end_date in recurrence.spans(r, first, last):
+            ev = {
+                "id": r["id"],
+                "title": f"{r['event_name']} – {r['location'] or ''}".strip(),
+                "start": to_iso(start_date, r["start_time"]),
+                "end":   to_iso(end_date,   r["end_time"]),
+                "extendedProps": {
+                    "classification": r["classification"],
+                    "status": r["status"],
+                    "location": r["location"],
+                    "recurring": repeats,
+                },
+                "className": status_class.get(r["status"], "fc-pending")
+            }
+            if repeats:
+                ev["groupId"] = str(r["id"])
+            events.append(ev)
+    events.sort(key=lambda e: e["start"] or "")
+
+    return _set_validators(jsonify(events), etag, updated_at)
 
 @app.route("/calendar")
 def calendar_view():
     return render_template("calendar.html")
 
-@app.route("/admin/event/<int:event_id>/<action>")
-def update_event_status(event_id, action):
-    new_status = None
-    if action == "approve": new_status = "Approved"
-    if action == "reject":  new_status = "Rejected"
-    if not new_status:
-        return "Invalid action", 400
+@app.route("/calendar.ics")
+def calendar_ics():
+    """Subscribable iCalendar feed of every Approved booking (see modules/ics.py)."""
+    return _ics_response(None, "Sunshine Coast Council – approved bookings")
 
+@app.route("/venues/<path:key>/calendar.ics")
+def venue_calendar_ics(key):
+    """The same feed for one venue; `key` is the venue name (case and outer spaces ignored)."""
+    venue_key = calendar.venue_key(key)
+    label = next((venues.display_name(n) for n in venues.locations() if calendar.venue_key(n) == venue_key), None)
+    return _ics_response(venue_key, f"{label or key.strip()} – approved bookings", known=label is not None)
+
+def _ics_response(venue_key, name, known=True):
+    # polls cost one table_versions read while nothing changed (304, or the memoised feed)
     with get_conn() as conn:
-        cur = conn.cursor()
-        # fetch row first
-        cur.execute("SELECT * FROM events WHERE id=?", (event_id,))
-        row = cur.fetchone()
-        if not row:
-            return "Not found", 404
-
-        # update
-        cur.execute("UPDATE events SET status=? WHERE id=?", (new_status, event_id))
-        conn.commit()
+        version, _ = table_version(conn)
+        tag = f"ics-{version}-{ics.window_start()}"
+        cached = _not_modified(tag)
+        if cached:
+            return cached
+        body, count = ics.cached_feed(conn, venue_key, tag, name)
+    if not known and not count:
+        return "Unknown venue", 404
+    resp = Response(body, mimetype="text/calendar")
+    resp.headers["Content-Disposition"] = "inline; filename=calendar.ics"
+    return _set_validators(resp, tag)
+
+MAX_HEATMAP_DAYS = 370
+
+@app.route("/api/occupancy/heatmap")
+def api_occupancy_heatmap():
+    """
+    Venue × day utilisation for ?start=&end= (end exclusive, at most
+    MAX_HEATMAP_DAYS), optionally only ?venue= (comma list of venue names).
+    Only venue/days with bookings are listed. Answers 304 while events are unchanged.
+    """
+    try:
+        start = datetime.strptime((request.args.get("start") or "")[:10], "%Y-%m-%d").date()
+        end = datetime.strptime((request.args.get("end") or "")[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"ok": False, "error": "start and end must be YYYY-MM-DD"}), 400
+    if not start < end <= start + timedelta(days=MAX_HEATMAP_DAYS):
+        return jsonify({"ok": False, "error": f"end must be after start and at most {MAX_HEATMAP_DAYS} days later"}), 400
+    keys = [calendar.venue_key(v) for v in (request.args.get("venue") or "").split(",") if v.strip()]
 
-    # email after commit
+    with get_conn() as conn:
+        version, updated_at = table_version(conn)
+        etag = f"occupancy-{version}"
+        cached = _not_modified(etag, updated_at)
+        if cached:
+            return cached
+        cells = calendar.heatmap(conn, start.isoformat(), end.isoformat(), keys)
+    resp = jsonify({"start": start.isoformat(), "end": end.isoformat(),
+                    "slot_minutes": calendar.SLOT_MINUTES, "cells": cells})
+    return _set_validators(resp, etag, updated_at)
+
+@app.route("/api/occupancy/slots")
+def api_occupancy_slots():
+    """
+    One venue's 15-minute slot map for ?date= (or ?date=&end_date=). With
+    ?start_time=&end_time= also answers whether that window is free of
+    Approved bookings (and of Pending ones too with ?include_pending=1).
+    """
+    venue = (request.args.get("venue") or "").strip()
+    day = (request.args.get("date") or "")[:10]
+    end_day = (request.args.get("end_date") or day)[:10]
+    if not venue or not calendar.booking_masks(day, end_day, None, None):
+        return jsonify({"ok": False, "error": "venue and date (YYYY-MM-DD) are required"}), 400
+    if end_day > (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=MAX_HEATMAP_DAYS)).strftime("%Y-%m-%d"):
+        return jsonify({"ok": False, "error": f"At most {MAX_HEATMAP_DAYS} days per request"}), 400
+    start_time = request.args.get("start_time")
+    end_time = request.args.get("end_time")
+
+    with get_conn() as conn:
+        maps = calendar.day_maps(conn, venue, day, end_day)
+        out = {"venue": venue, "slot_minutes": calendar.SLOT_MINUTES, "days": {
+            d: {"approved": calendar.slot_string(a), "pending": calendar.slot_string(p)}
+            for d, (a, p) in sorted(maps.items())}}
+        if start_time or end_time:
+            out["free"] = calendar.is_free(conn, venue, day, start_time, end_time, end_day,
+                                           include_pending=request.args.get("include_pending") == "1")
+    return jsonify(out)
+
+# target status -> statuses it may be reached from
+STATUS_TRANSITIONS = {
+    "Approved": ("Pending",),
+    "Rejected": ("Pending",),
+    "Pending": ("Approved", "Rejected"),
+    "Cancelled": ("Pending", "Approved"),
+}
+MAX_BULK_IDS = 1000
+
+_STATUS_SELECT = f"""
+  SELECT e.id, e.status, e.applicant_email, e.event_name, e.location, e.arcgis_feature_id,
+         e.latitude, e.longitude, e.start_date, e.end_date, e.start_time, e.end_time, {recurrence.COLUMNS}
+  FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id
+"""
+
+def _change_status(conn, ids, new_status):
+    """
+    Open a write transaction and move every event in `ids` whose status may
+    reach new_status (STATUS_TRANSITIONS) to it. Approvals run under the same
+    venue locks as /submit, and a booking that would overlap an Approved one
+    (or one approved earlier in this call) is left as it is. Returns
+    (updated rows, [{"id", "status", "error"}, ...]); the caller commits.
+    """
+    sources = STATUS_TRANSITIONS[new_status]
+    marks = ",".join(["?"] * len(ids))
+    cur = conn.cursor()
+    if new_status != "Approved":
+        reservations.begin(conn, [])
+        cur.execute(f"""
+            UPDATE events SET status = ?
+            WHERE id IN ({marks}) AND status IN ({','.join(['?'] * len(sources))})
+            RETURNING id, applicant_email, event_name, start_date, end_date, start_time, end_time, location
+        """, [new_status] + list(ids) + list(sources))
+        rows = cur.fetchall()
+        done = {r["id"] for r in rows}
+        rest = [i for i in ids if i not in done]
+        current = {}
+        if rest:
+            cur.execute(f"SELECT id, status FROM events WHERE id IN ({','.join(['?'] * len(rest))})", rest)
+            current = {r["id"]: r["status"] for r in cur.fetchall()}
+        return sorted(rows, key=lambda r: r["id"]), [_status_error(i, current.get(i), new_status) for i in rest]
+
+    # approvals: lock every candidate's venue (and nearby cells), then re-read under the locks
+    conflicts.INDEX.sync(conn)
+    cur.execute(_STATUS_SELECT + f" WHERE e.id IN ({marks})", list(ids))
+    locks = set()
+    for row in cur.fetchall():
+        if row["status"] in sources:
+            locks.update(reservations.lock_keys(conflicts.venue_keys(row["arcgis_feature_id"], row["location"]),
+                                                spatial.point(row["latitude"], row["longitude"]), CONFLICT_RADIUS_M))
+    reservations.begin(conn, sorted(locks))
+    conflicts.INDEX.sync(conn)
+    cur.execute(_STATUS_SELECT + f" WHERE e.id IN ({marks})", list(ids))
+    found = {r["id"]: r for r in cur.fetchall()}
+
+    rows, skipped = [], []
+    approved = {}   # venue key -> [(start, end, id)] approved so far in this call (not yet in the index)
+    for i in ids:
+        row = found.get(i)
+        if row is None or row["status"] not in sources:
+            skipped.append(_status_error(i, row and row["status"], new_status))
+            continue
+        form = _conflict_form(dict(row))
+        try:
+            keys, windows = _conflict_windows(form)
+        except ValueError:
+            keys, windows = _conflict_windows(dict(form, rrule="", rdates="", exdates=""))
+        # the radius part reads events, so it sees approvals made earlier in this transaction
+        clash = set(_conflicting_ids(conn, form)) - {i}
+        clash.update(j for key in keys for s, e, j in approved.get(key, ())
+                     if any(s < end and e > start for start, end in windows))
+        if clash:
+            skipped.append({"id": i, "status": row["status"],
+                            "error": "Conflicts with approved booking(s) " + ", ".join(map(str, sorted(clash)))})
+            continue
+        cur.execute("UPDATE events SET status = ? WHERE id = ?", (new_status, i))
+        for key in keys:
+            approved.setdefault(key, []).extend((start, end, i) for start, end in windows)
+        rows.append(row)
+    return rows, skipped
+
+def _status_error(event_id, status, new_status):
+    return {"id": event_id, "status": status,
+            "error": "Not found" if status is None else f"Cannot change {status} to {new_status}"}
+
+def _set_one_status(event_id, new_status):
+    """Single-event form of _change_status: (row, None) on success, else (None, skip entry)."""
+    with get_conn() as conn:
+        try:
+            rows, skipped = _change_status(conn, [event_id], new_status)
+            if rows:
+                calendar.refresh(conn, [event_id])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if rows:
+            conflicts.INDEX.refresh(conn, event_id)
+    return (rows[0], None) if rows else (None, skipped[0])
+
+def _notify_status(row, new_status):
     try:
         messaging.send_status_update(
             to_addr=row["applicant_email"] or "",
@@ -390,40 +802,89 @@ def update_event_status(event_id, action):
     except Exception as e:
         print("Email send (status update) failed:", e)
 
+@app.route("/admin/event/<int:event_id>/<action>")
+def update_event_status(event_id, action):
+    new_status = None
+    if action == "approve": new_status = "Approved"
+    if action == "reject":  new_status = "Rejected"
+    if not new_status:
+        return "Invalid action", 400
+
+    row, skipped = _set_one_status(event_id, new_status)
+    if not row:
+        return skipped["error"], 404 if skipped["status"] is None else 400
+
+    # email after commit
+    _notify_status(row, new_status)
     return redirect(url_for("admin"))
 
 @app.route("/api/event/<int:event_id>/status", methods=["POST"])
 def api_update_status(event_id):
     data = request.get_json(silent=True) or {}
     new_status = data.get("status")
-    if new_status not in ("Approved", "Pending", "Rejected", "Cancelled"):
+    if new_status not in STATUS_TRANSITIONS:
         return jsonify({"ok": False, "error": "Invalid status"}), 400
 
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM events WHERE id=?", (event_id,))
-        row = cur.fetchone()
-        if not row:
-            return jsonify({"ok": False, "error": "Not found"}), 404
-        cur.execute("UPDATE events SET status=? WHERE id=?", (new_status, event_id))
-        conn.commit()
+    row, skipped = _set_one_status(event_id, new_status)
+    if not row:
+        return jsonify({"ok": False, "error": skipped["error"]}), 404 if skipped["status"] is None else 400
 
+    _notify_status(row, new_status)
+    return jsonify({"ok": True})
+
+@app.route("/api/events/status", methods=["POST"])
+def api_bulk_status():
+    """
+    {"ids": [...], "status": "...", "reason": "..."} -> every id whose current
+    status may move to `status` is updated in one transaction (approvals are
+    conflict-checked under the venue locks, as on /submit); the rest are
+    reported in "skipped". Notification emails are queued in the same
+    transaction and sent by the outbox worker.
+    """
+    data = request.get_json(silent=True) or {}
+    new_status = data.get("status")
+    if new_status not in STATUS_TRANSITIONS:
+        return jsonify({"ok": False, "error": "Invalid status"}), 400
     try:
-        messaging.send_status_update(
-            to_addr=row["applicant_email"] or "",
-            event_name=row["event_name"] or "",
-            new_status=new_status,
-            start_date=row["start_date"] or "",
-            start_time=row["start_time"] or "",
-            end_date=row["end_date"] or row["start_date"] or "",
-            end_time=row["end_time"] or "",
-            venue=row["location"] or "",
-            reason=None
-        )
-    except Exception as e:
-        print("Email send (status update) failed:", e)
+        ids = sorted({int(i) for i in data.get("ids") or ()})
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "error": "ids must be a list of event ids"}), 400
+    if not ids:
+        return jsonify({"ok": False, "error": "No events selected"}), 400
+    if len(ids) > MAX_BULK_IDS:
+        return jsonify({"ok": False, "error": f"At most {MAX_BULK_IDS} events per request"}), 400
+    reason = (data.get("reason") or "").strip() or None
 
-    return jsonify({"ok": True})
+    with get_conn() as conn:
+        try:
+            rows, skipped = _change_status(conn, ids, new_status)
+            updated = [r["id"] for r in rows]
+            if updated:
+                calendar.refresh(conn, updated)
+                messaging.enqueue_many(conn, [
+                    (r["applicant_email"] or "",) + messaging.status_update_message(
+                        event_name=r["event_name"] or "",
+                        new_status=new_status,
+                        start_date=r["start_date"] or "",
+                        start_time=r["start_time"] or "",
+                        end_date=r["end_date"] or r["start_date"] or "",
+                        end_time=r["end_time"] or "",
+                        venue=r["location"] or "",
+                        reason=reason)
+                    for r in rows])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if updated:
+            conflicts.INDEX.refresh(conn, updated)
+
+    if updated:
+        try:
+            messaging.wake_sender()
+        except Exception as e:
+            print("Email send (bulk status update) failed:", e)
+    return jsonify({"ok": True, "status": new_status, "updated": updated, "skipped": skipped})
 
 @app.route("/admin/quick_book", methods=["POST"])
 def admin_quick_book():
@@ -455,18 +916,103 @@ def admin_quick_book():
     sql = f"INSERT INTO events ({','.join(cols)}) VALUES ({placeholders})"
 
     with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(sql, vals)
+        new_id = insert_id(conn.cursor(), sql, vals)
+        calendar.refresh(conn, [new_id])
         conn.commit()
+        conflicts.INDEX.refresh(conn, new_id)
     return jsonify({"ok": True})
 
+@app.route("/admin/import", methods=["POST"])
+def admin_import():
+    """
+    Bulk booking import: a CSV/JSON file upload ("file"), or a JSON body
+    {"rows": [...], "dry_run": bool, "status": ..., "on_conflict": ...}.
+    Options may also be query/form parameters:
+      dry_run=1            report only, write nothing
+      status=auto|Approved|Pending   auto = Approved when Self-assessable
+      on_conflict=pending|skip|abort what to do with an Approved row that conflicts
+    Any invalid row (or an abort) means nothing is written.
+    """
+    opts = dict(request.values)
+    f = request.files.get("file")
+    try:
+        if f and f.filename:
+            fmt = "json" if f.filename.lower().endswith(".json") else "csv"
+            raw_rows = importer.parse(f.read().decode("utf-8-sig"), fmt)
+        else:
+            data = request.get_json(silent=True)
+            if data is None:
+                return jsonify({"ok": False, "error": "Upload a CSV/JSON file or send JSON rows"}), 400
+            if isinstance(data, dict):
+                opts.update({k: v for k, v in data.items() if k != "rows"})
+            raw_rows = importer.parse(data, "json")
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    dry_run = str(opts.get("dry_run", "")).lower() in ("1", "true", "yes")
+    status = opts.get("status") or "auto"
+    on_conflict = opts.get("on_conflict") or "pending"
+    if status not in importer.STATUS_MODES or on_conflict not in importer.CONFLICT_MODES:
+        return jsonify({"ok": False, "error": "Invalid status or on_conflict"}), 400
+
+    with get_conn() as conn:
+        ids, report = importer.run(conn, raw_rows, dry_run, status, on_conflict)
+    ok = all(r["ok"] for r in report)
+    return jsonify({"ok": ok, "dry_run": dry_run, "inserted": len(ids), "rows": report}), (200 if ok else 400)
+
 # ---------- Minimal chatbot ----------
+# Chatbot date/time extraction (ISO or d/m/y dates; "10:00-12:00", "9am to 1pm", "for 3 days")
+_CHAT_DATE_RE = re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b|\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+_CHAT_TIME_RANGE_RE = re.compile(
+    r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|–|to|until|till)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\b", re.I)
+_CHAT_DAYS_RE = re.compile(r"\bfor\s+(\d{1,2})\s+days?\b", re.I)
+
+def _chat_when(msg):
+    """(start_date, end_date, start_time, end_time) mentioned in a chat message; missing parts are None."""
+    dates = []
+    for m in _CHAT_DATE_RE.finditer(msg):
+        y, mo, d = (m.group(1), m.group(2), m.group(3)) if m.group(1) else (m.group(6), m.group(5), m.group(4))
+        try:
+            dates.append(datetime(int(y), int(mo), int(d)).date())
+        except ValueError:
+            continue
+    if not dates:
+        return None, None, None, None
+    start = dates[0]
+    end = max(dates[1], start) if len(dates) > 1 else start
+    days = _CHAT_DAYS_RE.search(msg)
+    if days and len(dates) == 1 and int(days.group(1)) > 1:
+        end = start + timedelta(days=int(days.group(1)) - 1)
+
+    start_time = end_time = None
+    for m in _CHAT_TIME_RANGE_RE.finditer(_CHAT_DATE_RE.sub(" ", msg)):
+        h1, m1, ap1, h2, m2, ap2 = m.groups()
+        if not (m1 or ap1 or m2 or ap2):
+            continue   # bare "10-12" is too ambiguous
+        t2 = _chat_hour(int(h2), ap2)
+        t1 = _chat_hour(int(h1), ap1)
+        if not ap1 and ap2 and ap2.lower() == "pm" and t1 + 12 <= t2:
+            t1 += 12   # "1-3pm"
+        if t1 > 23 or t2 > 24:
+            continue
+        start_time, end_time = f"{t1:02d}:{m1 or '00'}", ("23:59" if t2 == 24 else f"{t2:02d}:{m2 or '00'}")
+        break
+    return start.isoformat(), end.isoformat(), start_time, end_time
+
+def _chat_hour(h, meridiem):
+    if meridiem and meridiem.lower() == "pm" and h < 12:
+        return h + 12
+    if meridiem and meridiem.lower() == "am" and h == 12:
+        return 0
+    return h
+
 @app.route("/api/chat", methods=["POST"])
 def api_chat():
     """
     Very simple rule-based chatbot:
     - list event types & locations
     - quick conflict check: “Is <venue> free on 2025-09-20 10:00-12:00?”
+      (or a range: “… from 2025-09-20 to 2025-09-22”, “… on 20/09/2025 for 3 days”)
     - common FAQs
     """
     data = request.get_json(silent=True) or {}
@@ -476,41 +1022,39 @@ def api_chat():
 
     low = msg.lower()
 
-    # event types
-    if "event type" in low or "types" in low:
-        return jsonify({"reply": "Available event types:\n• " + "\n• ".join(event_types[:20]) + ("\n… (and more)" if len(event_types) > 20 else "")})
-
-    # locations
-    if "location" in low or "park" in low or "venue" in low:
-        sample = locations[:12]
-        return jsonify({"reply": "Common venues (sample):\n• " + "\n• ".join(sample) + ("\n…Type to search more in the form’s Venue field." if len(locations) > len(sample) else "")})
+    # quick availability parsing (before the keyword answers: venue names contain "park")
+    start_date, end_date, start_time, end_time = _chat_when(msg)
+    venue_guess = venues.match(msg) if start_date else None
 
-    # quick availability parsing
-    date_match = re.search(r"(\d{4}-\d{2}-\d{2})", msg)
-    time_match = re.search(r"(\d{1,2}:\d{2})\s*[-to]\s*(\d{1,2}:\d{2})", low)
-    venue_guess = None
-    for loc in locations:
-        if loc.lower() in low:
-            venue_guess = loc
-            break
-
-    if date_match and time_match and venue_guess:
-        start_date = date_match.group(1)
-        start_time = time_match.group(1)
-        end_time   = time_match.group(2)
+    if start_date and venue_guess:
         form = {
             "start_date": start_date,
-            "end_date": start_date,
-            "start_time": start_time,
-            "end_time": end_time,
+            "end_date": end_date,
+            "start_time": start_time or "00:00",
+            "end_time": end_time or "23:59",
             "location": venue_guess,
             "arcgis_feature_id": ""
         }
+        when = start_date if end_date == start_date else f"{start_date} to {end_date}"
+        if start_time:
+            when += f" {start_time}–{end_time}"
+        label = venues.display_name(venue_guess)
         conflict = has_conflict(form)
         if conflict:
-            return jsonify({"reply": f"Looks like **{venue_guess}** is **already booked** on **{start_date} {start_time}–{end_time}**. Try a different time or day."})
+            return jsonify({"reply": f"Looks like **{label}** is **already booked** on **{when}**. Try a different time or day."})
         else:
-            return jsonify({"reply": f"**Good news!** I can’t see any approved bookings at **{venue_guess}** on **{start_date} {start_time}–{end_time}**. You can submit the form now."})
+            return jsonify({"reply": f"**Good news!** I can’t see any approved bookings at **{label}** on **{when}**. You can submit the form now."})
+
+    # event types
+    if "event type" in low or "types" in low:
+        event_types = venues.event_types()
+        return jsonify({"reply": "Available event types:\n• " + "\n• ".join(event_types[:20]) + ("\n… (and more)" if len(event_types) > 20 else "")})
+
+    # locations
+    if "location" in low or "park" in low or "venue" in low:
+        locations = venues.locations()
+        sample = locations[:12]
+        return jsonify({"reply": "Common venues (sample):\n• " + "\n• ".join(sample) + ("\n…Type to search more in the form’s Venue field." if len(locations) > len(sample) else "")})
 
     # FAQs
     if "self-assess" in low or "self assess" in low:
@@ -525,9 +1069,6 @@ def api_chat():
 
 if __name__ == "__main__":
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
-    # If you still keep migrations, you can keep your guard here; otherwise remove:
-    if not os.path.exists("migrations/001_init.sql"):
-        # Comment out the next line if you don't use migrations anymore.
-        # raise SystemExit("Missing migrations/001_init.sql. Create it first.")
-        pass
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":   # the reloader's child serves; gunicorn: gunicorn.conf.py
+        messaging.start_sender()
     app.run(debug=True)
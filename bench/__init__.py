@@ -0,0 +1 @@
+# bench: synthetic data + endpoint latency benchmarks (python -m bench --help)
@@ -0,0 +1,166 @@
+# bench/__main__.py
+"""
+Benchmarks against a throwaway SQLite database (never events.db):
+
+    python -m bench seed --db /tmp/bench.db --rows 100000
+    python -m bench run  --db /tmp/bench.db --concurrency 1,8,32 --out bench-<commit>.json
+    python -m bench run  --url http://127.0.0.1:8000 --out gunicorn.json   # server started with SQLITE_PATH=/tmp/bench.db
+    python -m bench run  --db /tmp/bench.db --replay traffic.jsonl
+    python -m bench compare bench-old.json bench-new.json
+    python -m bench startup --db /tmp/bench.db --runs 10 --imports 15
+    python -m bench reservations --db /tmp/stress.db --processes 4 --threads 8
+"""
+import argparse, json, os, platform, subprocess, sys
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+
+def _use_db(path):
+    # must happen before db/app are imported
+    os.environ["SQLITE_PATH"] = os.path.abspath(path)
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE, text=True).strip()
+    except Exception:
+        return None
+
+def cmd_seed(args):
+    _use_db(args.db)
+    from db import get_conn, init_db
+    from bench.datagen import seed
+    from modules import calendar
+    init_db()
+    with get_conn() as conn:
+        seed(conn, args.rows, args.seed)
+        calendar.rebuild(conn)
+        conn.commit()
+        n = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+    print(f"Seeded {args.rows} events into {args.db} ({n} total)")
+
+def cmd_run(args):
+    from bench import driver
+    if args.url:
+        make_client = lambda: driver.HttpClient(args.url)
+        rows = None
+    else:
+        _use_db(args.db)
+        from db import get_conn
+        with get_conn() as conn:
+            rows = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        make_client = driver.InProcessClient
+    levels = [int(c) for c in args.concurrency.split(",")]
+    scenarios = args.endpoints.split(",") if args.endpoints else list(driver.SCENARIOS)
+    replay = driver.load_replay(args.replay) if args.replay else None
+    results = driver.run(make_client, scenarios, levels, args.requests, args.seed, replay)
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "target": args.url or "in-process",
+            "rows": rows,
+            "seed": args.seed,
+            "requests": args.requests,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print("Wrote", args.out)
+    else:
+        print(text)
+
+def cmd_compare(args):
+    old = json.loads(Path(args.old).read_text(encoding="utf-8"))["results"]
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))["results"]
+    print(f"{'endpoint':<16}{'level':<7}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>18}")
+    for name in sorted(set(old) | set(new)):
+        for level in sorted(set(old.get(name, {})) | set(new.get(name, {})), key=lambda c: int(c[1:])):
+            a, b = old.get(name, {}).get(level, {}), new.get(name, {}).get(level, {})
+            cells = [_delta(a.get(k), b.get(k)) for k in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")]
+            print(f"{name:<16}{level:<7}" + "".join(f"{c:>18}" for c in cells))
+
+def cmd_startup(args):
+    from bench import startup
+    _use_db(args.db)
+    from db import init_db
+    from modules import venues
+    init_db()   # the timed runs then only check the schema
+    venue_data = venues.compile_data(os.path.join(os.path.dirname(os.path.abspath(args.db)), "bench-venue-data.json"))
+    report = {
+        "meta": {"commit": _git_commit(), "runs": args.runs, "python": platform.python_version()},
+        "results": startup.run(args.db, venue_data, args.runs),
+    }
+    if args.imports:
+        report["slowest_imports_us"] = startup.top_imports(args.db, venue_data, args.imports)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+        print("Wrote", args.out)
+    else:
+        print(text)
+
+def cmd_reservations(args):
+    from bench import reservations
+    report = reservations.run(args.db, args.processes, args.threads, args.requests, args.days)
+    report["meta"] = {"commit": _git_commit(), "python": platform.python_version()}
+    print(json.dumps(report, indent=2, sort_keys=True))
+    if report["double_bookings"]:
+        sys.exit(1)
+
+def _delta(a, b):
+    if a is None or b is None:
+        return f"{a} -> {b}"
+    pct = (b - a) / a * 100 if a else 0
+    return f"{b:.1f} ({pct:+.0f}%)"
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m bench", description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("seed", help="insert synthetic events")
+    p.add_argument("--db", required=True)
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(fn=cmd_seed)
+
+    p = sub.add_parser("run", help="measure endpoint latency/throughput")
+    target = p.add_mutually_exclusive_group(required=True)
+    target.add_argument("--db", help="drive the app in-process against this SQLite file")
+    target.add_argument("--url", help="drive a running server (e.g. local gunicorn)")
+    p.add_argument("--endpoints", help="comma list (default: all scenarios)")
+    p.add_argument("--concurrency", default="1,4,16")
+    p.add_argument("--requests", type=int, default=200, help="requests per endpoint per concurrency level")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--replay", help="JSONL file of recorded requests to send instead of the scenarios")
+    p.add_argument("--out", help="write results JSON here")
+    p.set_defaults(fn=cmd_run)
+
+    p = sub.add_parser("compare", help="diff two results files")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.set_defaults(fn=cmd_compare)
+
+    p = sub.add_parser("startup", help="measure app import + first request in fresh interpreters")
+    p.add_argument("--db", required=True)
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--imports", type=int, default=0, help="also list the N slowest imports")
+    p.add_argument("--out", help="write results JSON here")
+    p.set_defaults(fn=cmd_startup)
+
+    p = sub.add_parser("reservations", help="concurrent /submit stress; fails on any double booking")
+    p.add_argument("--db", required=True, help="throwaway SQLite file (created if missing)")
+    p.add_argument("--processes", type=int, default=4)
+    p.add_argument("--threads", type=int, default=8, help="threads per process")
+    p.add_argument("--requests", type=int, default=50, help="submissions per thread")
+    p.add_argument("--days", type=int, default=2, help="hot dates per hot venue")
+    p.set_defaults(fn=cmd_reservations)
+
+    args = ap.parse_args(argv)
+    args.fn(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# bench/datagen.py
+"""Seeded synthetic events with venue, date and size distributions shaped like real bookings."""
+import random
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+from locations_events import locations, event_types
+from modules import rules
+
+COLUMNS = [
+    "event_type", "applicant_name", "applicant_email", "applicant_phone",
+    "event_name", "location", "start_date", "end_date", "start_time", "end_time",
+    "attendance", "alcohol", "high_risk", "traffic_mgmt", "vehicle_access",
+    "amplified_sound", "noise_level", "total_days", "notes",
+    "insurance_file", "site_map", "other_files",
+    "latitude", "longitude", "arcgis_feature_id", "arcgis_feature_name", "arcgis_layer",
+    "classification", "status", "created_at",
+]
+
+# Relative booking volume by month (summer and spring peaks) and weekday (weekends busiest)
+MONTH_WEIGHT = {1: 1.6, 2: 1.0, 3: 1.1, 4: 1.2, 5: 0.9, 6: 0.8, 7: 0.8, 8: 0.9, 9: 1.1, 10: 1.3, 11: 1.4, 12: 1.8}
+WEEKDAY_WEIGHT = (0.7, 0.7, 0.7, 0.8, 1.0, 2.2, 2.0)
+
+START_TIMES = (("05:30", 2), ("06:00", 6), ("07:00", 8), ("08:00", 14), ("09:00", 16), ("10:00", 14),
+               ("12:00", 8), ("14:00", 8), ("16:00", 10), ("17:00", 8), ("18:00", 6))
+HOURS = ((1, 10), (2, 30), (3, 25), (4, 20), (6, 10), (8, 5))
+FIRST = ("Alex", "Sam", "Jordan", "Pat", "Chris", "Taylor", "Morgan", "Jamie", "Riley", "Casey")
+LAST = ("Lee", "Nguyen", "Smith", "Brown", "Wilson", "Taylor", "Martin", "Walker", "King", "Young")
+WORDS = ("Sunset", "Community", "Markets", "Yoga", "Fun Run", "Carols", "Picnic", "Festival",
+         "Bootcamp", "Wedding", "Ceremony", "Cleanup", "Fair", "Concert", "Swim")
+
+
+class Generator:
+    """Deterministic for a given seed; also produces matching request payloads for the driver."""
+
+    def __init__(self, seed=1, start=date(2020, 1, 1), years=6):
+        self.rng = random.Random(seed)
+        venues = list(locations)
+        self.rng.shuffle(venues)
+        # Zipf-like popularity: a few venues take most bookings
+        self.venues = venues
+        self._venue_cw = list(accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(venues))))
+        self.days = [start + timedelta(days=i) for i in range(365 * years)]
+        self._day_cw = list(accumulate(MONTH_WEIGHT[d.month] * WEEKDAY_WEIGHT[d.weekday()] for d in self.days))
+        self._start_cw = list(accumulate(w for _, w in START_TIMES))
+        self._hours_cw = list(accumulate(w for _, w in HOURS))
+
+    def venue(self):
+        return self.rng.choices(self.venues, cum_weights=self._venue_cw)[0]
+
+    def day(self):
+        return self.rng.choices(self.days, cum_weights=self._day_cw)[0]
+
+    def window(self):
+        """(start_date, end_date, start_time, end_time, total_days) for one booking."""
+        rng = self.rng
+        d = self.day()
+        total_days = rng.choices((1, 2, 3, 4), (80, 12, 5, 3))[0]
+        start_time = rng.choices(START_TIMES, cum_weights=self._start_cw)[0][0]
+        hours = rng.choices(HOURS, cum_weights=self._hours_cw)[0][0]
+        h, m = map(int, start_time.split(":"))
+        end_time = f"{min(h + hours, 23):02d}:{m:02d}"
+        return d.isoformat(), (d + timedelta(days=total_days - 1)).isoformat(), start_time, end_time, total_days
+
+    def form(self):
+        """A /submit form payload (frontend field names)."""
+        rng = self.rng
+        start_date, end_date, start_time, end_time, total_days = self.window()
+        amplified = "Yes" if rng.random() < 0.25 else "No"
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)}"
+        return {
+            "event_type": rng.choice(event_types),
+            "organizer_name": name,
+            "contact_email": f"{name.replace(' ', '.').lower()}@example.com",
+            "contact_phone": f"04{rng.randint(0, 99999999):08d}",
+            "event_name": f"{rng.choice(WORDS)} {rng.choice(WORDS)}",
+            "venue": self.venue(),
+            "start_date": start_date, "end_date": end_date,
+            "start_time": start_time, "end_time": end_time,
+            "attendance": str(int(rng.lognormvariate(4, 1.1))),
+            "alcohol": "Yes" if rng.random() < 0.1 else "No",
+            "high_risk": "Yes" if rng.random() < 0.03 else "No",
+            "traffic_mgmt": "Yes" if rng.random() < 0.05 else "No",
+            "vehicle_access": "Yes" if rng.random() < 0.08 else "No",
+            "amplified_sound": amplified,
+            "noise_level": str(rng.randint(70, 105) if amplified == "Yes" else 0),
+            "total_days": str(total_days),
+            "notes": "",
+        }
+
+    def row(self):
+        """One events row (COLUMNS order), classified by the live rule table."""
+        f = self.form()
+        classification = rules.classify(f)
+        r = self.rng.random()
+        if classification == "Self-assessable":
+            status = "Approved" if r < 0.85 else "Pending"
+        else:
+            status = "Approved" if r < 0.55 else "Pending" if r < 0.8 else "Rejected"
+        created = datetime.fromisoformat(f["start_date"]) - timedelta(
+            days=self.rng.randint(3, 120), seconds=self.rng.randint(0, 86399))
+        return (
+            f["event_type"], f["organizer_name"], f["contact_email"], f["contact_phone"],
+            f["event_name"], f["venue"], f["start_date"], f["end_date"], f["start_time"], f["end_time"],
+            int(f["attendance"]), f["alcohol"], f["high_risk"], f["traffic_mgmt"], f["vehicle_access"],
+            f["amplified_sound"], int(f["noise_level"]), int(f["total_days"]), f["notes"],
+            None, None, None,
+            None, None, None, None, None,
+            classification, status, created.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+
+def seed(conn, rows, seed=1, batch_size=5000):
+    """Insert `rows` synthetic events in one transaction."""
+    gen = Generator(seed)
+    sql = f"INSERT INTO events ({','.join(COLUMNS)}) VALUES ({','.join(['?'] * len(COLUMNS))})"
+    cur = conn.cursor()
+    remaining = rows
+    while remaining > 0:
+        n = min(batch_size, remaining)
+        cur.executemany(sql, [gen.row() for _ in range(n)])
+        remaining -= n
+    conn.commit()
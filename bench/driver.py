@@ -0,0 +1,178 @@
+# bench/driver.py
+"""Latency / throughput driver: Flask test client in-process, or HTTP against a running server."""
+import json, threading, time, urllib.error, urllib.parse, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from bench.datagen import Generator
+
+
+# ---------- Scenarios: name -> fn(gen) returning one request ----------
+
+def _submit(gen):
+    return {"method": "POST", "path": "/submit", "data": gen.form()}
+
+def _check_conflict(gen):
+    f = gen.form()
+    return {"method": "POST", "path": "/api/check_conflict", "json": {
+        "venue": f["venue"], "start_date": f["start_date"], "end_date": f["end_date"],
+        "start_time": f["start_time"], "end_time": f["end_time"]}}
+
+def _api_events(gen):
+    first = gen.day().replace(day=1)
+    return {"method": "GET", "path": "/api/events", "query": {
+        "start": (first - timedelta(days=6)).isoformat(),
+        "end": (first + timedelta(days=42)).isoformat()}}
+
+def _admin(gen):
+    return {"method": "GET", "path": "/admin"}
+
+def _export_xlsx(gen):
+    return {"method": "GET", "path": "/export/xlsx"}
+
+SCENARIOS = {
+    "submit": _submit,
+    "check_conflict": _check_conflict,
+    "api_events": _api_events,
+    "admin": _admin,
+    "export_xlsx": _export_xlsx,
+}
+
+# Whole-table exports are far slower than everything else; cap their request count
+MAX_REQUESTS = {"export_xlsx": 5}
+
+
+def load_replay(path):
+    """
+    Replay file: JSONL, one HTTP request per line:
+      {"method": "POST", "path": "/api/check_conflict", "json": {...}}
+    with optional "data" (form fields), "query" and "headers". Lines without
+    a "path" (e.g. other JSONL logs) are skipped.
+    """
+    reqs, skipped = [], 0
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not isinstance(entry, dict) or "path" not in entry:
+                skipped += 1
+                continue
+            entry.setdefault("method", "GET")
+            reqs.append(entry)
+    if skipped:
+        print(f"[bench] skipped {skipped} replay line(s) without a 'path'")
+    return reqs
+
+
+# ---------- Clients ----------
+
+class InProcessClient:
+    def __init__(self):
+        from app import app   # imported late so SQLITE_PATH is already set
+        self._client = app.test_client()
+
+    def send(self, req):
+        resp = self._client.open(req["path"], method=req["method"], query_string=req.get("query"),
+                                 data=req.get("data"), json=req.get("json"), headers=req.get("headers"))
+        resp.get_data()
+        resp.close()
+        return resp.status_code
+
+
+class HttpClient:
+    def __init__(self, base_url):
+        self._base = base_url.rstrip("/")
+
+    def send(self, req):
+        url = self._base + req["path"]
+        if req.get("query"):
+            url += "?" + urllib.parse.urlencode(req["query"])
+        headers = dict(req.get("headers") or {})
+        body = None
+        if req.get("json") is not None:
+            body = json.dumps(req["json"]).encode()
+            headers["Content-Type"] = "application/json"
+        elif req.get("data") is not None:
+            body = urllib.parse.urlencode(req["data"]).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        r = urllib.request.Request(url, data=body, method=req["method"], headers=headers)
+        try:
+            with _NoRedirect.open(r, timeout=300) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+class _NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+_NoRedirect = urllib.request.build_opener(_NoRedirectHandler)
+
+
+# ---------- Measurement ----------
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+def measure(make_client, requests_, concurrency):
+    """Send `requests_` from `concurrency` threads; returns latency percentiles (ms) and throughput."""
+    local = threading.local()
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(req):
+        nonlocal errors
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = make_client()
+        t0 = time.perf_counter()
+        try:
+            status = client.send(req)
+        except Exception:
+            status = 599
+        elapsed = (time.perf_counter() - t0) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(one, requests_))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": _round(percentile(latencies, 50)),
+        "p95_ms": _round(percentile(latencies, 95)),
+        "p99_ms": _round(percentile(latencies, 99)),
+        "mean_ms": _round(sum(latencies) / len(latencies)) if latencies else None,
+        "throughput_rps": _round(len(latencies) / wall) if wall else None,
+    }
+
+def _round(v):
+    return None if v is None else round(v, 2)
+
+def run(make_client, scenarios, concurrency_levels, requests_per_level, seed=1, replay=None):
+    """Results keyed endpoint -> "c<level>" -> stats, ready for json.dump(sort_keys=True)."""
+    results = {}
+    if replay:
+        for level in concurrency_levels:
+            results.setdefault("replay", {})[f"c{level}"] = measure(make_client, replay, level)
+        return results
+    for name in scenarios:
+        gen = Generator(seed + 1000)
+        n = min(requests_per_level, MAX_REQUESTS.get(name, requests_per_level))
+        for level in concurrency_levels:
+            reqs = [SCENARIOS[name](gen) for _ in range(n)]
+            results.setdefault(name, {})[f"c{level}"] = measure(make_client, reqs, level)
+            print(f"[bench] {name:<15} c={level:<3} {results[name][f'c{level}']}")
+    return results
@@ -0,0 +1,102 @@
+# bench/reservations.py
+"""
+Double-booking stress: several processes (each with its own conflict index,
+like gunicorn workers) x threads fire Self-assessable /submit requests at a
+few hot venue/slot pairs, then the stored Approved bookings are swept for
+overlaps. A correct run reports double_bookings == 0 and exactly one
+Approved booking per slot.
+"""
+import multiprocessing, os, threading, time
+from datetime import date, timedelta
+
+HOT_VENUES = ("Bulcock Beach", "Kings Beach Park", "Mooloolaba Beach")
+# one side venue per worker, so unrelated-venue traffic is mixed in
+SIDE_VENUE = "Stress Test Reserve {}"
+
+
+def _form(venue, day, start_time="18:00", end_time="23:00"):
+    return {
+        "event_type": "Community Event", "organizer_name": "Stress Test",
+        "contact_email": "", "contact_phone": "0400000000",
+        "event_name": "Stress booking", "venue": venue,
+        "start_date": day, "end_date": day, "start_time": start_time, "end_time": end_time,
+        "attendance": "20", "alcohol": "No", "high_risk": "No", "traffic_mgmt": "No",
+        "vehicle_access": "No", "amplified_sound": "No", "noise_level": "0",
+        "total_days": "1", "notes": "",
+    }
+
+def _slots(days):
+    first = date(2031, 12, 31)
+    return [(venue, (first + timedelta(days=d)).isoformat()) for venue in HOT_VENUES for d in range(days)]
+
+def _worker(n, threads, requests, days, out):
+    import app
+    client_lock = threading.Lock()
+    slots = _slots(days)
+    counts = {"sent": 0, "errors": 0}
+
+    def loop(t):
+        client = app.app.test_client()
+        for i in range(requests):
+            if i % 4 == 3:
+                form = _form(SIDE_VENUE.format(n), (date(2032, 6, 1) + timedelta(days=t * requests + i)).isoformat())
+            else:
+                venue, day = slots[(n + t + i) % len(slots)]
+                form = _form(venue, day)
+            resp = client.post("/submit", data=form)
+            with client_lock:
+                counts["sent"] += 1
+                counts["errors"] += resp.status_code >= 400
+
+    pool = [threading.Thread(target=loop, args=(t,)) for t in range(threads)]
+    for th in pool:
+        th.start()
+    for th in pool:
+        th.join()
+    out.put(counts)
+
+def run(db_path, processes=4, threads=8, requests=50, days=2):
+    """Fire processes*threads*requests submissions at db_path (a throwaway SQLite file); return the report."""
+    os.environ["SQLITE_PATH"] = os.path.abspath(db_path)
+    from db import get_conn, init_db
+    init_db()
+
+    ctx = multiprocessing.get_context("spawn")   # fresh interpreters: one index per worker, as under gunicorn
+    out = ctx.Queue()
+    t0 = time.perf_counter()
+    procs = [ctx.Process(target=_worker, args=(n, threads, requests, days, out)) for n in range(processes)]
+    for p in procs:
+        p.start()
+    results = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+
+    from modules import conflicts, importer
+    with get_conn() as conn:
+        rows = conn.execute("""
+            SELECT id, location, arcgis_feature_id, start_date, end_date, start_time, end_time, status
+            FROM events WHERE event_name = 'Stress booking'
+        """).fetchall()
+    by_key = {}
+    for r in rows:
+        if r["status"] == "Approved":
+            span = (conflicts.to_iso(r["start_date"], r["start_time"]), conflicts.to_iso(r["end_date"], r["end_time"]))
+            for key in conflicts.venue_keys(r["arcgis_feature_id"], r["location"]):
+                by_key.setdefault(key, []).append(span + (r["id"],))
+    pairs = sorted({tuple(sorted(p)) for spans in by_key.values() for p in importer.sweep(spans)})
+    approved_hot = {(r["location"], r["start_date"]) for r in rows
+                    if r["status"] == "Approved" and r["location"] in HOT_VENUES}
+    sent = sum(r["sent"] for r in results)
+    return {
+        "requests": sent,
+        "errors": sum(r["errors"] for r in results),
+        "seconds": round(elapsed, 2),
+        "rps": round(sent / elapsed, 1) if elapsed else None,
+        "stored": len(rows),
+        "approved": sum(r["status"] == "Approved" for r in rows),
+        "hot_slots": len(_slots(days)),
+        "hot_slots_approved": len(approved_hot),
+        "double_bookings": len(pairs),
+        "double_booked_ids": pairs[:20],
+    }
@@ -0,0 +1,69 @@
+# bench/startup.py
+"""Worker boot cost: fresh interpreters importing the app and serving a first request."""
+import json, os, statistics, subprocess, sys, time
+from pathlib import Path
+
+BASE = Path(__file__).resolve().parents[1]
+
+# Runs in the child: time `import app`, then the first request that needs venue data
+_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.app.test_client().get("/api/venues/search?q=park")
+t2 = time.perf_counter()
+print(json.dumps({"import_s": t1 - t0, "first_request_s": t2 - t1}))
+"""
+
+# name -> (DB_AUTO_MIGRATE, use precompiled venue data)
+CONFIGS = {
+    "migrate+source": ("1", False),
+    "migrate+precompiled": ("1", True),
+    "no-migrate+precompiled": ("0", True),
+}
+
+
+def _env(db_path, auto_migrate, venue_data):
+    env = dict(os.environ, SQLITE_PATH=os.path.abspath(db_path), DB_AUTO_MIGRATE=auto_migrate,
+               VENUE_DATA_PATH=venue_data or "", PYTHONDONTWRITEBYTECODE="")
+    env.pop("DATABASE_URL", None)
+    return env
+
+def _once(env):
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=BASE, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - t0
+    result = json.loads(out.strip().splitlines()[-1])
+    result["wall_s"] = wall
+    return result
+
+def _summary(samples):
+    ms = sorted(s * 1000 for s in samples)
+    return {"median_ms": round(statistics.median(ms), 1),
+            "p90_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.9))], 1),
+            "max_ms": round(ms[-1], 1)}
+
+def run(db_path, venue_data, runs=10, configs=None):
+    """{config: {metric: {median_ms, p90_ms, max_ms}}} over `runs` cold starts each (after one warm-up)."""
+    results = {}
+    for name in configs or CONFIGS:
+        auto_migrate, precompiled = CONFIGS[name]
+        env = _env(db_path, auto_migrate, venue_data if precompiled else "")
+        _once(env)   # .pyc files, OS page cache
+        samples = [_once(env) for _ in range(runs)]
+        results[name] = {k: _summary([s[k] for s in samples]) for k in ("import_s", "first_request_s", "wall_s")}
+    return results
+
+def top_imports(db_path, venue_data, n=15):
+    """The `n` slowest imports (cumulative µs) of one cold `import app`, from -X importtime."""
+    env = _env(db_path, "1", venue_data)
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=BASE, env=env,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:n]
@@ -6,14 +6,22 @@ BASE_DIR = Path(__file__).resolve().parent
 # SQLite (dev) by default; override with DATABASE_URL for cloud (e.g. Postgres)
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR / 'events.db'}")
 UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "uploads")
+MAX_UPLOAD_BYTES = int(float(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024)    # per file
+UPLOAD_GC_GRACE_SECONDS = int(os.getenv("UPLOAD_GC_GRACE_SECONDS", "86400"))  # unreferenced uploads kept this long (scripts/gc_uploads.py)
+MAX_REQUEST_BYTES = int(float(os.getenv("MAX_REQUEST_MB", "60")) * 1024 * 1024)  # whole /submit body
+USE_X_SENDFILE = os.getenv("USE_X_SENDFILE", "0") == "1"  # only behind a proxy that honours X-Sendfile
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 
 # config.py
 GMAPS_API_KEY = os.getenv("GMAPS_API_KEY", "")  # optional
+# Also treat Approved bookings within this many metres as conflicts (0 = exact venue matches only)
+CONFLICT_RADIUS_M = float(os.getenv("CONFLICT_RADIUS_M", "0"))
 
 # --- Email config (Gmail SMTP) ---
-EMAIL_SMTP_HOST = "smtp.gmail.com"
-EMAIL_SMTP_PORT = 587
+# Override host/port and set EMAIL_SMTP_TLS=0 to point at a local debugging server
+EMAIL_SMTP_HOST = os.getenv("EMAIL_SMTP_HOST", "smtp.gmail.com")
+EMAIL_SMTP_PORT = int(os.getenv("EMAIL_SMTP_PORT", "587"))
+EMAIL_SMTP_TLS = os.getenv("EMAIL_SMTP_TLS", "1") == "1"
 
 # The visible "From" line in emails
 EMAIL_FROM = "Sunshine Coast Council <no-reply@scc.example>"
@@ -24,3 +32,32 @@ EMAIL_FROM = "Sunshine Coast Council <no-reply@scc.example>"
 import os
 EMAIL_USER = os.getenv("EMAIL_USER", "")
 EMAIL_PASS = os.getenv("EMAIL_PASS", "")
+
+# --- Email outbox (background sender) ---
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))  # doubled per failed attempt
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "15"))
+
+# --- Metrics (/metrics) ---
+# With several gunicorn workers, point METRICS_DIR at a directory they share
+METRICS_DIR = os.getenv("METRICS_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# --- Startup ---
+# Apply pending migrations when the app is imported (once per process; under
+# gunicorn --preload, once in the master). Set to 0 and run scripts/init_db.py
+# at deploy time instead to keep the schema check off the boot path entirely.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "1") == "1"
+# Precompiled venue list/search index (written by scripts/init_db.py; built in memory if missing or stale)
+VENUE_DATA_PATH = os.getenv("VENUE_DATA_PATH", str(BASE_DIR / "venue_data.json"))
+
+# --- Catalogue responses (/ and /api/locations) ---
+# Browser/CDN max-age; they revalidate with the ETag after that
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "86400"))
+
+# --- iCalendar feeds (/calendar.ics, /venues/<name>/calendar.ics) ---
+ICS_PAST_DAYS = int(os.getenv("ICS_PAST_DAYS", "90"))   # keep bookings that ended this recently
+ICS_TZID = os.getenv("ICS_TZID", "Australia/Brisbane")  # booking times are local wall-clock times here
+ICS_UTC_OFFSET = os.getenv("ICS_UTC_OFFSET", "+1000")   # that zone's fixed offset (no daylight saving)
+ICS_UID_DOMAIN = os.getenv("ICS_UID_DOMAIN", "ssc-event-form")
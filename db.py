@@ -1,32 +1,354 @@
 # db.py
-import os, sqlite3
+import hashlib, os, re, sqlite3, threading, time
+from collections import namedtuple
 from contextlib import contextmanager
+from functools import lru_cache
 
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "events.db"))
+DB_PATH = os.path.abspath(os.getenv("SQLITE_PATH") or os.path.join(os.path.dirname(__file__), "events.db"))
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 
 _use_postgres = DATABASE_URL.startswith(("postgres://", "postgresql://"))
+DIALECT = "postgres" if _use_postgres else "sqlite"
 
-if _use_postgres:
-    import psycopg2
-    import psycopg2.extras
+# Postgres pool sizing / housekeeping (seconds)
+POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+POOL_CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", "30"))
+
+# Postgres: PREPARE hot statements once per pooled connection, up to this many each
+PG_PREPARE = os.getenv("DB_PG_PREPARE", "1") == "1"
+PG_MAX_PREPARED = int(os.getenv("DB_PG_MAX_PREPARED", "256"))
+PG_BATCH_SIZE = 100   # executemany rows per round trip
+
+# Applied once to each per-thread SQLite connection
+SQLITE_PRAGMAS = (
+    f"PRAGMA journal_mode={os.getenv('SQLITE_JOURNAL_MODE', 'WAL')}",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+
+# psycopg2 is imported on first Postgres use (_pg_pool), not at import time
+psycopg2 = None
+
+# ---------- Query timing hook (modules/metrics registers one) ----------
+_query_observer = None
+
+def set_query_observer(fn):
+    """Call fn(sql, seconds) after every statement run through get_conn()."""
+    global _query_observer
+    _query_observer = fn
+
+def _timed(run, sql, *args):
+    observer = _query_observer
+    if observer is None:
+        return run(sql, *args)
+    t0 = time.perf_counter()
+    try:
+        return run(sql, *args)
+    finally:
+        observer(sql, time.perf_counter() - t0)
+
+class _TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, params=()):
+        return _timed(super().execute, sql, params)
+    def executemany(self, sql, seq):
+        return _timed(super().executemany, sql, seq)
+
+class _TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+    def executemany(self, sql, seq):
+        return self.cursor().executemany(sql, seq)
+
+_TimedDictCursor = None
+_PgConnection = None
+
+def _load_psycopg2():
+    global psycopg2, _TimedDictCursor, _PgConnection
+    import psycopg2.extras   # binds the module-level psycopg2
+
+    class PgConnection(psycopg2.extensions.connection):
+        """Remembers which statements this session has PREPAREd."""
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.prepared = set()
+
+    class TimedDictCursor(psycopg2.extras.RealDictCursor):
+        """Takes the app's SQLite-flavoured SQL (see _pg_statement)."""
+        def execute(self, query, vars=None):
+            return _timed(self._execute, query, vars)
+        def executemany(self, query, vars_list):
+            return _timed(self._executemany, query, vars_list)
+
+        def _execute(self, query, vars):
+            return super().execute(_pg_sql(self.connection, query, vars is not None), vars)
+
+        def _executemany(self, query, vars_list):
+            # execute_batch-style: PG_BATCH_SIZE statements per round trip
+            sql, batch = _pg_sql(self.connection, query, True), []
+            for args in vars_list:
+                batch.append(self.mogrify(sql, args))
+                if len(batch) >= PG_BATCH_SIZE:
+                    super().execute(b";".join(batch))
+                    batch = []
+            if batch:
+                super().execute(b";".join(batch))
+
+    _TimedDictCursor = TimedDictCursor
+    _PgConnection = PgConnection
+
+# ---------- Postgres: dialect translation + prepared statements ----------
+# SQLite spellings -> Postgres, applied once per distinct statement
+_PG_REWRITES = (
+    (re.compile(r"\bdatetime\(\s*'now'\s*\)", re.I), "to_char(LOCALTIMESTAMP, 'YYYY-MM-DD HH24:MI:SS')"),
+    (re.compile(r"\bdate\(\s*'now'\s*\)", re.I), "to_char(CURRENT_DATE, 'YYYY-MM-DD')"),
+    (re.compile(r"\bIFNULL\(", re.I), "COALESCE("),
+)
+# string literals, quoted identifiers and comments are copied through untouched
+_PG_TOKENS = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|--[^\n]*|\?|%|;")
+_PREPARABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "VALUES")
+
+_PgStatement = namedtuple("_PgStatement", "text raw name execute")
+_unpreparable = set()
+
+@lru_cache(maxsize=1024)
+def _pg_statement(sql):
+    """
+    Translate one statement written for SQLite: `text` for psycopg2 with
+    parameters (? -> %s, literal % doubled), `raw` for no parameters, and
+    when it is a single DML statement, a PREPARE name plus the EXECUTE to
+    send in its place.
+    """
+    for pattern, repl in _PG_REWRITES:
+        sql = pattern.sub(repl, sql)
+    text, raw, body = [], [], []
+    pos = n = 0
+    multi = False
+    for m in _PG_TOKENS.finditer(sql):
+        chunk, tok = sql[pos:m.start()], m.group(0)
+        pos = m.end()
+        for out in (text, raw, body):
+            out.append(chunk)
+        if tok == "?":
+            n += 1
+            text.append("%s"); raw.append("?"); body.append(f"${n}")
+        elif tok.startswith(("'", "--")) or tok == "%":   # psycopg2 reads % even inside these
+            text.append(tok.replace("%", "%%")); raw.append(tok); body.append(tok)
+        else:
+            multi = multi or (tok == ";" and sql[pos:].strip() != "")
+            for out in (text, raw, body):
+                out.append(tok)
+    for out in (text, raw, body):
+        out.append(sql[pos:])
+    text, raw, body = "".join(text).strip(), "".join(raw).strip(), "".join(body).strip().rstrip(";")
+    verb = body.split(None, 1)[0].upper() if body else ""
+    if multi or verb not in _PREPARABLE:
+        return _PgStatement(text, raw, None, None)
+    name = "q_" + hashlib.sha1(body.encode("utf-8")).hexdigest()[:20]
+    execute = f"EXECUTE {name}" + (f" ({', '.join(['%s'] * n)})" if n else "")
+    return _PgStatement(text, raw, (name, body), execute)
+
+def _pg_sql(conn, sql, with_params):
+    """What to send for `sql` on this connection: EXECUTE of a prepared copy when possible."""
+    if not isinstance(sql, str):
+        return sql
+    stmt = _pg_statement(sql)
+    if PG_PREPARE and stmt.name and stmt.name[0] not in _unpreparable:
+        prepared = getattr(conn, "prepared", None)
+        if prepared is not None and (stmt.name[0] in prepared or (
+                len(prepared) < PG_MAX_PREPARED and _pg_prepare(conn, *stmt.name))):
+            return stmt.execute
+    return stmt.text if with_params else stmt.raw
+
+def _pg_prepare(conn, name, body):
+    # inside a savepoint, so a statement Postgres can't prepare (e.g. a
+    # parameter whose type it can't infer) doesn't abort the transaction
+    with conn.cursor() as cur:
+        cur.execute("SAVEPOINT pg_prepare")
+        try:
+            cur.execute(f"PREPARE {name} AS {body}")
+        except psycopg2.Error:
+            cur.execute("ROLLBACK TO SAVEPOINT pg_prepare")
+            _unpreparable.add(name)
+            return False
+        finally:
+            cur.execute("RELEASE SAVEPOINT pg_prepare")
+    conn.prepared.add(name)
+    return True
 
 @contextmanager
 def get_conn():
+    """
+    Borrow a connection for the duration of the block.
+    Postgres: pooled; committed on success, rolled back on error.
+    SQLite: one reused connection per thread; work left uncommitted is rolled back.
+    """
     if _use_postgres:
-        conn = psycopg2.connect(DATABASE_URL)
-        # row factory-ish
-        with conn:
-            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        pool = _pg_pool()
+        conn = pool.acquire()
+        try:
+            with conn.cursor(cursor_factory=_TimedDictCursor) as cur:
                 yield _PgConn(conn, cur)
-        conn.close()
+            conn.commit()
+        except BaseException:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            pool.release(conn)
     else:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
+        conn = _sqlite_conn()
+        _local.depth += 1
         try:
             yield conn
+        except BaseException:
+            conn.rollback()
+            raise
         finally:
+            _local.depth -= 1
+            if _local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+# ---------- SQLite: per-thread connections ----------
+_local = threading.local()
+
+def _sqlite_conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=SQLITE_BUSY_TIMEOUT, factory=_TimedConnection)
+        conn.row_factory = sqlite3.Row
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        _local.conn = conn
+        _local.depth = 0
+    return conn
+
+# ---------- Postgres: thread-safe pool ----------
+class _PgPool:
+    """Bounded pool with idle eviction and a liveness ping for connections idle past `check_after`."""
+
+    def __init__(self, dsn, minconn, maxconn, timeout, idle_timeout, check_after):
+        self._dsn = dsn
+        self._min = minconn
+        self._max = maxconn
+        self._timeout = timeout
+        self._idle_timeout = idle_timeout
+        self._check_after = check_after
+        self._cond = threading.Condition()
+        self._idle = []   # [(conn, last_used)], most recently used last
+        self._size = 0    # idle + checked out
+
+    def acquire(self):
+        deadline = time.monotonic() + self._timeout
+        while True:
+            conn, last_used = self._checkout(deadline)
+            if conn is None:
+                try:
+                    return psycopg2.connect(self._dsn, connection_factory=_PgConnection)
+                except Exception:
+                    self._forget()
+                    raise
+            if time.monotonic() - last_used < self._check_after or self._healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        if conn.closed:
+            self._forget()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._evict_idle()
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                conn.close()
+            self._size -= len(self._idle)
+            self._idle = []
+
+    def _checkout(self, deadline):
+        """Pop an idle connection, or reserve a slot for a new one (returned as None)."""
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self._max:
+                    self._size += 1
+                    return None, 0.0
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._cond.wait(remaining):
+                    raise RuntimeError(f"database pool exhausted ({self._max} connections in use)")
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self._idle_timeout
+        while self._size > self._min and self._idle and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.pop(0)
+            conn.close()
+            self._size -= 1
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
             conn.close()
+        finally:
+            self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _pg_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if psycopg2 is None:
+                    _load_psycopg2()
+                _pool = _PgPool(DATABASE_URL, POOL_MIN, POOL_MAX, POOL_TIMEOUT,
+                                POOL_IDLE_TIMEOUT, POOL_CHECK_AFTER)
+    return _pool
+
+def close_all():
+    """Close pooled Postgres connections and this thread's SQLite connection."""
+    if _pool is not None:
+        _pool.close_all()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and not getattr(_local, "depth", 0):
+        conn.close()
+        _local.conn = None
+
+def _after_fork():
+    # A forked worker must never reuse the parent's sockets or SQLite handles;
+    # drop them without closing so the parent's copies stay intact.
+    global _pool, _local
+    _pool = None
+    _local = threading.local()
+
+os.register_at_fork(after_in_child=_after_fork)
 
 class _PgConn:
     def __init__(self, conn, cur):
@@ -34,54 +356,265 @@ class _PgConn:
         self._cur = cur
     def cursor(self):
         return self._cur
+    def server_cursor(self, name):
+        """Named (server-side) cursor returning plain tuples, for streaming large results."""
+        return self._conn.cursor(name=name)
     def commit(self):
         self._conn.commit()
+    def rollback(self):
+        self._conn.rollback()
+    def execute(self, sql, params=None):
+        self._cur.execute(sql, params)
+        return self._cur
     def executescript(self, sql):
         # not used for PG; no-op or split by ';' if you need migrations
         for stmt in [s.strip() for s in sql.split(';') if s.strip()]:
             self._cur.execute(stmt)
 
-def init_db():
-    """Create table if not exists (works for both SQLite and PG)."""
-    schema = """
-    CREATE TABLE IF NOT EXISTS events (
-      id SERIAL PRIMARY KEY,
-      event_type TEXT,
-      applicant_name TEXT NOT NULL,
-      applicant_email TEXT NOT NULL,
-      applicant_phone TEXT NOT NULL,
-      event_name TEXT NOT NULL,
-      location TEXT NOT NULL,
-      start_date TEXT NOT NULL,
-      end_date TEXT NOT NULL,
-      start_time TEXT,
-      end_time TEXT,
-      attendance INTEGER DEFAULT 0,
-      alcohol TEXT DEFAULT 'No',
-      high_risk TEXT DEFAULT 'No',
-      traffic_mgmt TEXT DEFAULT 'No',
-      vehicle_access TEXT DEFAULT 'No',
-      amplified_sound TEXT DEFAULT 'No',
-      noise_level INTEGER DEFAULT 0,
-      total_days INTEGER DEFAULT 1,
-      notes TEXT,
-      insurance_file TEXT,
-      site_map TEXT,
-      other_files TEXT,
-      latitude TEXT,
-      longitude TEXT,
-      arcgis_feature_id TEXT,
-      arcgis_feature_name TEXT,
-      arcgis_layer TEXT,
-      classification TEXT NOT NULL,
-      status TEXT NOT NULL DEFAULT 'Pending',
-      created_at TEXT NOT NULL
-    );
+def stream_rows(sql, params=(), batch_size=500):
+    """
+    Yield the column names, then every row as a tuple, fetching `batch_size`
+    rows at a time (through a server-side cursor on Postgres) so the full
+    result is never held in memory.
     """
     with get_conn() as conn:
-        cur = conn.cursor()
-        if isinstance(conn, sqlite3.Connection):
-            conn.executescript(schema)
+        if _use_postgres:
+            # a named cursor can't EXECUTE a prepared statement: translate only
+            cur = conn.server_cursor(f"stream_{threading.get_ident()}")
+            sql, params = (_pg_statement(sql).text, params) if params else (_pg_statement(sql).raw, None)
         else:
-            conn.executescript(schema)
+            cur = conn.cursor()
+        try:
+            cur.execute(sql, params)
+            batch = cur.fetchmany(batch_size)
+            yield tuple(d[0] for d in cur.description or ())
+            while batch:
+                yield from (tuple(r) for r in batch)
+                batch = cur.fetchmany(batch_size)
+        finally:
+            cur.close()
+
+def insert_id(cur, sql, params=()):
+    """Run one INSERT and return the new row's id (RETURNING id on Postgres, lastrowid on SQLite)."""
+    if _use_postgres:
+        cur.execute(sql.rstrip().rstrip(";") + " RETURNING id", params)
+        return cur.fetchone()["id"]
+    cur.execute(sql, params)
+    return cur.lastrowid
+
+def _copy_text(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def copy_rows(conn, table, columns, rows):
+    """
+    Bulk-insert tuples in the caller's transaction: one COPY ... FROM STDIN
+    on Postgres, one executemany on SQLite.
+    """
+    if not _use_postgres:
+        conn.cursor().executemany(
+            f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join(['?'] * len(columns))})", rows)
+        return
+    import io
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_text(v) for v in row) + "\n")
+    buf.seek(0)
+    conn.cursor().copy_expert(f"COPY {table} ({','.join(columns)}) FROM STDIN", buf)
+
+def copy_csv(sql, params=(), chunk_size=1 << 16):
+    """
+    Postgres only: yield the rows of `sql` as CSV bytes (header line first)
+    from COPY (...) TO STDOUT, spooled through a temp file so the connection
+    goes back to the pool before the client has read it all.
+    """
+    import tempfile
+    out = tempfile.SpooledTemporaryFile(max_size=8 << 20)
+    with get_conn() as conn:
+        cur = conn.cursor()
+        stmt = _pg_statement(sql)
+        query = cur.mogrify(stmt.text, params).decode("utf-8") if params else stmt.raw
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+    with out:
+        out.seek(0)
+        while True:
+            chunk = out.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+# ---------- Migrations ----------
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Schemas created before the ledger existed already carry 001-004 (from the
+# old migrate script or init_db); those are re-applied leniently on adoption.
+_LEGACY_VERSION = 4
+_ALREADY_APPLIED = ("duplicate column name", "already exists")
+
+_LEDGER = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version INTEGER PRIMARY KEY,
+  name TEXT NOT NULL,
+  checksum TEXT NOT NULL,
+  applied_at TEXT NOT NULL
+)
+"""
+
+def migration_files():
+    """[(version, name, sql, sha256)] for this dialect, in version order."""
+    folder = os.path.join(MIGRATIONS_DIR, "postgres" if _use_postgres else "sqlite")
+    found = []
+    for name in sorted(os.listdir(folder)):
+        m = re.match(r"(\d+)_.*\.sql$", name)
+        if not m:
+            continue
+        with open(os.path.join(folder, name), encoding="utf-8") as fh:
+            sql = fh.read()
+        found.append((int(m.group(1)), name, sql, hashlib.sha256(sql.encode("utf-8")).hexdigest()))
+    return found
+
+def applied_migrations(conn):
+    """{version: (name, checksum, applied_at)} from the ledger."""
+    cur = conn.cursor()
+    cur.execute("SELECT version, name, checksum, applied_at FROM schema_migrations")
+    return {r["version"]: (r["name"], r["checksum"], r["applied_at"]) for r in cur.fetchall()}
+
+def migrate(verbose=False):
+    """
+    Apply pending migrations in order, each in its own transaction together
+    with its ledger row. Safe to run from several processes at once. Raises
+    if an applied migration's file has since been edited.
+    """
+    files = migration_files()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(_LEDGER)
         conn.commit()
+        done = applied_migrations(conn)
+        legacy = not done and _has_table(conn, "events")
+        for version, name, sql, checksum in files:
+            if version in done:
+                if done[version][1] != checksum:
+                    raise RuntimeError(f"migration {name} was edited after it was applied (checksum mismatch)")
+                continue
+            lenient = legacy and version <= _LEGACY_VERSION
+            if _use_postgres:
+                applied = _apply_pg(conn, version, name, sql, checksum)
+            else:
+                applied = _apply_sqlite(conn, version, name, sql, checksum, lenient)
+            if applied and verbose:
+                print("Applied:", name)
+    return files
+
+def _has_table(conn, name):
+    cur = conn.cursor()
+    if _use_postgres:
+        cur.execute("SELECT to_regclass(?) AS t", (name,))
+        return cur.fetchone()["t"] is not None
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,))
+    return cur.fetchone() is not None
+
+def _record(cur, version, name, checksum):
+    cur.execute("INSERT INTO schema_migrations (version, name, checksum, applied_at) VALUES (?, ?, ?, ?)",
+                (version, name, checksum, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())))
+
+def _apply_sqlite(conn, version, name, sql, checksum, lenient):
+    conn.execute("BEGIN IMMEDIATE")   # serialises concurrent runners
+    try:
+        if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+            conn.rollback()
+            return False
+        for stmt in _split_sqlite(sql):
+            try:
+                conn.execute(stmt)
+            except sqlite3.OperationalError as e:
+                if not (lenient and str(e).startswith(_ALREADY_APPLIED)):
+                    raise RuntimeError(f"migration {name} failed: {e}") from e
+        _record(conn, version, name, checksum)
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
+
+def _split_sqlite(sql):
+    """Split a script into statements (trigger bodies stay whole)."""
+    stmts, buf = [], ""
+    for line in sql.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            if _strip_comments(buf):
+                stmts.append(buf.strip())
+            buf = ""
+    if _strip_comments(buf):
+        stmts.append(buf.strip())
+    return stmts
+
+def _strip_comments(sql):
+    return re.sub(r"--[^\n]*", "", sql).strip()
+
+def _apply_pg(conn, version, name, sql, checksum):
+    cur = conn.cursor()
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))")
+    cur.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,))
+    if cur.fetchone():
+        conn.commit()
+        return False
+    cur.execute(sql)   # the whole file: Postgres DDL is transactional
+    _record(cur, version, name, checksum)
+    conn.commit()
+    return True
+
+def init_db():
+    """Bring the schema up to date (see migrate())."""
+    global _fts5, _initialized
+    migrate()
+    _fts5 = None
+    _initialized = True
+
+_initialized = False
+
+def init_db_once():
+    """init_db() unless this process (or the master it was forked from) already ran it."""
+    if not _initialized:
+        init_db()
+
+_fts5 = None
+
+def _has_fts5(conn):
+    global _fts5
+    if _fts5 is None:
+        _fts5 = bool(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'").fetchone())
+    return _fts5
+
+def search_filter(conn, q):
+    """WHERE fragment (starting with ' AND') + params matching every word of `q` as a prefix."""
+    terms = re.findall(r"\w+", q or "")
+    if not terms:
+        return "", []
+    if _use_postgres:
+        return " AND search_tsv @@ to_tsquery('simple', ?)", [" & ".join(t + ":*" for t in terms)]
+    if _has_fts5(conn):
+        return (" AND id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)",
+                [" ".join(f'"{t}"*' for t in terms)])
+    where, params = "", []
+    for t in terms:
+        where += " AND (applicant_name LIKE ? OR event_type LIKE ? OR event_name LIKE ? OR location LIKE ? OR notes LIKE ?)"
+        params += [f"%{t}%"] * 5
+    return where, params
+
+def table_version(conn, name="events"):
+    """
+    Return (version, updated_at) of a trigger-maintained change counter: the
+    `name` row plus any per-key '<name>:*' rows (Postgres bumps one per venue).
+    """
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT SUM(version) AS version, MAX(updated_at) AS updated_at FROM table_versions
+        WHERE name = ? OR (name > ? AND name < ?)
+    """, (name, name + ":", name + ";"))
+    row = cur.fetchone()
+    if not row or row["version"] is None:
+        return 0, None
+    return int(row["version"]), row["updated_at"]
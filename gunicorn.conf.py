@@ -0,0 +1,35 @@
+# gunicorn.conf.py (picked up automatically from the working directory)
+import gc, glob, os
+
+# Import the app once in the master and fork workers from it: the schema check
+# runs once, and the venue data/index warmed below is shared copy-on-write.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+
+
+def on_starting(server):
+    # per-worker metric snapshots from a previous run would inflate the totals
+    metrics_dir = os.getenv("METRICS_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, "metrics-*.json*")):
+            os.remove(path)
+
+
+def when_ready(server):
+    # runs in the master after the app is loaded, before the first fork
+    if not server.cfg.preload_app:
+        return
+    import db
+    from modules import conflicts, venues
+    venues.get_matcher()
+    with db.get_conn() as conn:
+        conflicts.INDEX.sync(conn)
+    db.close_all()   # workers open their own connections
+    gc.freeze()      # keep the shared objects out of the workers' GC passes (fewer copied pages)
+
+
+def post_worker_init(worker):
+    # each worker sends its own outbox rows, including any left from before a restart
+    from modules import messaging
+    messaging.start_sender()
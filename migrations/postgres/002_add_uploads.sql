@@ -0,0 +1,3 @@
+ALTER TABLE events ADD COLUMN IF NOT EXISTS insurance_file TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS site_map TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS other_files TEXT;
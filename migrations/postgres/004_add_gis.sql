@@ -0,0 +1,5 @@
+ALTER TABLE events ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS arcgis_feature_id TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS arcgis_feature_name TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS arcgis_layer TEXT;
@@ -0,0 +1,5 @@
+-- Allowed statuses, including 'Cancelled' (used by the status API).
+-- NOT VALID: enforced for new writes without failing on rows that predate the check.
+ALTER TABLE events DROP CONSTRAINT IF EXISTS events_status_check;
+ALTER TABLE events ADD CONSTRAINT events_status_check
+    CHECK (status IN ('Pending','Approved','Rejected','Cancelled')) NOT VALID;
@@ -0,0 +1,22 @@
+-- Per-table change counters, bumped by triggers on every write. Caches and
+-- in-process indexes compare against these to tell whether they are stale.
+CREATE TABLE IF NOT EXISTS table_versions (
+    name       TEXT PRIMARY KEY,
+    version    BIGINT NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+INSERT INTO table_versions (name, version, updated_at)
+VALUES ('events', 0, to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'))
+ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_events_version() RETURNS trigger AS $$
+BEGIN
+  UPDATE table_versions SET version = version + 1,
+         updated_at = to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS')
+  WHERE name = 'events';
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_events_version ON events;
+CREATE TRIGGER trg_events_version AFTER INSERT OR UPDATE OR DELETE ON events
+    FOR EACH ROW EXECUTE FUNCTION bump_events_version();
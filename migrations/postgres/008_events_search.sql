@@ -0,0 +1,10 @@
+-- Admin dashboard: keyset paging index and a generated tsvector over the
+-- searchable columns.
+CREATE INDEX IF NOT EXISTS idx_events_created_id ON events (created_at DESC, id DESC);
+
+ALTER TABLE events ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS (
+    to_tsvector('simple',
+      coalesce(applicant_name, '') || ' ' || coalesce(event_name, '') || ' ' ||
+      coalesce(event_type, '') || ' ' || coalesce(location, '') || ' ' || coalesce(notes, ''))
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_events_search ON events USING GIN (search_tsv);
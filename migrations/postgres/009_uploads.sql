@@ -0,0 +1,11 @@
+-- Content-addressed upload store (modules/uploads.py).
+-- path = '<sha256[:2]>/<sha256><ext>' under UPLOAD_FOLDER.
+CREATE TABLE IF NOT EXISTS uploads (
+    path          TEXT PRIMARY KEY,
+    sha256        TEXT NOT NULL,
+    size          BIGINT NOT NULL,
+    content_type  TEXT,
+    original_name TEXT,
+    ref_count     INTEGER NOT NULL DEFAULT 0,
+    created_at    TEXT NOT NULL
+);
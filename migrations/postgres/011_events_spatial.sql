@@ -0,0 +1,24 @@
+-- Spatial index over event coordinates for radius queries (modules/spatial.py).
+-- With PostGIS: a generated geography point + GiST index (ST_DWithin).
+-- Without it (no extension or no privilege): a plain (latitude, longitude)
+-- btree that the bounding-box prefilter can still range-scan.
+DO $$
+BEGIN
+  BEGIN
+    CREATE EXTENSION IF NOT EXISTS postgis;
+  EXCEPTION WHEN OTHERS THEN
+    RAISE NOTICE 'PostGIS unavailable (%); using a lat/lon btree instead', SQLERRM;
+  END;
+  IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'postgis') THEN
+    EXECUTE $ddl$
+      ALTER TABLE events ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+        GENERATED ALWAYS AS (
+          ST_SetSRID(ST_MakePoint(NULLIF(longitude::text, '')::double precision,
+                                  NULLIF(latitude::text, '')::double precision), 4326)::geography
+        ) STORED
+    $ddl$;
+    EXECUTE 'CREATE INDEX IF NOT EXISTS idx_events_geog ON events USING GIST (geog)';
+  ELSE
+    EXECUTE 'CREATE INDEX IF NOT EXISTS idx_events_latlon ON events (latitude, longitude)';
+  END IF;
+END $$;
@@ -0,0 +1,16 @@
+-- Venue occupancy per day (modules/calendar.py): one bit per 15-minute slot
+-- (96 bits = 12 bytes, slot 0 = 00:00-00:15) for Approved and for Pending
+-- bookings, plus the set-bit counts for heatmap aggregates. Replaces _calendar.
+CREATE TABLE IF NOT EXISTS venue_occupancy (
+    venue_key      TEXT NOT NULL,      -- events.location_key
+    day            TEXT NOT NULL,      -- YYYY-MM-DD
+    venue          TEXT,               -- display name (latest booking's location)
+    approved       BYTEA NOT NULL,
+    pending        BYTEA NOT NULL,
+    approved_slots INTEGER NOT NULL DEFAULT 0,
+    pending_slots  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (venue_key, day)
+);
+CREATE INDEX IF NOT EXISTS idx_occupancy_day ON venue_occupancy (day);
+
+DROP TABLE IF EXISTS _calendar;
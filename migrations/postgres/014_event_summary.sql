@@ -0,0 +1,72 @@
+-- Dashboard counters (modules/summary.py): bookings per ISO week of the
+-- start date, status, classification, event type and venue, kept current by
+-- triggers on every insert, status change and delete, so /api/admin/summary
+-- and the /admin header read O(groups) rows instead of scanning events.
+-- week is the Monday (YYYY-MM-DD) of the ISO week; '' if start_date is unparseable.
+CREATE TABLE IF NOT EXISTS event_summary (
+    week           TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    event_type     TEXT NOT NULL,
+    venue_key      TEXT NOT NULL,      -- events.location_key
+    venue          TEXT,               -- display name (latest booking's location)
+    bookings       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, status, classification, event_type, venue_key)
+);
+
+CREATE OR REPLACE FUNCTION iso_week_start(d TEXT) RETURNS TEXT AS $$
+DECLARE
+  day DATE;
+BEGIN
+  IF d IS NULL OR d !~ '^\d{4}-\d{2}-\d{2}' THEN
+    RETURN '';
+  END IF;
+  BEGIN
+    day := left(d, 10)::date;
+  EXCEPTION WHEN others THEN
+    RETURN '';   -- e.g. 2027-02-31
+  END;
+  RETURN to_char(day - (extract(isodow FROM day)::int - 1), 'YYYY-MM-DD');
+END $$ LANGUAGE plpgsql IMMUTABLE;
+
+INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+SELECT iso_week_start(start_date),
+       COALESCE(status, ''), COALESCE(classification, ''), COALESCE(event_type, ''),
+       COALESCE(lower(btrim(location)), ''), MAX(location), COUNT(*)
+FROM events
+GROUP BY 1, 2, 3, 4, 5
+ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION count_event_summary() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE event_summary SET bookings = bookings - 1
+    WHERE week = iso_week_start(OLD.start_date)
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(btrim(OLD.location)), '');
+    DELETE FROM event_summary
+    WHERE bookings <= 0 AND week = iso_week_start(OLD.start_date)
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(btrim(OLD.location)), '');
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+    VALUES (iso_week_start(NEW.start_date),
+            COALESCE(NEW.status, ''), COALESCE(NEW.classification, ''), COALESCE(NEW.event_type, ''),
+            COALESCE(lower(btrim(NEW.location)), ''), NEW.location, 1)
+    ON CONFLICT (week, status, classification, event_type, venue_key)
+    DO UPDATE SET bookings = event_summary.bookings + 1, venue = EXCLUDED.venue;
+  END IF;
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_events_summary ON events;
+CREATE TRIGGER trg_events_summary AFTER INSERT OR DELETE ON events
+    FOR EACH ROW EXECUTE FUNCTION count_event_summary();
+DROP TRIGGER IF EXISTS trg_events_summary_upd ON events;
+CREATE TRIGGER trg_events_summary_upd
+    AFTER UPDATE OF status, classification, event_type, location, start_date ON events
+    FOR EACH ROW
+    WHEN ((OLD.status, OLD.classification, OLD.event_type, OLD.location, OLD.start_date)
+          IS DISTINCT FROM (NEW.status, NEW.classification, NEW.event_type, NEW.location, NEW.start_date))
+    EXECUTE FUNCTION count_event_summary();
@@ -0,0 +1,21 @@
+-- Per-venue change counters. Bumping the single 'events' row on every write
+-- made each booking transaction wait for every other one to commit, whatever
+-- the venue. Writes now bump a row per venue ('events:<location_key>');
+-- table_version() sums 'events' and its 'events:*' rows, so the total still
+-- rises by one per written row and only bookings at the same venue (which
+-- already share a reservation lock) contend on a counter row.
+CREATE OR REPLACE FUNCTION bump_events_version() RETURNS trigger AS $$
+DECLARE
+  key TEXT;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    key := OLD.location_key;
+  ELSE
+    key := NEW.location_key;
+  END IF;
+  INSERT INTO table_versions (name, version, updated_at)
+  VALUES ('events:' || COALESCE(key, ''), 1, to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS'))
+  ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1,
+                                   updated_at = EXCLUDED.updated_at;
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
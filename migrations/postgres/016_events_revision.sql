@@ -0,0 +1,22 @@
+-- Revision stamps for calendar clients (modules/ics.py LAST-MODIFIED and
+-- SEQUENCE): any change to what a feed shows of a booking sets updated_at
+-- (local wall time, like created_at) and bumps revision.
+ALTER TABLE events ADD COLUMN IF NOT EXISTS updated_at TEXT;
+ALTER TABLE events ADD COLUMN IF NOT EXISTS revision INTEGER NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION stamp_event_revision() RETURNS trigger AS $$
+BEGIN
+  NEW.updated_at := to_char(LOCALTIMESTAMP, 'YYYY-MM-DD HH24:MI:SS');
+  NEW.revision := OLD.revision + 1;
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_events_revision ON events;
+CREATE TRIGGER trg_events_revision
+    BEFORE UPDATE OF event_name, location, start_date, end_date, start_time, end_time, event_type, status ON events
+    FOR EACH ROW
+    WHEN ((OLD.event_name, OLD.location, OLD.start_date, OLD.end_date, OLD.start_time, OLD.end_time,
+           OLD.event_type, OLD.status)
+          IS DISTINCT FROM (NEW.event_name, NEW.location, NEW.start_date, NEW.end_date, NEW.start_time,
+                            NEW.end_time, NEW.event_type, NEW.status))
+    EXECUTE FUNCTION stamp_event_revision();
@@ -0,0 +1,36 @@
+-- uploads.ref_count = how many events rows name the file (insurance_file,
+-- site_map, other_files), kept by triggers; rows at 0 that nobody has
+-- uploaded again since uploaded_at are removed by scripts/gc_uploads.py.
+ALTER TABLE uploads ADD COLUMN IF NOT EXISTS uploaded_at TEXT;
+UPDATE uploads SET uploaded_at = created_at WHERE uploaded_at IS NULL;
+
+UPDATE uploads SET ref_count =
+    (SELECT COUNT(*) FROM events WHERE insurance_file = uploads.path)
+  + (SELECT COUNT(*) FROM events WHERE site_map = uploads.path)
+  + (SELECT COUNT(*) FROM events WHERE other_files = uploads.path);
+
+CREATE OR REPLACE FUNCTION count_upload_refs() RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.insurance_file;
+    UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.site_map;
+    UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.other_files;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.insurance_file;
+    UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.site_map;
+    UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.other_files;
+  END IF;
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_events_uploads ON events;
+CREATE TRIGGER trg_events_uploads AFTER INSERT OR DELETE ON events
+    FOR EACH ROW EXECUTE FUNCTION count_upload_refs();
+DROP TRIGGER IF EXISTS trg_events_uploads_upd ON events;
+CREATE TRIGGER trg_events_uploads_upd
+    AFTER UPDATE OF insurance_file, site_map, other_files ON events
+    FOR EACH ROW
+    WHEN ((OLD.insurance_file, OLD.site_map, OLD.other_files)
+          IS DISTINCT FROM (NEW.insurance_file, NEW.site_map, NEW.other_files))
+    EXECUTE FUNCTION count_upload_refs();
@@ -0,0 +1,64 @@
+-- Rebuild events so status may be 'Cancelled' (used by the status API).
+-- SQLite cannot alter a CHECK constraint in place.
+CREATE TABLE events_new (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type      TEXT,
+    applicant_name  TEXT NOT NULL,
+    applicant_email TEXT NOT NULL,
+    applicant_phone TEXT NOT NULL,
+
+    event_name      TEXT NOT NULL,
+    location        TEXT NOT NULL,
+    start_date      TEXT NOT NULL,
+    end_date        TEXT NOT NULL,
+
+    attendance      INTEGER DEFAULT 0,
+    alcohol         TEXT CHECK (alcohol IN ('Yes','No')) DEFAULT 'No',
+    high_risk       TEXT CHECK (high_risk IN ('Yes','No')) DEFAULT 'No',
+    traffic_mgmt    TEXT CHECK (traffic_mgmt IN ('Yes','No')) DEFAULT 'No',
+    vehicle_access  TEXT CHECK (vehicle_access IN ('Yes','No')) DEFAULT 'No',
+    amplified_sound TEXT CHECK (amplified_sound IN ('Yes','No')) DEFAULT 'No',
+    noise_level     INTEGER DEFAULT 0,
+    total_days      INTEGER DEFAULT 1,
+    notes           TEXT,
+
+    classification  TEXT CHECK (classification IN ('Self-assessable','Assessable')) NOT NULL,
+    status          TEXT CHECK (status IN ('Pending','Approved','Rejected','Cancelled')) NOT NULL DEFAULT 'Pending',
+
+    created_at      TEXT NOT NULL,
+    start_time      TEXT,
+    end_time        TEXT,
+    insurance_file  TEXT,
+    site_map        TEXT,
+    other_files     TEXT,
+    latitude        REAL,
+    longitude       REAL,
+    arcgis_feature_id   TEXT,
+    arcgis_feature_name TEXT,
+    arcgis_layer        TEXT
+);
+
+INSERT INTO events_new (
+    id, event_type, applicant_name, applicant_email, applicant_phone,
+    event_name, location, start_date, end_date,
+    attendance, alcohol, high_risk, traffic_mgmt, vehicle_access, amplified_sound,
+    noise_level, total_days, notes, classification, status, created_at,
+    start_time, end_time, insurance_file, site_map, other_files,
+    latitude, longitude, arcgis_feature_id, arcgis_feature_name, arcgis_layer
+)
+SELECT
+    id, event_type, applicant_name, applicant_email, applicant_phone,
+    event_name, location, start_date, end_date,
+    attendance, alcohol, high_risk, traffic_mgmt, vehicle_access, amplified_sound,
+    noise_level, total_days, notes, classification, status, created_at,
+    start_time, end_time, insurance_file, site_map, other_files,
+    latitude, longitude, arcgis_feature_id, arcgis_feature_name, arcgis_layer
+FROM events;
+
+DROP TABLE events;
+ALTER TABLE events_new RENAME TO events;
+
+CREATE INDEX IF NOT EXISTS idx_events_created     ON events (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_events_class       ON events (classification);
+CREATE INDEX IF NOT EXISTS idx_events_status      ON events (status);
+CREATE INDEX IF NOT EXISTS idx_events_dates       ON events (start_date, end_date);
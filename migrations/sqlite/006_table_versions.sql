@@ -0,0 +1,18 @@
+-- Per-table change counters, bumped by triggers on every write. Caches and
+-- in-process indexes compare against these to tell whether they are stale.
+CREATE TABLE IF NOT EXISTS table_versions (
+    name       TEXT PRIMARY KEY,
+    version    INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+INSERT OR IGNORE INTO table_versions (name, version, updated_at) VALUES ('events', 0, CURRENT_TIMESTAMP);
+
+CREATE TRIGGER IF NOT EXISTS trg_events_version_ins AFTER INSERT ON events BEGIN
+  UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'events';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_version_upd AFTER UPDATE ON events BEGIN
+  UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'events';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_version_del AFTER DELETE ON events BEGIN
+  UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'events';
+END;
@@ -0,0 +1,16 @@
+-- Queued emails for modules.messaging's background sender.
+-- status: Pending -> Sending -> Sent, or back to Pending (retry) / Dead.
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    to_addr         TEXT NOT NULL,
+    subject         TEXT NOT NULL,
+    html            TEXT NOT NULL,
+    text            TEXT,
+    status          TEXT NOT NULL DEFAULT 'Pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,          -- epoch seconds
+    last_error      TEXT,
+    created_at      TEXT NOT NULL,
+    sent_at         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON email_outbox (status, next_attempt_at);
@@ -0,0 +1,25 @@
+-- Admin dashboard: keyset paging index and an external-content FTS5 table
+-- over the searchable columns, kept in sync by triggers.
+CREATE INDEX IF NOT EXISTS idx_events_created_id ON events (created_at DESC, id DESC);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+  applicant_name, event_name, event_type, location, notes,
+  content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS trg_events_fts_ins AFTER INSERT ON events BEGIN
+  INSERT INTO events_fts (rowid, applicant_name, event_name, event_type, location, notes)
+  VALUES (new.id, new.applicant_name, new.event_name, new.event_type, new.location, new.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_fts_del AFTER DELETE ON events BEGIN
+  INSERT INTO events_fts (events_fts, rowid, applicant_name, event_name, event_type, location, notes)
+  VALUES ('delete', old.id, old.applicant_name, old.event_name, old.event_type, old.location, old.notes);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_fts_upd
+AFTER UPDATE OF applicant_name, event_name, event_type, location, notes ON events BEGIN
+  INSERT INTO events_fts (events_fts, rowid, applicant_name, event_name, event_type, location, notes)
+  VALUES ('delete', old.id, old.applicant_name, old.event_name, old.event_type, old.location, old.notes);
+  INSERT INTO events_fts (rowid, applicant_name, event_name, event_type, location, notes)
+  VALUES (new.id, new.applicant_name, new.event_name, new.event_type, new.location, new.notes);
+END;
+
+INSERT INTO events_fts (events_fts) VALUES ('rebuild');
@@ -0,0 +1,15 @@
+-- Sargable venue lookups: a normalised venue key (indexed generated column)
+-- and composite indexes shaped like the has_conflict, /admin and /api/events predicates.
+ALTER TABLE events ADD COLUMN location_key TEXT GENERATED ALWAYS AS (lower(trim(location))) VIRTUAL;
+
+-- conflict checks: Approved bookings at a venue, by date
+CREATE INDEX IF NOT EXISTS idx_events_venue_window ON events (location_key, status, start_date, end_date);
+CREATE INDEX IF NOT EXISTS idx_events_feature_window ON events (arcgis_feature_id, status, start_date, end_date)
+    WHERE arcgis_feature_id IS NOT NULL AND arcgis_feature_id <> '';
+
+-- /admin filtered by status or classification, newest first
+CREATE INDEX IF NOT EXISTS idx_events_status_created ON events (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_events_class_created  ON events (classification, created_at DESC, id DESC);
+
+-- /api/events window narrowed by status
+CREATE INDEX IF NOT EXISTS idx_events_status_dates ON events (status, start_date, end_date);
@@ -0,0 +1,23 @@
+-- Spatial index over event coordinates for radius queries (modules/spatial.py).
+-- One degenerate box per geocoded event; rows without numeric lat/lon are left out.
+CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+
+CREATE TRIGGER IF NOT EXISTS trg_events_rtree_ins AFTER INSERT ON events BEGIN
+  INSERT INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon)
+  SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+  WHERE typeof(new.latitude) IN ('real', 'integer') AND typeof(new.longitude) IN ('real', 'integer');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_rtree_del AFTER DELETE ON events BEGIN
+  DELETE FROM events_rtree WHERE id = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_rtree_upd AFTER UPDATE OF latitude, longitude ON events BEGIN
+  DELETE FROM events_rtree WHERE id = old.id;
+  INSERT INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon)
+  SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+  WHERE typeof(new.latitude) IN ('real', 'integer') AND typeof(new.longitude) IN ('real', 'integer');
+END;
+
+DELETE FROM events_rtree;
+INSERT INTO events_rtree (id, min_lat, max_lat, min_lon, max_lon)
+SELECT id, latitude, latitude, longitude, longitude FROM events
+WHERE typeof(latitude) IN ('real', 'integer') AND typeof(longitude) IN ('real', 'integer');
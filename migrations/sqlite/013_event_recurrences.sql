@@ -0,0 +1,14 @@
+-- Recurring bookings (modules/recurrence.py). The events row is the first
+-- occurrence; this row says how it repeats. first_date/last_date bound the
+-- whole series (last_date = end date of the last occurrence) so window
+-- queries can find series without expanding them.
+CREATE TABLE IF NOT EXISTS event_recurrences (
+    event_id    INTEGER PRIMARY KEY REFERENCES events(id) ON DELETE CASCADE,
+    rrule       TEXT NOT NULL DEFAULT '',   -- FREQ=DAILY|WEEKLY;INTERVAL=n;BYDAY=MO,..;UNTIL=..;COUNT=n ('' = dates only)
+    rdates      TEXT NOT NULL DEFAULT '',   -- extra occurrence dates, comma separated
+    exdates     TEXT NOT NULL DEFAULT '',   -- excluded dates, comma separated
+    first_date  TEXT NOT NULL,
+    last_date   TEXT NOT NULL,
+    occurrences INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recurrences_window ON event_recurrences (last_date, first_date);
@@ -0,0 +1,63 @@
+-- Dashboard counters (modules/summary.py): bookings per ISO week of the
+-- start date, status, classification, event type and venue, kept current by
+-- triggers on every insert, status change and delete, so /api/admin/summary
+-- and the /admin header read O(groups) rows instead of scanning events.
+-- week is the Monday (YYYY-MM-DD) of the ISO week; '' if start_date is unparseable.
+CREATE TABLE IF NOT EXISTS event_summary (
+    week           TEXT NOT NULL,
+    status         TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    event_type     TEXT NOT NULL,
+    venue_key      TEXT NOT NULL,      -- events.location_key
+    venue          TEXT,               -- display name (latest booking's location)
+    bookings       INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, status, classification, event_type, venue_key)
+);
+
+INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+SELECT COALESCE(date(substr(start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), ''),
+       COALESCE(status, ''), COALESCE(classification, ''), COALESCE(event_type, ''), COALESCE(lower(trim(location)), ''), MAX(location), COUNT(*)
+FROM events
+GROUP BY 1, 2, 3, 4, 5;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_summary_ins AFTER INSERT ON events BEGIN
+  INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+  VALUES (COALESCE(date(substr(NEW.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(NEW.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), ''),
+          COALESCE(NEW.status, ''), COALESCE(NEW.classification, ''), COALESCE(NEW.event_type, ''),
+          COALESCE(lower(trim(NEW.location)), ''), NEW.location, 1)
+  ON CONFLICT (week, status, classification, event_type, venue_key)
+  DO UPDATE SET bookings = bookings + 1, venue = excluded.venue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_summary_upd
+AFTER UPDATE OF status, classification, event_type, location, start_date ON events
+WHEN OLD.status IS NOT NEW.status OR OLD.classification IS NOT NEW.classification
+  OR OLD.event_type IS NOT NEW.event_type OR OLD.location IS NOT NEW.location
+  OR OLD.start_date IS NOT NEW.start_date
+BEGIN
+  UPDATE event_summary SET bookings = bookings - 1
+    WHERE week = COALESCE(date(substr(OLD.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(OLD.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), '')
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(trim(OLD.location)), '');
+  DELETE FROM event_summary
+    WHERE bookings <= 0 AND week = COALESCE(date(substr(OLD.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(OLD.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), '')
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(trim(OLD.location)), '');
+  INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+  VALUES (COALESCE(date(substr(NEW.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(NEW.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), ''),
+          COALESCE(NEW.status, ''), COALESCE(NEW.classification, ''), COALESCE(NEW.event_type, ''),
+          COALESCE(lower(trim(NEW.location)), ''), NEW.location, 1)
+  ON CONFLICT (week, status, classification, event_type, venue_key)
+  DO UPDATE SET bookings = bookings + 1, venue = excluded.venue;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_summary_del AFTER DELETE ON events BEGIN
+  UPDATE event_summary SET bookings = bookings - 1
+    WHERE week = COALESCE(date(substr(OLD.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(OLD.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), '')
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(trim(OLD.location)), '');
+  DELETE FROM event_summary
+    WHERE bookings <= 0 AND week = COALESCE(date(substr(OLD.start_date, 1, 10), '-' || ((CAST(strftime('%w', substr(OLD.start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), '')
+      AND status = COALESCE(OLD.status, '') AND classification = COALESCE(OLD.classification, '')
+      AND event_type = COALESCE(OLD.event_type, '') AND venue_key = COALESCE(lower(trim(OLD.location)), '');
+END;
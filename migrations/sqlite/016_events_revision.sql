@@ -0,0 +1,21 @@
+-- Revision stamps for calendar clients (modules/ics.py LAST-MODIFIED and
+-- SEQUENCE): any change to what a feed shows of a booking sets updated_at
+-- (local wall time, like created_at) and bumps revision.
+ALTER TABLE events ADD COLUMN updated_at TEXT;
+ALTER TABLE events ADD COLUMN revision INTEGER NOT NULL DEFAULT 0;
+
+CREATE TRIGGER IF NOT EXISTS trg_events_revision
+AFTER UPDATE OF event_name, location, start_date, end_date, start_time, end_time, event_type, status ON events
+WHEN OLD.event_name IS NOT NEW.event_name OR OLD.location IS NOT NEW.location
+  OR OLD.start_date IS NOT NEW.start_date OR OLD.end_date IS NOT NEW.end_date
+  OR OLD.start_time IS NOT NEW.start_time OR OLD.end_time IS NOT NEW.end_time
+  OR OLD.event_type IS NOT NEW.event_type OR OLD.status IS NOT NEW.status
+BEGIN
+  UPDATE events SET updated_at = datetime('now', 'localtime'), revision = OLD.revision + 1 WHERE id = NEW.id;
+END;
+
+-- the stamp above is a second UPDATE of the row: don't count it as another write
+DROP TRIGGER IF EXISTS trg_events_version_upd;
+CREATE TRIGGER trg_events_version_upd AFTER UPDATE ON events WHEN NEW.revision IS OLD.revision BEGIN
+  UPDATE table_versions SET version = version + 1, updated_at = CURRENT_TIMESTAMP WHERE name = 'events';
+END;
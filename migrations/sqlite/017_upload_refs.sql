@@ -0,0 +1,30 @@
+-- uploads.ref_count = how many events rows name the file (insurance_file,
+-- site_map, other_files), kept by triggers; rows at 0 that nobody has
+-- uploaded again since uploaded_at are removed by scripts/gc_uploads.py.
+ALTER TABLE uploads ADD COLUMN uploaded_at TEXT;
+UPDATE uploads SET uploaded_at = created_at;
+
+UPDATE uploads SET ref_count =
+    (SELECT COUNT(*) FROM events WHERE insurance_file = uploads.path)
+  + (SELECT COUNT(*) FROM events WHERE site_map = uploads.path)
+  + (SELECT COUNT(*) FROM events WHERE other_files = uploads.path);
+
+CREATE TRIGGER IF NOT EXISTS trg_events_uploads_ins AFTER INSERT ON events BEGIN
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.insurance_file;
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.site_map;
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.other_files;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_uploads_upd
+AFTER UPDATE OF insurance_file, site_map, other_files ON events BEGIN
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.insurance_file;
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.site_map;
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.other_files;
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.insurance_file;
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.site_map;
+  UPDATE uploads SET ref_count = ref_count + 1 WHERE path = NEW.other_files;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_events_uploads_del AFTER DELETE ON events BEGIN
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.insurance_file;
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.site_map;
+  UPDATE uploads SET ref_count = ref_count - 1 WHERE path = OLD.other_files;
+END;
@@ -1,54 +1,200 @@
-from db import get_conn as get_db
+# modules/calendar.py
+"""
+Venue occupancy: per venue per day, a 96-bit map of 15-minute slots held by
+Approved and by Pending bookings (table venue_occupancy), every occurrence
+of a recurring booking included. Kept current by refresh() inside the
+transaction that inserts an event or changes its status; backs the heatmap
+and slot-availability APIs.
+"""
+from datetime import date, timedelta
 
+from modules import recurrence
 
-def reserve(title, date_str, start_time, finish_time, auto=True):
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MAP_BYTES = SLOTS_PER_DAY // 8
+MAX_SPAN_DAYS = 366   # longer (or garbled) bookings are only mapped this far
+
+_EMPTY = bytes(MAP_BYTES)
+
+
+def venue_key(location):
+    """Same normalisation as the events.location_key column."""
+    return (location or "").strip().lower()
+
+def _minutes(t, default):
+    try:
+        h, m = (t or "").split(":")[:2]
+        return max(0, min(24 * 60, int(h) * 60 + int(m)))
+    except ValueError:
+        return default
+
+def slot_mask(start_time, end_time):
+    """Bits for the slots [start_time, end_time) touches on one day."""
+    first = _minutes(start_time, 0) // SLOT_MINUTES
+    last = -(-_minutes(end_time, 24 * 60) // SLOT_MINUTES)   # ceil: a partly used slot is used
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+def _day(value):
+    try:
+        return date.fromisoformat((value or "")[:10])
+    except ValueError:
+        return None
+
+def booking_masks(start_date, end_date, start_time, end_time):
+    """{day: mask} for a booking running continuously from start to end (missing end time = end of day)."""
+    first, last = _day(start_date), _day(end_date) or _day(start_date)
+    if not first:
+        return {}
+    last = min(max(last, first), first + timedelta(days=MAX_SPAN_DAYS - 1))
+    masks = {}
+    d = first
+    while d <= last:
+        mask = slot_mask(start_time if d == first else None, end_time if d == last else None)
+        if mask:
+            masks[d.isoformat()] = mask
+        d += timedelta(days=1)
+    return masks
+
+def to_bits(blob):
+    return int.from_bytes(bytes(blob or _EMPTY), "big")
+
+def to_blob(mask):
+    return mask.to_bytes(MAP_BYTES, "big")
+
+def slot_string(mask):
+    """'0'/'1' per slot from 00:00, for clients drawing a day strip."""
+    return "".join("1" if mask >> i & 1 else "0" for i in range(SLOTS_PER_DAY))
+
+
+# ---------- Maintenance ----------
+
+_BOOKINGS = f"""
+  SELECT e.location_key, e.location, e.status, e.start_date, e.end_date, e.start_time, e.end_time,
+         {recurrence.COLUMNS}
+  FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id
+  WHERE e.status IN ('Approved', 'Pending')
+"""
+
+_UPSERT = """
+  INSERT INTO venue_occupancy (venue_key, day, venue, approved, pending, approved_slots, pending_slots)
+  VALUES (?, ?, ?, ?, ?, ?, ?)
+  ON CONFLICT (venue_key, day) DO UPDATE SET
+    venue = excluded.venue, approved = excluded.approved, pending = excluded.pending,
+    approved_slots = excluded.approved_slots, pending_slots = excluded.pending_slots
+"""
+
+def _fold(cells, row, days=None):
+    """OR one booking row (each occurrence, if it repeats) into cells[(key, day)] = [approved, pending, venue]."""
+    window = (min(days), max(days)) if days else (None, None)
+    for start_date, end_date in recurrence.spans(row, *window):
+        for day, mask in booking_masks(start_date, end_date, row["start_time"], row["end_time"]).items():
+            if days is not None and day not in days:
+                continue
+            cell = cells.setdefault((row["location_key"], day), [0, 0, row["location"]])
+            cell[0 if row["status"] == "Approved" else 1] |= mask
+            cell[2] = row["location"]
+
+def _row(key, day, cell):
+    approved, pending, venue = cell
+    return (key, day, venue, to_blob(approved), to_blob(pending), approved.bit_count(), pending.bit_count())
+
+def refresh(conn, event_ids):
     """
-    Records an event for the calendar feed.
-    If auto=False we just flag 'Pending staff scheduling'.
+    Recompute the venue/days the given events cover (call after the write,
+    before commit). Only bookings at those venues on those days are re-read.
     """
-    if not title or not date_str:
-        return "❌ Missing date/title"
+    ids = list(event_ids)
+    if not ids:
+        return
+    cur = conn.cursor()
+    cur.execute(f"SELECT e.location_key, e.start_date, e.end_date, {recurrence.COLUMNS} "
+                f"FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id "
+                f"WHERE e.id IN ({','.join(['?'] * len(ids))})", ids)
+    affected = {}
+    for r in cur.fetchall():
+        if r["location_key"]:
+            for start_date, end_date in recurrence.spans(r):
+                days = booking_masks(start_date, end_date, "00:00", None)
+                affected.setdefault(r["location_key"], set()).update(days)
+
+    for key, days in affected.items():
+        first, last = min(days), max(days)
+        cur.execute(_BOOKINGS + " AND e.location_key = ? AND e.start_date < ? AND COALESCE(r.last_date, e.end_date) >= ?",
+                    (key, (date.fromisoformat(last) + timedelta(days=1)).isoformat(), first))
+        cells = {}
+        for r in cur.fetchall():
+            _fold(cells, r, days)
+        for day in days:
+            cell = cells.get((key, day))
+            if cell:
+                cur.execute(_UPSERT, _row(key, day, cell))
+            else:
+                cur.execute("DELETE FROM venue_occupancy WHERE venue_key = ? AND day = ?", (key, day))
+
+def rebuild(conn):
+    """Recompute the whole table from events (no commit)."""
+    cur = conn.cursor()
+    cur.execute("DELETE FROM venue_occupancy")
+    cur.execute(_BOOKINGS + " AND e.location_key <> ''")
+    cells = {}
+    for r in cur.fetchall():
+        _fold(cells, r)
+    cur.executemany(_UPSERT, [_row(key, day, cell) for (key, day), cell in cells.items()])
+    return len(cells)
+
+def ensure_built(conn):
+    """Fill venue_occupancy once for databases that had bookings before it existed."""
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM venue_occupancy LIMIT 1")
+    if cur.fetchone():
+        return
+    cur.execute(_BOOKINGS + " LIMIT 1")
+    if cur.fetchone():
+        rebuild(conn)
+        conn.commit()
 
-    if not auto:
-        return "🟡 Pending staff scheduling (assessable)"
 
-    # Simple local calendar table (create if not exists)
-    conn = get_db()
+# ---------- Queries ----------
+
+def day_maps(conn, location, start_date, end_date=None):
+    """{day: (approved mask, pending mask)} for one venue over [start_date, end_date]."""
     cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS _calendar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT, day TEXT, start_time TEXT, finish_time TEXT
-        )
-    """)
-    cur.execute("INSERT INTO _calendar (title, day, start_time, finish_time) VALUES (?,?,?,?)",
-                (title, date_str, start_time, finish_time))
-    conn.commit()
-    conn.close()
-    return "✅ Auto-scheduled to calendar"
-
-def get_events():
-    """Return FullCalendar-compatible list."""
-    conn = get_db()
+    cur.execute("SELECT day, approved, pending FROM venue_occupancy WHERE venue_key = ? AND day >= ? AND day <= ?",
+                (venue_key(location), start_date[:10], (end_date or start_date)[:10]))
+    return {r["day"]: (to_bits(r["approved"]), to_bits(r["pending"])) for r in cur.fetchall()}
+
+def is_free(conn, location, start_date, start_time, end_time, end_date=None, include_pending=False):
+    """True if no Approved (and optionally Pending) booking holds any slot of the window: one row per day."""
+    wanted = booking_masks(start_date, end_date or start_date, start_time, end_time)
+    held = day_maps(conn, location, start_date, end_date)
+    for day, mask in wanted.items():
+        approved, pending = held.get(day, (0, 0))
+        if mask & (approved | (pending if include_pending else 0)):
+            return False
+    return True
+
+def heatmap(conn, start, end, venue_keys=None):
+    """
+    Utilisation cells for days in [start, end): one dict per venue/day that
+    has any booking, with slot counts and the share of the day held.
+    """
+    sql = ("SELECT venue_key, venue, day, approved_slots, pending_slots FROM venue_occupancy"
+           " WHERE day >= ? AND day < ?")
+    params = [start, end]
+    if venue_keys:
+        sql += f" AND venue_key IN ({','.join(['?'] * len(venue_keys))})"
+        params += list(venue_keys)
     cur = conn.cursor()
-    # from apps table
-    cur.execute("SELECT event_name, event_date FROM applications")
-    app_rows = cur.fetchall()
-    # from local calendar table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS _calendar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            title TEXT, day TEXT, start_time TEXT, finish_time TEXT
-        )
-    """)
-    cur.execute("SELECT title, day FROM _calendar")
-    cal_rows = cur.fetchall()
-    conn.close()
-
-    events = []
-    for r in app_rows:
-        if r["event_name"] and r["event_date"]:
-            events.append({"title": r["event_name"], "start": r["event_date"]})
-    for r in cal_rows:
-        events.append({"title": r["title"], "start": r["day"]})
-    return events
+    cur.execute(sql + " ORDER BY venue_key, day", params)
+    return [{
+        "venue_key": r["venue_key"],
+        "venue": r["venue"],
+        "day": r["day"],
+        "approved_slots": r["approved_slots"],
+        "pending_slots": r["pending_slots"],
+        "approved": round(r["approved_slots"] / SLOTS_PER_DAY, 3),
+        "pending": round(r["pending_slots"] / SLOTS_PER_DAY, 3),
+    } for r in cur.fetchall()]
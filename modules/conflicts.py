@@ -0,0 +1,216 @@
+# modules/conflicts.py
+import threading
+from bisect import bisect_left, bisect_right
+
+from db import table_version
+from modules import recurrence
+
+
+def to_iso(d, t):
+    if not d:
+        return None
+    return f"{d}T{(t or '00:00')}:00"
+
+def venue_keys(arcgis_feature_id, location):
+    """Index keys a booking is filed under: its ArcGIS feature id and its normalised venue text."""
+    keys = []
+    fid = (arcgis_feature_id or "").strip()
+    loc = (location or "").strip().lower()
+    if fid:
+        keys.append("fid:" + fid)
+    if loc:
+        keys.append("loc:" + loc)
+    return keys
+
+
+class _Venue:
+    """
+    Approved [start, end) spans at one venue, sorted by start, over a max-end
+    segment tree (leaf i = end of span i, each node the max of its children);
+    recurring bookings are kept aside as (first day, last day, rule, start
+    time, end time, id) and expanded only over the window checked.
+    """
+    __slots__ = ("starts", "spans", "max_end", "size", "series")
+
+    def __init__(self):
+        self.starts = []
+        self.spans = []
+        self.max_end = [""]
+        self.size = 0
+        self.series = []
+
+    def add(self, start, end, event_id):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.spans.insert(i, (start, end, event_id))
+        if i == len(self.spans) - 1 and i < self.size:
+            self._set_leaf(i, end)   # appended into a spare leaf: O(log n)
+        else:
+            self._reindex()
+
+    def load(self, spans):
+        """Replace the spans with [(start, end, id)] in one O(n log n) sort and tree build."""
+        self.spans = sorted(spans)
+        self.starts = [start for start, _, _ in self.spans]
+        self._reindex()
+
+    def remove(self, event_id):
+        self.series = [x for x in self.series if x[5] != event_id]
+        for i, span in enumerate(self.spans):
+            if span[2] == event_id:
+                del self.starts[i], self.spans[i]
+                self._reindex()
+                return
+
+    def _set_leaf(self, i, end):
+        tree = self.max_end
+        node = self.size + i
+        tree[node] = end
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+
+    def _reindex(self):
+        size = 1
+        while size < len(self.spans):
+            size *= 2
+        tree = [""] * size + [end for _, end, _ in self.spans] + [""] * (size - len(self.spans))
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self.max_end, self.size = tree, size
+
+    def overlapping(self, start, end):
+        """
+        IDs of spans overlapping [start, end). Only spans starting before `end`
+        are considered, and subtrees whose max end is <= start are skipped, so
+        a query costs O((k + 1) log n) for k matches.
+        """
+        ids = []
+        limit = bisect_left(self.starts, end)   # spans [0, limit) start before `end`
+        stack = [(1, 0, self.size)] if limit else []
+        while stack:
+            node, lo, width = stack.pop()
+            if lo >= limit or self.max_end[node] <= start:
+                continue
+            if width == 1:
+                ids.append(self.spans[lo][2])
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, lo + half, half))
+            stack.append((2 * node, lo, half))
+        return ids + self.overlapping_series(start, end)
+
+    def overlapping_series(self, start, end):
+        ids = []
+        for first, last, rec, start_time, end_time, event_id in self.series:
+            if first > end[:10] or last < start[:10]:
+                continue
+            for d0, d1 in rec.spans(start[:10], end[:10]):
+                if to_iso(d0, start_time) < end and to_iso(d1, end_time) > start:
+                    ids.append(event_id)
+                    break
+        return ids
+
+
+class ConflictIndex:
+    """
+    Per-venue interval index of Approved bookings.
+    Kept current by `refresh()` after local writes; `sync()` rebuilds it
+    whenever another worker has bumped the events table version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._venues = {}
+        self._filed = {}   # event id -> keys it is filed under
+
+    def sync(self, conn):
+        version, _ = table_version(conn)
+        with self._lock:
+            if version != self._version:
+                self._rebuild(conn, version)
+
+    def refresh(self, conn, event_ids):
+        """Fold committed inserts/status changes (one id or a list) into the index."""
+        ids = [event_ids] if isinstance(event_ids, int) else list(event_ids)
+        if not ids:
+            return
+        version, _ = table_version(conn)
+        with self._lock:
+            if self._version is None:
+                return  # never loaded; the next sync() builds it
+            if version != self._version + len(ids):
+                self._rebuild(conn, version)
+                return
+            for event_id in ids:
+                self._drop(event_id)
+            cur = conn.cursor()
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cur.execute(self._SELECT + f" AND e.id IN ({','.join(['?'] * len(chunk))})", chunk)
+                for row in cur.fetchall():
+                    self._file(row)
+            self._version = version
+
+    def overlapping(self, keys, start, end, series_only=False):
+        """
+        Sorted IDs of Approved bookings under any of `keys` that overlap
+        [start, end); any occurrence of a recurring booking counts.
+        """
+        if not start or not end:
+            return []
+        ids = set()
+        with self._lock:
+            for key in keys:
+                venue = self._venues.get(key)
+                if venue:
+                    ids.update(venue.overlapping_series(start, end) if series_only else venue.overlapping(start, end))
+        return sorted(ids)
+
+    _SELECT = f"""
+      SELECT e.id, e.start_date, e.end_date, e.start_time, e.end_time, e.location, e.arcgis_feature_id,
+             {recurrence.COLUMNS}
+      FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id
+      WHERE e.status='Approved'
+    """
+
+    def _rebuild(self, conn, version):
+        cur = conn.cursor()
+        cur.execute(self._SELECT)
+        self._venues = {}
+        self._filed = {}
+        spans = {}   # venue key -> [(start, end, id)], each venue's tree built once below
+        for row in cur.fetchall():
+            self._file(row, spans)
+        for key, found in spans.items():
+            self._venues[key].load(found)
+        self._version = version
+
+    def _file(self, row, spans=None):
+        start = to_iso(row["start_date"], row["start_time"])
+        end = to_iso(row["end_date"], row["end_time"])
+        if not start or not end:
+            return
+        keys = venue_keys(row["arcgis_feature_id"], row["location"])
+        rec = recurrence.Recurrence.from_row(row)
+        for key in keys:
+            venue = self._venues.setdefault(key, _Venue())
+            if rec:
+                venue.series.append((row["first_date"], row["last_date"], rec,
+                                     row["start_time"], row["end_time"], row["id"]))
+            elif spans is not None:
+                spans.setdefault(key, []).append((start, end, row["id"]))
+            else:
+                venue.add(start, end, row["id"])
+        self._filed[row["id"]] = keys
+
+    def _drop(self, event_id):
+        for key in self._filed.pop(event_id, ()):
+            venue = self._venues.get(key)
+            if venue:
+                venue.remove(event_id)
+
+
+INDEX = ConflictIndex()
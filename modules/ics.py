@@ -0,0 +1,188 @@
+# modules/ics.py
+"""
+iCalendar (RFC 5545) feeds of Approved bookings: /calendar.ics and
+/venues/<key>/calendar.ics. Each booking's VEVENT text is cached per worker
+with the row values it was rendered from, so a feed rebuild after a write
+only re-renders the rows that changed. Recurring bookings go out as one
+VEVENT with RRULE/RDATE/EXDATE rather than as expanded occurrences.
+"""
+import threading
+from datetime import date, datetime, timedelta
+
+from modules import recurrence
+
+try:
+    from config import ICS_PAST_DAYS, ICS_TZID, ICS_UTC_OFFSET, ICS_UID_DOMAIN
+except Exception:
+    ICS_PAST_DAYS = 90
+    ICS_TZID = "Australia/Brisbane"
+    ICS_UTC_OFFSET = "+1000"
+    ICS_UID_DOMAIN = "ssc-event-form"
+
+_SELECT = f"""
+  SELECT e.id, e.event_name, e.location, e.start_date, e.end_date, e.start_time, e.end_time,
+         e.event_type, e.created_at, e.updated_at, e.revision, {recurrence.COLUMNS}
+  FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id
+  WHERE e.status = 'Approved' AND COALESCE(r.last_date, e.end_date) >= ?
+"""
+
+_vevents = {}   # event id -> (row signature, VEVENT text)
+_feeds = {}     # venue key (None = all) -> (tag, feed text, event count)
+_lock = threading.Lock()
+MAX_CACHED_FEEDS = 1000
+
+
+# ---------- Serialisation ----------
+
+def _escape(text):
+    return (str(text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def _fold(line):
+    """Content lines longer than 75 octets continue on lines starting with a space."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:   # don't split a UTF-8 sequence
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+def _day(value):
+    return (value or "")[:10].replace("-", "")
+
+def _stamp(d, t):
+    return f"{_day(d)}T{(t or '00:00').replace(':', '')[:4]}00"
+
+def _to_utc(local):
+    """A local wall-time datetime as a UTC date-time value (…Z)."""
+    sign = -1 if ICS_UTC_OFFSET.startswith("-") else 1
+    offset = timedelta(hours=int(ICS_UTC_OFFSET[1:3]), minutes=int(ICS_UTC_OFFSET[3:5]))
+    return (local - sign * offset).strftime("%Y%m%dT%H%M%SZ")
+
+def _utc(stamp):
+    """A stored created_at/updated_at (local wall time) as a UTC date-time value."""
+    try:
+        return _to_utc(datetime.strptime(stamp or "", "%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        return "19700101T000000Z"
+
+def _signature(row):
+    return tuple(row[k] for k in ("event_name", "location", "start_date", "end_date", "start_time", "end_time",
+                                  "event_type", "created_at", "updated_at", "revision", "rrule", "rdates", "exdates"))
+
+def vevent(row):
+    """One VEVENT block (CRLF lines, folded) for an events row joined with recurrence.COLUMNS."""
+    timed = bool(row["start_time"])
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{row['id']}@{ICS_UID_DOMAIN}",
+        f"DTSTAMP:{_utc(row['updated_at'] or row['created_at'])}",
+        f"CREATED:{_utc(row['created_at'])}",
+        f"LAST-MODIFIED:{_utc(row['updated_at'] or row['created_at'])}",
+        f"SEQUENCE:{row['revision'] or 0}",
+    ]
+    if timed:
+        lines.append(f"DTSTART;TZID={ICS_TZID}:{_stamp(row['start_date'], row['start_time'])}")
+        lines.append(f"DTEND;TZID={ICS_TZID}:{_stamp(row['end_date'] or row['start_date'], row['end_time'] or '23:59')}")
+    else:
+        end = date.fromisoformat((row["end_date"] or row["start_date"])[:10]) + timedelta(days=1)
+        lines.append(f"DTSTART;VALUE=DATE:{_day(row['start_date'])}")
+        lines.append(f"DTEND;VALUE=DATE:{end:%Y%m%d}")
+    if row["occurrences"] is not None:
+        lines += _repeat_lines(row, timed)
+    lines.append(f"SUMMARY:{_escape(row['event_name'])}")
+    lines.append(f"LOCATION:{_escape(row['location'])}")
+    if row["event_type"]:
+        lines.append(f"CATEGORIES:{_escape(row['event_type'])}")
+    lines.append("STATUS:CONFIRMED")
+    lines.append("END:VEVENT")
+    return "".join(_fold(l) for l in lines)
+
+def _repeat_lines(row, timed):
+    """RRULE/RDATE/EXDATE with values of the same type as DTSTART (RFC 5545 3.3.10)."""
+    lines = []
+    rule = row["rrule"] or ""
+    if rule and timed:
+        # with a TZID'd DTSTART, UNTIL must be UTC: the end of the local day
+        rule = ";".join(_until_utc(p) if p.startswith("UNTIL=") else p for p in rule.split(";"))
+    if rule:
+        lines.append(f"RRULE:{rule}")
+    for prop, value in (("RDATE", row["rdates"]), ("EXDATE", row["exdates"])):
+        days = [d for d in (value or "").split(",") if d]
+        if days:
+            if timed:
+                stamps = ",".join(_stamp(d, row["start_time"]) for d in days)
+                lines.append(f"{prop};TZID={ICS_TZID}:{stamps}")
+            else:
+                lines.append(f"{prop};VALUE=DATE:{','.join(_day(d) for d in days)}")
+    return lines
+
+def _until_utc(part):
+    day = datetime.strptime(part[len("UNTIL="):][:8], "%Y%m%d")
+    return "UNTIL=" + _to_utc(day.replace(hour=23, minute=59, second=59))
+
+def _vtimezone():
+    # the council's zone has no daylight saving: one STANDARD rule covers it
+    return "".join(_fold(l) for l in (
+        "BEGIN:VTIMEZONE", f"TZID:{ICS_TZID}",
+        "BEGIN:STANDARD", "DTSTART:19700101T000000",
+        f"TZOFFSETFROM:{ICS_UTC_OFFSET}", f"TZOFFSETTO:{ICS_UTC_OFFSET}",
+        "END:STANDARD", "END:VTIMEZONE"))
+
+
+# ---------- Feeds ----------
+
+def window_start(today=None):
+    """Bookings that ended before this day are left out of the feeds."""
+    return ((today or date.today()) - timedelta(days=ICS_PAST_DAYS)).isoformat()
+
+def feed(conn, venue_key=None, name="Approved bookings", today=None):
+    """
+    The VCALENDAR text for all Approved bookings (or one venue's, by
+    events.location_key) ending on or after window_start(). Returns
+    (text, number of events).
+    """
+    sql, params = _SELECT, [window_start(today)]
+    if venue_key is not None:
+        sql += " AND e.location_key = ?"
+        params.append(venue_key)
+    cur = conn.cursor()
+    cur.execute(sql + " ORDER BY e.start_date, e.id", params)
+    rows = cur.fetchall()
+
+    blocks = []
+    with _lock:
+        for row in rows:
+            sig = _signature(row)
+            hit = _vevents.get(row["id"])
+            if hit is None or hit[0] != sig:
+                hit = _vevents[row["id"]] = (sig, vevent(row))
+            blocks.append(hit[1])
+        if venue_key is None:
+            # the full feed saw every live row: forget the rest
+            seen = {row["id"] for row in rows}
+            for event_id in [i for i in _vevents if i not in seen]:
+                del _vevents[event_id]
+
+    head = "".join(_fold(l) for l in (
+        "BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Sunshine Coast Council//Event Bookings//EN",
+        "CALSCALE:GREGORIAN", "METHOD:PUBLISH", f"X-WR-CALNAME:{_escape(name)}", f"X-WR-TIMEZONE:{ICS_TZID}",
+        "REFRESH-INTERVAL;VALUE=DURATION:PT15M", "X-PUBLISHED-TTL:PT15M"))
+    return head + _vtimezone() + "".join(blocks) + "END:VCALENDAR\r\n", len(rows)
+
+def cached_feed(conn, venue_key, tag, name):
+    """feed(), reused while `tag` (e.g. table version + window start) is unchanged."""
+    hit = _feeds.get(venue_key)
+    if hit and hit[0] == tag:
+        return hit[1], hit[2]
+    text, count = feed(conn, venue_key, name)
+    with _lock:
+        if len(_feeds) >= MAX_CACHED_FEEDS:
+            _feeds.clear()
+        _feeds[venue_key] = (tag, text, count)
+    return text, count
@@ -0,0 +1,261 @@
+# modules/importer.py
+"""
+Bulk booking import (POST /admin/import, scripts/import_events.py).
+
+All rows are validated and classified first, then conflict-checked in one
+sweep-line pass per venue against each other and against the Approved
+bookings already stored. Unless it is a dry run, the accepted rows are then
+inserted in a single transaction (one COPY on Postgres, one executemany on SQLite). Every row gets an
+entry in the returned report.
+"""
+import csv, heapq, io, json, sqlite3
+from datetime import date, datetime
+
+from db import copy_rows
+from modules import calendar, conflicts, rules
+
+MAX_IMPORT_ROWS = 5000
+
+COLUMNS = (
+    "event_type", "applicant_name", "applicant_email", "applicant_phone",
+    "event_name", "location", "start_date", "end_date", "start_time", "end_time",
+    "attendance", "alcohol", "high_risk", "traffic_mgmt", "vehicle_access",
+    "amplified_sound", "noise_level", "total_days", "notes",
+    "latitude", "longitude", "arcgis_feature_id", "arcgis_feature_name", "arcgis_layer",
+    "classification", "status", "created_at",
+)
+YES_NO = ("alcohol", "high_risk", "traffic_mgmt", "vehicle_access", "amplified_sound")
+NUMBERS = {"attendance": 0, "noise_level": 0, "total_days": 1}
+REQUIRED_TEXT = ("applicant_name", "applicant_email", "applicant_phone")   # NOT NULL, may be blank
+
+# Form field names accepted as well as column names
+ALIASES = {"venue": "location", "organizer_name": "applicant_name",
+           "contact_email": "applicant_email", "contact_phone": "applicant_phone"}
+
+STATUS_MODES = ("auto", "Approved", "Pending")
+CONFLICT_MODES = ("pending", "skip", "abort")
+
+
+# ---------- Parsing ----------
+
+def parse(payload, fmt):
+    """Rows (list of dicts) from CSV text or JSON (a list, or {"rows": [...]}); ValueError if unreadable."""
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(payload)))
+    elif fmt == "json":
+        data = json.loads(payload) if isinstance(payload, str) else payload
+        rows = data.get("rows") if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ValueError("JSON must be a list of objects or {\"rows\": [...]}")
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise ValueError(f"At most {MAX_IMPORT_ROWS} rows per import")
+    return [{ALIASES.get(k.strip(), k.strip()): v for k, v in r.items() if k} for r in rows]
+
+
+# ---------- Validation ----------
+
+def _text(v):
+    return "" if v is None else str(v).strip()
+
+def _valid_time(t):
+    try:
+        datetime.strptime(t, "%H:%M")
+        return True
+    except ValueError:
+        return False
+
+def clean(raw):
+    """(row dict ready for insert minus classification/status, [errors])."""
+    errors = []
+    row = {c: _text(raw.get(c)) for c in COLUMNS}
+    for field in ("event_name", "location", "start_date"):
+        if not row[field]:
+            errors.append(f"{field} is required")
+    row["end_date"] = row["end_date"] or row["start_date"]
+    days = []
+    for field in ("start_date", "end_date"):
+        try:
+            days.append(date.fromisoformat(row[field]) if row[field] else None)
+        except ValueError:
+            errors.append(f"{field} must be YYYY-MM-DD")
+            days.append(None)
+    if all(days) and days[1] < days[0]:
+        errors.append("end_date is before start_date")
+    for field in ("start_time", "end_time"):
+        if row[field] and not _valid_time(row[field]):
+            errors.append(f"{field} must be HH:MM")
+    if (row["start_date"] == row["end_date"] and row["start_time"] and row["end_time"]
+            and row["end_time"] <= row["start_time"]):
+        errors.append("end_time must be after start_time")
+    for field in YES_NO:
+        row[field] = "Yes" if rules._is_yes(row[field]) else "No"
+    if not row["total_days"] and all(days) and days[1] >= days[0]:
+        row["total_days"] = str((days[1] - days[0]).days + 1)
+    for field, default in NUMBERS.items():
+        if row[field] and not row[field].isdigit():
+            errors.append(f"{field} must be a whole number")
+        row[field] = int(row[field]) if row[field].isdigit() else default
+    for field in ("latitude", "longitude"):
+        if row[field]:
+            try:
+                row[field] = float(row[field])
+            except ValueError:
+                errors.append(f"{field} must be a number")
+    row["event_type"] = row["event_type"] or "AdminBooking"
+    return row, errors
+
+
+# ---------- Conflict sweep ----------
+
+def _span(row):
+    return conflicts.to_iso(row["start_date"], row["start_time"] or "00:00"), \
+           conflicts.to_iso(row["end_date"], row["end_time"] or "23:59")
+
+def _existing(conn, rows):
+    """Approved bookings sharing a venue key with any row, within the batch's overall date range."""
+    fids = sorted({r["arcgis_feature_id"] for r in rows if r["arcgis_feature_id"]})
+    locs = sorted({calendar.venue_key(r["location"]) for r in rows if r["location"]})
+    first = min(r["start_date"] for r in rows)
+    last = max(r["end_date"] for r in rows)
+    found = {}
+    cur = conn.cursor()
+    for column, values in (("location_key", locs), ("arcgis_feature_id", fids)):
+        for i in range(0, len(values), 500):
+            chunk = values[i:i + 500]
+            cur.execute(f"""
+                SELECT id, location, arcgis_feature_id, start_date, end_date, start_time, end_time
+                FROM events
+                WHERE status = 'Approved' AND start_date <= ? AND end_date >= ?
+                  AND {column} IN ({','.join(['?'] * len(chunk))})
+            """, [last, first] + chunk)
+            for r in cur.fetchall():
+                found[r["id"]] = r
+    return list(found.values())
+
+def sweep(intervals):
+    """Overlapping pairs among [(start, end, ref)] (half-open), via one pass in start order."""
+    pairs = []
+    active = []   # heap of (end, n, ref)
+    for n, (start, end, ref) in enumerate(sorted(intervals, key=lambda i: (i[0], i[1]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        pairs += [(other, ref) for _, _, other in active]
+        heapq.heappush(active, (end, n, ref))
+    return pairs
+
+def _overlaps(conn, rows, valid):
+    """{row index: ({db ids}, {other row indexes})} for every valid row."""
+    by_key = {}
+    for i in valid:
+        start, end = _span(rows[i])
+        if start < end:
+            for key in conflicts.venue_keys(rows[i]["arcgis_feature_id"], rows[i]["location"]):
+                by_key.setdefault(key, []).append((start, end, ("row", i)))
+    for r in _existing(conn, [rows[i] for i in valid]) if valid else ():
+        start, end = conflicts.to_iso(r["start_date"], r["start_time"]), conflicts.to_iso(r["end_date"], r["end_time"])
+        if start and end and start < end:
+            for key in conflicts.venue_keys(r["arcgis_feature_id"], r["location"]):
+                if key in by_key:
+                    by_key[key].append((start, end, ("db", r["id"])))
+
+    found = {i: (set(), set()) for i in valid}
+    for intervals in by_key.values():
+        for a, b in sweep(intervals):
+            for this, other in ((a, b), (b, a)):
+                if this[0] == "row":
+                    found[this[1]][0 if other[0] == "db" else 1].add(other[1])
+    # recurring bookings: the index expands their occurrences over each row's window
+    if valid:
+        conflicts.INDEX.sync(conn)
+    for i in valid:
+        keys = conflicts.venue_keys(rows[i]["arcgis_feature_id"], rows[i]["location"])
+        found[i][0].update(conflicts.INDEX.overlapping(keys, *_span(rows[i]), series_only=True))
+    return found
+
+
+# ---------- Plan + apply ----------
+
+def plan(conn, raw_rows, status="auto", on_conflict="pending"):
+    """
+    Per-row report: {"row", "ok", "errors", "classification", "status",
+    "conflicts": {"events": [...], "rows": [...]}, "skipped"}. Row numbers
+    are 1-based. Earlier rows win conflicts between rows of the same import.
+    """
+    rows, report, valid = [], [], []
+    for n, raw in enumerate(raw_rows):
+        row, errors = clean(raw)
+        rows.append(row)
+        report.append({"row": n + 1, "ok": not errors, "errors": errors, "classification": None,
+                       "status": None, "conflicts": {"events": [], "rows": []}, "skipped": False, "id": None})
+        if not errors:
+            valid.append(n)
+
+    if valid:
+        columns = {c: [rows[i].get(c, "") for i in valid] for c in rules.CLASSIFY_COLUMNS}   # no series: no tag
+        for i, cls in zip(valid, rules.DEFAULT.classify_columns(columns)):
+            rows[i]["classification"] = report[i]["classification"] = cls
+
+    found = _overlaps(conn, rows, valid)
+    approved = set()
+    for i in valid:
+        db_ids, row_ids = found[i]
+        entry = report[i]
+        entry["conflicts"] = {"events": sorted(db_ids), "rows": sorted(j + 1 for j in row_ids)}
+        target = status if status != "auto" else ("Approved" if rows[i]["classification"] == "Self-assessable" else "Pending")
+        blocked = bool(db_ids) or any(j < i and j in approved for j in row_ids)
+        if target == "Approved" and blocked:
+            if on_conflict == "skip":
+                entry["skipped"] = True
+                continue
+            if on_conflict == "abort":
+                entry["ok"] = False
+                entry["errors"].append("conflicts with an approved booking")
+                continue
+            target = "Pending"
+        if target == "Approved":
+            approved.add(i)
+        rows[i]["status"] = entry["status"] = target
+    return rows, report
+
+def run(conn, raw_rows, dry_run=False, status="auto", on_conflict="pending"):
+    """
+    Plan and (unless dry_run, or any row is invalid) insert. Returns
+    (inserted ids, report). Nothing is written if any row has errors.
+    """
+    is_sqlite = isinstance(conn, sqlite3.Connection)
+    if not dry_run:
+        # hold the write lock from the conflict check through the insert
+        if is_sqlite:
+            conn.execute("BEGIN IMMEDIATE")
+        else:
+            conn.cursor().execute("LOCK TABLE events IN SHARE ROW EXCLUSIVE MODE")
+    try:
+        rows, report = plan(conn, raw_rows, status, on_conflict)
+        todo = [(i, r) for i, r in enumerate(rows) if report[i]["ok"] and not report[i]["skipped"]]
+        if dry_run or not all(e["ok"] for e in report) or not todo:
+            conn.rollback()
+            return [], report
+
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cur = conn.cursor()
+        cur.execute("SELECT COALESCE(MAX(id), 0) AS last_id FROM events")
+        last_id = cur.fetchone()["last_id"]
+        values = []
+        for _, r in todo:
+            r["created_at"] = now
+            values.append(tuple(r[c] if r[c] != "" or c in REQUIRED_TEXT else None for c in COLUMNS))
+        copy_rows(conn, "events", COLUMNS, values)   # COPY on Postgres
+        # with the table locked, this transaction's rows are exactly the ids past last_id, in order
+        cur.execute("SELECT id FROM events WHERE id > ? ORDER BY id", (last_id,))
+        ids = [r["id"] for r in cur.fetchall()]
+        for (i, _), new_id in zip(todo, ids):
+            report[i]["id"] = new_id
+        calendar.refresh(conn, ids)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    conflicts.INDEX.sync(conn)
+    return ids, report
@@ -1,28 +1,41 @@
 # modules/messaging.py
-import smtplib, ssl
+import smtplib, ssl, threading, time
+from contextlib import contextmanager
+from datetime import datetime
 from email.message import EmailMessage
 from typing import Optional
 
+from db import get_conn, insert_id
+from modules import metrics
+
 try:
     # same folder import pattern as your other modules
-    from config import EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_FROM, EMAIL_USER, EMAIL_PASS
+    from config import EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, EMAIL_SMTP_TLS, EMAIL_FROM, EMAIL_USER, EMAIL_PASS
+    from config import OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS, OUTBOX_BACKOFF_SECONDS, OUTBOX_POLL_SECONDS
 except Exception:
     # Fallbacks if config import path differs
     EMAIL_SMTP_HOST = "smtp.gmail.com"
     EMAIL_SMTP_PORT = 587
+    EMAIL_SMTP_TLS = True
     EMAIL_FROM = "Sunshine Coast Council <no-reply@scc.example>"
     EMAIL_USER = ""
     EMAIL_PASS = ""
+    OUTBOX_BATCH_SIZE = 50
+    OUTBOX_MAX_ATTEMPTS = 6
+    OUTBOX_BACKOFF_SECONDS = 30
+    OUTBOX_POLL_SECONDS = 15
 
-def _send_email(to_addr: str, subject: str, html: str, text: Optional[str] = None):
-    """
-    Low-level email sender using Gmail SMTP (TLS).
-    Set EMAIL_USER, EMAIL_PASS in environment (see config.py).
-    """
-    if not EMAIL_USER or not EMAIL_PASS:
-        print("[messaging] EMAIL_USER / EMAIL_PASS not set; skipping email send.")
+# A claimed ('Sending') row whose sender died becomes due again after this long
+OUTBOX_CLAIM_TIMEOUT = 300
+
+def _configured(warn=True):
+    if EMAIL_SMTP_TLS and (not EMAIL_USER or not EMAIL_PASS):
+        if warn:
+            print("[messaging] EMAIL_USER / EMAIL_PASS not set; skipping email send.")
         return False
+    return True
 
+def _build_message(to_addr: str, subject: str, html: str, text: Optional[str] = None):
     msg = EmailMessage()
     msg["From"] = EMAIL_FROM
     msg["To"] = to_addr
@@ -31,20 +44,185 @@ def _send_email(to_addr: str, subject: str, html: str, text: Optional[str] = Non
         text = "This message requires an HTML-capable email client."
     msg.set_content(text)
     msg.add_alternative(html, subtype="html")
+    return msg
 
-    context = ssl.create_default_context()
-    with smtplib.SMTP(EMAIL_SMTP_HOST, EMAIL_SMTP_PORT) as server:
+@contextmanager
+def _smtp_session():
+    """One connected (and, for Gmail, TLS-secured and authenticated) SMTP session."""
+    with smtplib.SMTP(EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, timeout=30) as server:
         server.ehlo()
-        server.starttls(context=context)
-        server.login(EMAIL_USER, EMAIL_PASS)
-        server.send_message(msg)
+        if EMAIL_SMTP_TLS:
+            server.starttls(context=ssl.create_default_context())
+            server.ehlo()
+        if EMAIL_USER:
+            server.login(EMAIL_USER, EMAIL_PASS)
+        yield server
+
+def _send_email(to_addr: str, subject: str, html: str, text: Optional[str] = None):
+    """
+    Low-level email sender using Gmail SMTP (TLS), bypassing the outbox.
+    Set EMAIL_USER, EMAIL_PASS in environment (see config.py).
+    """
+    if not _configured():
+        return False
+    t0 = time.perf_counter()
+    try:
+        with _smtp_session() as server:
+            server.send_message(_build_message(to_addr, subject, html, text))
+    except Exception as e:
+        metrics.SMTP_FAILURES.inc(mode="direct", error=type(e).__name__)
+        raise
+    metrics.SMTP_SECONDS.observe(time.perf_counter() - t0, mode="direct")
     return True
 
+# ---------- Outbox ----------
+
+_INSERT_OUTBOX = """
+    INSERT INTO email_outbox (to_addr, subject, html, text, status, attempts, next_attempt_at, created_at)
+    VALUES (?, ?, ?, ?, 'Pending', 0, ?, ?)
+"""
+
+def enqueue(to_addr: str, subject: str, html: str, text: Optional[str] = None):
+    """Queue an email for the background sender; returns the outbox id (None if no recipient)."""
+    if not to_addr:
+        return None
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_conn() as conn:
+        outbox_id = insert_id(conn.cursor(), _INSERT_OUTBOX, (to_addr, subject, html, text, time.time(), now))
+        conn.commit()
+    wake_sender()
+    return outbox_id
+
+def enqueue_many(conn, messages):
+    """
+    Queue [(to_addr, subject, html, text), ...] with one executemany inside the
+    caller's transaction (so they exist only if it commits). The caller
+    commits, then calls wake_sender(). Returns how many were queued.
+    """
+    now, due = datetime.now().strftime("%Y-%m-%d %H:%M:%S"), time.time()
+    rows = [(to, subject, html, text, due, now) for to, subject, html, text in messages if to]
+    if rows:
+        conn.cursor().executemany(_INSERT_OUTBOX, rows)
+    return len(rows)
+
+def wake_sender():
+    start_sender()
+    _wake.set()
+
+def _claim(limit):
+    """Atomically mark up to `limit` due rows as 'Sending' and return them."""
+    now = time.time()
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE email_outbox SET status='Sending', next_attempt_at=?
+            WHERE id IN (
+                SELECT id FROM email_outbox
+                WHERE status IN ('Pending', 'Sending') AND next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+            )
+            RETURNING id, to_addr, subject, html, text, attempts
+        """, (now + OUTBOX_CLAIM_TIMEOUT, now, limit))
+        rows = cur.fetchall()
+        conn.commit()
+    return rows
+
+def _mark_sent(outbox_id):
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_conn() as conn:
+        conn.cursor().execute(
+            "UPDATE email_outbox SET status='Sent', attempts=attempts+1, sent_at=?, last_error=NULL WHERE id=?",
+            (now, outbox_id))
+        conn.commit()
+
+def _mark_failed(row, error):
+    """Schedule a retry with exponential backoff, or dead-letter after OUTBOX_MAX_ATTEMPTS."""
+    attempts = row["attempts"] + 1
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        status, due = "Dead", time.time()
+    else:
+        status, due = "Pending", time.time() + OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    with get_conn() as conn:
+        conn.cursor().execute(
+            "UPDATE email_outbox SET status=?, attempts=?, next_attempt_at=?, last_error=? WHERE id=?",
+            (status, attempts, due, str(error)[:500], row["id"]))
+        conn.commit()
+
+def send_pending(limit: Optional[int] = None):
+    """Deliver due outbox rows over a single SMTP session. Returns (sent, failed)."""
+    if not _configured(warn=False):
+        return 0, 0
+    rows = _claim(limit or OUTBOX_BATCH_SIZE)
+    if not rows:
+        return 0, 0
+    sent = failed = 0
+    pending = list(rows)
+    try:
+        with _smtp_session() as server:
+            while pending:
+                row = pending[0]
+                t0 = time.perf_counter()
+                try:
+                    server.send_message(_build_message(row["to_addr"], row["subject"], row["html"], row["text"]))
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    # message-level rejection; the session is still usable
+                    metrics.SMTP_FAILURES.inc(mode="outbox", error=type(e).__name__)
+                    _mark_failed(row, e)
+                    failed += 1
+                else:
+                    metrics.SMTP_SECONDS.observe(time.perf_counter() - t0, mode="outbox")
+                    _mark_sent(row["id"])
+                    sent += 1
+                pending.pop(0)
+    except Exception as e:
+        # connection/auth failure: everything not yet delivered is retried later
+        print("[messaging] SMTP batch failed:", e)
+        metrics.SMTP_FAILURES.inc(len(pending), mode="outbox", error=type(e).__name__)
+        for row in pending:
+            _mark_failed(row, e)
+        failed += len(pending)
+    return sent, failed
+
+# ---------- Background sender (one daemon thread per worker) ----------
+_wake = threading.Event()
+_sender = None
+_sender_lock = threading.Lock()
+
+def start_sender():
+    """Start this worker's sender (at worker boot; see gunicorn.conf.py). It drains what is already due first."""
+    global _sender
+    with _sender_lock:
+        if _sender is not None and _sender.is_alive():
+            return
+        if not _configured(warn=False):
+            print("[messaging] EMAIL_USER / EMAIL_PASS not set; queued emails wait in the outbox.")
+        _sender = threading.Thread(target=_sender_loop, name="email-outbox", daemon=True)
+        _sender.start()
+
+def _sender_loop():
+    while True:
+        try:
+            while True:
+                sent, failed = send_pending()
+                if not sent and not failed:
+                    break
+        except Exception as e:
+            print("[messaging] outbox sender error:", e)
+        _wake.wait(OUTBOX_POLL_SECONDS)
+        _wake.clear()
+
 # ---------- High-level helpers ----------
 
 def send_submission_receipt(to_addr: str, *, event_name: str, applicant_name: str,
                             start_date: str, start_time: str, end_date: str, end_time: str,
                             venue: str, classification: str, conflict: bool):
+    return enqueue(to_addr, *submission_receipt_message(
+        event_name=event_name, applicant_name=applicant_name, start_date=start_date, start_time=start_time,
+        end_date=end_date, end_time=end_time, venue=venue, classification=classification, conflict=conflict))
+
+def submission_receipt_message(*, event_name: str, applicant_name: str, start_date: str, start_time: str,
+                               end_date: str, end_time: str, venue: str, classification: str, conflict: bool):
+    """(subject, html, text) of the receipt sent when an application is submitted."""
     subject = f"Your event application: {event_name}"
     status_line = (
         "Self-assessable (Reserved)" if (classification == "Self-assessable" and not conflict)
@@ -74,11 +252,18 @@ Venue: {venue or '-'}
 When: {start_date} {start_time or ''} – {end_date or start_date} {end_time or ''}
 Status: {status_line}
 """
-    return _send_email(to_addr, subject, html, text)
+    return subject, html, text
 
 def send_status_update(to_addr: str, *, event_name: str, new_status: str,
                        start_date: str, start_time: str, end_date: str, end_time: str, venue: str,
                        reason: Optional[str] = None):
+    return enqueue(to_addr, *status_update_message(
+        event_name=event_name, new_status=new_status, start_date=start_date, start_time=start_time,
+        end_date=end_date, end_time=end_time, venue=venue, reason=reason))
+
+def status_update_message(*, event_name: str, new_status: str, start_date: str, start_time: str,
+                          end_date: str, end_time: str, venue: str, reason: Optional[str] = None):
+    """(subject, html, text) of a status-change email."""
     subject = f"Update: '{event_name}' is {new_status}"
     badge_color = {
         "Approved": "#2e7d32",
@@ -105,7 +290,7 @@ Venue: {venue or '-'}
 When: {start_date} {start_time or ''} – {end_date or start_date} {end_time or ''}
 {('Notes: ' + reason) if reason else ''}
 """
-    return _send_email(to_addr, subject, html, text)
+    return subject, html, text
 
 # simple HTML escape util
 def escape(s):
@@ -0,0 +1,233 @@
+# modules/metrics.py
+"""
+In-process counters and histograms rendered as Prometheus text at /metrics.
+
+Multi-worker (gunicorn) mode: set METRICS_DIR to a directory shared by the
+workers and emptied before the server starts (gunicorn.conf.py does this).
+Each worker writes a snapshot of its own values to metrics-<pid>.json every
+METRICS_FLUSH_SECONDS; a scrape of any worker sums every snapshot, so the
+totals are the same whichever worker answers.
+"""
+import atexit, glob, json, os, re, threading, time
+
+from flask import g, request
+
+try:
+    from config import METRICS_DIR, METRICS_FLUSH_SECONDS
+except Exception:
+    METRICS_DIR = ""
+    METRICS_FLUSH_SECONDS = 5.0
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+SMTP_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}   # label values tuple -> value
+        _registry[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        _ensure_flusher()
+
+
+class Histogram(_Metric):
+    """Cumulative buckets are computed at render time; values hold [per-bucket counts..., sum, count]."""
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with _lock:
+            v = self.values.get(key)
+            if v is None:
+                v = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            v[i] += 1
+            v[-2] += value
+            v[-1] += 1
+        _ensure_flusher()
+
+
+# ---------- The app's metrics ----------
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Flask request latency by endpoint",
+                            ("endpoint", "method", "status"))
+QUERY_SECONDS = Histogram("db_query_duration_seconds", "Database statement latency by verb",
+                          ("verb",), QUERY_BUCKETS)
+SMTP_SECONDS = Histogram("smtp_send_duration_seconds", "Time to hand one message to the SMTP server",
+                         ("mode",), SMTP_BUCKETS)
+SMTP_FAILURES = Counter("smtp_send_failures_total", "Messages the SMTP server or connection failed",
+                        ("mode", "error"))
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes of uploaded files stored", ("deduplicated",))
+UPLOAD_SECONDS = Histogram("upload_store_duration_seconds", "Time to move an upload into the store")
+CONFLICT_CHECKS = Counter("conflict_checks_total", "Conflict checks by outcome", ("result",))
+
+_VERB_RE = re.compile(r"\s*(\w+)")
+
+def observe_query(sql, seconds):
+    m = _VERB_RE.match(sql or "")
+    verb = m.group(1).lower() if m else "other"
+    if verb not in ("select", "insert", "update", "delete", "with"):
+        verb = "other"
+    QUERY_SECONDS.observe(seconds, verb=verb)
+
+
+# ---------- Flask hooks ----------
+
+def init_app(app):
+    """Time every request and register the DB query hook."""
+    import db
+    db.set_query_observer(observe_query)
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_done(resp):
+        _record_request(resp.status_code)
+        return resp
+
+    @app.teardown_request
+    def _metrics_error(exc):
+        if exc is not None:
+            _record_request(500)
+
+def _record_request(status):
+    start = g.pop("_metrics_start", None)
+    if start is None:
+        return
+    endpoint = request.url_rule.endpoint if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, method=request.method, status=status)
+
+
+# ---------- Snapshots (multiprocess mode) ----------
+
+_flusher_pid = None
+
+def _snapshot():
+    with _lock:
+        return {name: {json.dumps(k): (list(v) if isinstance(v, list) else v) for k, v in m.values.items()}
+                for name, m in _registry.items()}
+
+def flush():
+    """Write this process's values to METRICS_DIR (atomically)."""
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(_snapshot(), fh)
+    os.replace(tmp, path)
+
+def _ensure_flusher():
+    global _flusher_pid
+    if not METRICS_DIR or _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            flush()
+        except Exception as e:
+            print("[metrics] snapshot write failed:", e)
+
+def _after_fork():
+    # a forked worker starts from zero; the parent's values are its own
+    global _flusher_pid
+    _flusher_pid = None
+    for m in _registry.values():
+        m.values = {}
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(lambda: METRICS_DIR and flush())
+
+
+# ---------- Rendering ----------
+
+def _collect():
+    """{name: {label key: value}} summed over every worker's snapshot (or just this process)."""
+    if not METRICS_DIR:
+        return _snapshot()
+    flush()   # our own values, fresh
+    totals = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                snap = json.load(fh)
+        except (OSError, ValueError):
+            continue   # a worker mid-write or gone
+        for name, series in snap.items():
+            dest = totals.setdefault(name, {})
+            for key, v in series.items():
+                if isinstance(v, list):
+                    cur = dest.setdefault(key, [0] * len(v))
+                    dest[key] = [a + b for a, b in zip(cur, v)]
+                else:
+                    dest[key] = dest.get(key, 0) + v
+    return totals
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+def render():
+    """Prometheus text exposition format (version 0.0.4)."""
+    data = _collect()
+    lines = []
+    for name, m in _registry.items():
+        lines.append(f"# HELP {name} {m.help}")
+        lines.append(f"# TYPE {name} {m.kind}")
+        for key, v in sorted(data.get(name, {}).items()):
+            values = json.loads(key)
+            if m.kind == "counter":
+                lines.append(f"{name}{_labels(m.labelnames, values)} {_num(v)}")
+                continue
+            running = 0
+            for bound, n in zip(m.buckets + (float("inf"),), v):
+                running += n
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{name}_bucket{_labels(m.labelnames, values, le)} {running}")
+            lines.append(f"{name}_sum{_labels(m.labelnames, values)} {_num(v[-2])}")
+            lines.append(f"{name}_count{_labels(m.labelnames, values)} {v[-1]}")
+    return "\n".join(lines) + "\n"
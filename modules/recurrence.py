@@ -0,0 +1,247 @@
+# modules/recurrence.py
+"""
+Recurring bookings: one events row (the first occurrence) plus an
+event_recurrences row holding an RRULE subset (FREQ=DAILY|WEEKLY, INTERVAL,
+BYDAY, UNTIL, COUNT), extra dates and excluded dates. Occurrences are never
+stored; Recurrence.dates() generates them on demand, only as far as the
+window being asked about.
+"""
+import heapq
+from itertools import islice
+from datetime import date, timedelta
+
+MAX_OCCURRENCES = 366
+MAX_SERIES_DAYS = 731    # a series may run at most two years
+DEFAULT_SERIES_DAYS = 365   # a rule with neither UNTIL nor COUNT stops after a year
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQS = ("DAILY", "WEEKLY")
+
+# Joined onto events (LEFT JOIN event_recurrences r ON r.event_id = e.id) wherever series matter
+COLUMNS = "r.rrule, r.rdates, r.exdates, r.first_date, r.last_date, r.occurrences"
+
+
+def _date(value, field):
+    value = (value or "").strip()
+    try:
+        if len(value) == 8 and value.isdigit():   # RRULE UNTIL=YYYYMMDD
+            return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise ValueError(f"{field} must be a date (YYYY-MM-DD)")
+
+def _dates(value, field):
+    """A comma separated string or a list of dates -> sorted set of dates."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return sorted({_date(v, field) for v in (value or ()) if str(v).strip()})
+
+
+class Recurrence:
+    """When a booking starting on `start` (lasting `length` extra days) repeats."""
+    __slots__ = ("start", "length", "freq", "interval", "byday", "until", "count", "rdates", "exdates")
+
+    def __init__(self, start, length=0, freq=None, interval=1, byday=(), until=None, count=None,
+                 rdates=(), exdates=()):
+        self.start = start
+        self.length = length
+        self.freq = freq
+        self.interval = interval
+        self.byday = tuple(sorted(byday)) or ((start.weekday(),) if freq == "WEEKLY" else ())
+        self.until = until
+        self.count = count
+        self.rdates = tuple(d for d in rdates if d > start)
+        self.exdates = frozenset(exdates)
+
+    # ---------- Construction ----------
+
+    @classmethod
+    def parse(cls, start_date, end_date, rrule="", rdates="", exdates="", until=None):
+        """
+        Validate a rule for a booking spanning start_date..end_date. `until` is
+        the form's plain "repeat until" date, used when the rule has no UNTIL.
+        ValueError on anything malformed or too long.
+        """
+        rec = cls._read(start_date, end_date, rrule, rdates, exdates, until)
+        every = list(islice(rec.dates(), MAX_OCCURRENCES + 1))   # stop early on a runaway COUNT
+        if len(every) > MAX_OCCURRENCES:
+            raise ValueError(f"A series may have at most {MAX_OCCURRENCES} occurrences")
+        if every and (every[-1] - rec.start).days >= MAX_SERIES_DAYS:
+            raise ValueError(f"A series may run at most {MAX_SERIES_DAYS} days")
+        return rec
+
+    @classmethod
+    def _read(cls, start_date, end_date, rrule="", rdates="", exdates="", until=None):
+        """The rule's fields, checked for syntax only (no expansion)."""
+        start = _date(start_date, "start_date")
+        length = max(0, (_date(end_date or start_date, "end_date") - start).days)
+        parts = {}
+        for part in (rrule or "").upper().replace("RRULE:", "").split(";"):
+            if part.strip():
+                key, _, value = part.partition("=")
+                parts[key.strip()] = value.strip()
+        freq = parts.get("FREQ") or None
+        if freq and freq not in FREQS:
+            raise ValueError("Only daily and weekly repeats are supported")
+        if not freq and set(parts) - {"FREQ"}:
+            raise ValueError("rrule needs a FREQ")
+        try:
+            interval = int(parts.get("INTERVAL") or 1)
+            count = int(parts["COUNT"]) if parts.get("COUNT") else None
+        except ValueError:
+            raise ValueError("INTERVAL and COUNT must be whole numbers")
+        if interval < 1 or (count is not None and count < 1):
+            raise ValueError("INTERVAL and COUNT must be at least 1")
+        byday = set()
+        for day in (parts.get("BYDAY") or "").split(","):
+            if day.strip():
+                if day.strip() not in WEEKDAYS:
+                    raise ValueError(f"Unknown BYDAY value: {day.strip()}")
+                byday.add(WEEKDAYS.index(day.strip()))
+        if byday and freq != "WEEKLY":
+            raise ValueError("BYDAY needs FREQ=WEEKLY")
+        until_date = _date(parts["UNTIL"], "UNTIL") if parts.get("UNTIL") else (
+            _date(until, "repeat_until") if until else None)
+        if freq and until_date is None and count is None:
+            until_date = start + timedelta(days=DEFAULT_SERIES_DAYS - 1)
+        if until_date and until_date < start:
+            raise ValueError("The repeat end is before the first occurrence")
+
+        return cls(start, length, freq, interval, byday, until_date, count,
+                   _dates(rdates, "rdates"), _dates(exdates, "exdates"))
+
+    @classmethod
+    def from_form(cls, form):
+        """Recurrence from submitted rrule/rdates/exdates/repeat_until fields, or None if it doesn't repeat."""
+        rrule = form.get("rrule") or ""
+        rdates = form.get("rdates") or ""
+        if not (rrule.strip() or (rdates.strip() if isinstance(rdates, str) else rdates)):
+            return None
+        rec = cls.parse(form.get("start_date"), form.get("end_date"), rrule, rdates,
+                        form.get("exdates") or "", form.get("repeat_until"))
+        return rec if rec.repeats() else None
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Recurrence for an events row joined with COLUMNS, or None for a one-off
+        booking. Stored rules were validated on submit, so nothing is expanded
+        here; callers expand only the window they ask about.
+        """
+        if row["occurrences"] is None:
+            return None
+        try:
+            return cls._read(row["start_date"], row["end_date"], row["rrule"], row["rdates"], row["exdates"])
+        except ValueError:
+            return None   # stored before a rule change; treat as the one booking
+
+    def to_row(self):
+        """(rrule, rdates, exdates, first_date, last_date, occurrences) for event_recurrences."""
+        every = list(self.dates())
+        parts = []
+        if self.freq:
+            parts.append(f"FREQ={self.freq}")
+            if self.interval != 1:
+                parts.append(f"INTERVAL={self.interval}")
+            if self.freq == "WEEKLY":
+                parts.append("BYDAY=" + ",".join(WEEKDAYS[d] for d in self.byday))
+            parts.append(f"COUNT={self.count}" if self.count else f"UNTIL={self.until:%Y%m%d}")
+        last = every[-1] if every else self.start
+        return (";".join(parts), ",".join(d.isoformat() for d in self.rdates),
+                ",".join(d.isoformat() for d in sorted(self.exdates)),
+                self.start.isoformat(), (last + timedelta(days=self.length)).isoformat(), len(every))
+
+    # ---------- Expansion ----------
+
+    def repeats(self):
+        return bool(self.freq or self.rdates)
+
+    def _rule_dates(self, skip_to=None):
+        """Dates the rule generates, ascending; jumps ahead to `skip_to` when COUNT doesn't need the prefix."""
+        yield self.start
+        if not self.freq:
+            return
+        n = 1
+        if self.freq == "DAILY":
+            step = self.interval
+            k = 1
+            if skip_to and self.count is None and skip_to > self.start:
+                k = max(1, (skip_to - self.start).days // step)
+            while True:
+                d = self.start + timedelta(days=k * step)
+                if (self.until and d > self.until) or (self.count and n >= self.count):
+                    return
+                yield d
+                n += 1
+                k += 1
+        monday = self.start - timedelta(days=self.start.weekday())
+        week = 0
+        if skip_to and self.count is None and skip_to > self.start:
+            week = max(0, (skip_to - monday).days // 7 // self.interval * self.interval)
+        while True:
+            for wd in self.byday:
+                d = monday + timedelta(days=week * 7 + wd)
+                if d <= self.start:
+                    continue
+                if (self.until and d > self.until) or (self.count and n >= self.count):
+                    return
+                yield d
+                n += 1
+            week += self.interval
+
+    def dates(self, first=None, last=None):
+        """
+        Occurrence start dates, ascending, of occurrences touching the days
+        [first, last] (either bound optional). Lazy: stops past `last`.
+        """
+        skip_to = first - timedelta(days=self.length) if first else None
+        seen = None
+        for d in heapq.merge(self._rule_dates(skip_to), self.rdates):
+            if d == seen:
+                continue
+            seen = d
+            if last and d > last:
+                return
+            if d in self.exdates or (first and d + timedelta(days=self.length) < first):
+                continue
+            yield d
+
+    def spans(self, first=None, last=None):
+        """(start_date, end_date) ISO strings of each occurrence touching [first, last]."""
+        first = date.fromisoformat(first[:10]) if first else None
+        last = date.fromisoformat(last[:10]) if last else None
+        for d in self.dates(first, last):
+            yield d.isoformat(), (d + timedelta(days=self.length)).isoformat()
+
+    def span_days(self):
+        """Days from the first occurrence's start to the last one's end, inclusive."""
+        last = self.start
+        for last in self.dates():
+            pass
+        return (last - self.start).days + self.length + 1
+
+    def total_days(self):
+        return sum(1 for _ in self.dates()) * (self.length + 1)
+
+    def non_consecutive(self):
+        """True if no occurrence runs into the next one (on the same or the following day)."""
+        prev = None
+        for d in self.dates():
+            if prev and (d - prev).days <= self.length + 1:
+                return False
+            prev = d
+        return True
+
+
+def spans(row, first=None, last=None):
+    """(start_date, end_date) of each occurrence of an events row (joined with COLUMNS) touching [first, last]."""
+    rec = Recurrence.from_row(row) if "occurrences" in row.keys() else None
+    if rec is None:
+        return [(row["start_date"], row["end_date"] or row["start_date"])]
+    return list(rec.spans(first, last))
+
+def save(conn, event_id, rec):
+    """Store a series rule for a just-inserted event (same transaction)."""
+    conn.cursor().execute(
+        "INSERT INTO event_recurrences (event_id, rrule, rdates, exdates, first_date, last_date, occurrences) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", (event_id,) + rec.to_row())
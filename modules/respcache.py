@@ -0,0 +1,82 @@
+# modules/respcache.py
+"""
+Per-worker cache for responses that only change with a deploy (the form page,
+the venue/event-type catalogue). Each body is rendered once, compressed once
+per encoding (gzip; brotli too if the `brotli` package is installed), and
+served with a strong ETag from its content hash and a long Cache-Control, so
+browsers and the CDN revalidate with If-None-Match and mostly get 304s.
+"""
+import gzip, hashlib, threading
+
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from config import CATALOG_MAX_AGE
+except Exception:
+    CATALOG_MAX_AGE = 86400
+
+# preferred first when the client rates them equally
+_ENCODINGS = ("br", "gzip", "identity")
+
+_cache = {}
+_lock = threading.Lock()
+
+
+class _Entry:
+    __slots__ = ("digest", "mimetype", "variants")
+
+    def __init__(self, body, mimetype):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.mimetype = mimetype
+        self.variants = {"identity": body}
+        packed = {"gzip": gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            packed["br"] = brotli.compress(body, quality=11)
+        for encoding, data in packed.items():
+            if len(data) < len(body):
+                self.variants[encoding] = data
+
+    def encoding_for(self, accept):
+        best, best_q = "identity", accept.quality("identity") or 0.001   # identity unless refused outright
+        for encoding in _ENCODINGS[:-1]:
+            q = accept.quality(encoding)
+            if encoding in self.variants and q > best_q:
+                best, best_q = encoding, q
+        return best
+
+
+def cached(key, build, mimetype):
+    """
+    Response for `key`, calling build() (-> str or bytes) only the first time
+    in this worker. Answers 304 when If-None-Match carries the variant's ETag.
+    Debug mode renders fresh every time so template edits show up.
+    """
+    if current_app.debug:
+        return Response(build(), mimetype=mimetype)
+    entry = _cache.get(key)
+    if entry is None:
+        entry = _Entry(build(), mimetype)
+        with _lock:
+            entry = _cache.setdefault(key, entry)
+
+    encoding = entry.encoding_for(request.accept_encodings)
+    resp = Response(entry.variants[encoding], mimetype=entry.mimetype)
+    resp.set_etag(entry.digest if encoding == "identity" else f"{entry.digest}-{encoding}")
+    if encoding != "identity":
+        resp.content_encoding = encoding
+    resp.vary.add("Accept-Encoding")
+    resp.cache_control.public = True
+    resp.cache_control.max_age = CATALOG_MAX_AGE
+    resp.cache_control.must_revalidate = True
+    return resp.make_conditional(request)
+
+def clear():
+    with _lock:
+        _cache.clear()
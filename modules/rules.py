@@ -0,0 +1,202 @@
+# modules/rules.py
+"""
+Self-assessable event rules, declared once and shared by
+app.classify_event, modules.eligibility.check and the batch
+re-classifier (scripts/reclassify.py).
+"""
+
+# Council-set thresholds; override per RuleSet (e.g. to preview a policy change)
+THRESHOLDS = {
+    "max_attendance": 200,   # fewer than this many attendees at any one time
+    "max_noise_db": 95,      # amplified sound at or below this (dBC @ 15 m)
+    "max_days": 2,           # consecutive days
+    "earliest_start": "05:30",
+    "earliest_amplified_start": "07:00",
+    "latest_finish": "22:00",
+}
+
+DURATION_TAGS = ("<=2 days", "<=12 days")
+
+# A repeating booking counts as "≤12 non-consecutive days in 12 months" when
+# its occurrences never run into each other and stay within these limits.
+MAX_SERIES_DAYS = 12
+MAX_SERIES_SPAN_DAYS = 365
+
+# key, description, op, fields, classifies
+#   classifies=True rules decide Self-assessable vs Assessable; the rest are
+#   extra eligibility checks the applicant sees on the checklist.
+RULES = (
+    ("attendance", "Expects <{max_attendance} attendees at any one time",
+     "below", ("attendance", "max_attendance"), True),
+    ("infrastructure", "No infrastructure needing building approval and no ground piercing devices",
+     "all_no", ("building_approval", "ground_piercing"), False),
+    ("traffic", "No traffic management or road/carpark closures",
+     "all_no", ("traffic_mgmt",), True),
+    ("duration", "Runs ≤{max_days} consecutive days OR ≤12 non-consecutive days in 12 months",
+     "duration", ("total_days", "series_tag", "max_days"), True),
+    ("high_risk", "No firearms, fireworks, or other high-risk activities",
+     "all_no", ("high_risk",), True),
+    ("start_time", "Does not start before 5:30 am (or 7:00 am if amplified)",
+     "starts_after", ("start_time", "amplified_sound"), False),
+    ("finish_time", "Does not finish after 10:00 pm",
+     "finishes_by", ("end_time", "latest_finish"), False),
+    ("alcohol", "No service or consumption of alcohol",
+     "all_no", ("alcohol",), True),
+    ("noise", "No amplified noise >{max_noise_db} dBC @ 15 m",
+     "quiet", ("amplified_sound", "noise_level", "max_noise_db"), True),
+    ("vehicle", "No vehicle/machinery access to public place",
+     "all_no", ("vehicle_access",), True),
+    ("verge", "No traversing over verge/kerb/pathway with vehicles",
+     "all_no", ("verge_traverse",), False),
+)
+
+# Event columns the classifying rules read (all exist on `events`), plus
+# series_tag, which is never taken from a request: series_tag(rec) derives it
+# from the parsed/stored recurrence ("" for one-off bookings).
+CLASSIFY_COLUMNS = ("attendance", "alcohol", "high_risk", "traffic_mgmt", "vehicle_access",
+                    "amplified_sound", "noise_level", "total_days", "series_tag")
+
+
+def _is_yes(v): return str(v).strip().lower() in ("yes","true","1","y")
+
+def _int(v, default=0):
+    try:
+        return int(v or default)
+    except (TypeError, ValueError):
+        return default
+
+def _days(v):
+    return _int(v) or 1   # an event runs at least one day
+
+
+# ---------- Ops: each returns (row predicate, column predicate) ----------
+
+def _op_below(t, field, limit):
+    limit = t[limit]
+    return (lambda r: _int(r.get(field)) < limit,
+            lambda c: [_int(v) < limit for v in c[field]])
+
+def _op_all_no(t, *fields):
+    def row(r):
+        return not any(_is_yes(r.get(f, "No")) for f in fields)
+    def cols(c):
+        return [not any(_is_yes(v) for v in vs) for vs in zip(*(c[f] for f in fields))]
+    return row, cols
+
+def _op_duration(t, days_field, tag_field, limit):
+    limit = t[limit]
+    def row(r):
+        return (r.get(tag_field) or "") in DURATION_TAGS or _days(r.get(days_field)) <= limit
+    def cols(c):
+        tags = c.get(tag_field) or [""] * len(c[days_field])
+        return [(tag or "") in DURATION_TAGS or _days(v) <= limit for v, tag in zip(c[days_field], tags)]
+    return row, cols
+
+def _op_starts_after(t, time_field, amplified_field):
+    def row(r):
+        start = r.get(time_field) or ""
+        earliest = t["earliest_amplified_start"] if _is_yes(r.get(amplified_field, "No")) else t["earliest_start"]
+        return bool(start) and start >= earliest
+    return row, None
+
+def _op_finishes_by(t, time_field, limit):
+    limit = t[limit]
+    def row(r):
+        finish = r.get(time_field) or r.get("finish_time") or ""
+        return not finish or finish <= limit
+    return row, None
+
+def _op_quiet(t, amplified_field, level_field, limit):
+    limit = t[limit]
+    return (lambda r: not _is_yes(r.get(amplified_field, "No")) or _int(r.get(level_field)) <= limit,
+            lambda c: [not _is_yes(a) or _int(n) <= limit for a, n in zip(c[amplified_field], c[level_field])])
+
+_OPS = {
+    "below": _op_below,
+    "all_no": _op_all_no,
+    "duration": _op_duration,
+    "starts_after": _op_starts_after,
+    "finishes_by": _op_finishes_by,
+    "quiet": _op_quiet,
+}
+
+
+class RuleSet:
+    """RULES compiled against one set of thresholds."""
+
+    def __init__(self, thresholds=None):
+        self.thresholds = dict(THRESHOLDS, **(thresholds or {}))
+        self._compiled = []
+        for key, text, op, fields, classifies in RULES:
+            row, cols = _OPS[op](self.thresholds, *fields)
+            self._compiled.append((key, text.format(**self.thresholds), row, cols, classifies))
+        self._classifiers = [(row, cols) for _, _, row, cols, classifies in self._compiled if classifies]
+
+    def check(self, form):
+        """Full eligibility checklist: (all_ok, [{"check": bool, "text": str}, ...])."""
+        rules = [{"check": bool(row(form)), "text": text} for _, text, row, _, _ in self._compiled]
+        return all(r["check"] for r in rules), rules
+
+    def classify(self, form):
+        if all(row(form) for row, _ in self._classifiers):
+            return "Self-assessable"
+        return "Assessable"
+
+    def classify_columns(self, columns):
+        """
+        Batch mode: `columns` maps each of CLASSIFY_COLUMNS to a list of values
+        (one per row); returns the classification of every row. Each rule runs
+        once over its columns rather than once per row.
+        """
+        n = len(columns[CLASSIFY_COLUMNS[0]])
+        ok = [True] * n
+        for _, cols in self._classifiers:
+            ok = [a and b for a, b in zip(ok, cols(columns))]
+        return ["Self-assessable" if v else "Assessable" for v in ok]
+
+
+DEFAULT = RuleSet()
+
+def series_tag(rec):
+    """The duration tag a recurrence (modules.recurrence.Recurrence or None) earns, else ""."""
+    if rec is None or not rec.non_consecutive():
+        return ""
+    if rec.total_days() <= MAX_SERIES_DAYS and rec.span_days() <= MAX_SERIES_SPAN_DAYS:
+        return DURATION_TAGS[1]
+    return ""
+
+def classify(form):
+    return DEFAULT.classify(form)
+
+def check(form):
+    return DEFAULT.check(form)
+
+
+def reclassify(conn, ruleset, statuses=("Pending",), batch_size=5000):
+    """
+    Re-evaluate stored events (optionally only those in `statuses`) under
+    `ruleset`. Returns [(id, old_classification, new_classification), ...]
+    for the rows whose classification would flip.
+    """
+    from modules import recurrence
+    stored = [c for c in CLASSIFY_COLUMNS if c != "series_tag"]
+    sql = (f"SELECT e.id, e.classification, e.start_date, e.end_date, {', '.join('e.' + c for c in stored)}, "
+           f"{recurrence.COLUMNS} FROM events e LEFT JOIN event_recurrences r ON r.event_id = e.id")
+    params = []
+    if statuses:
+        sql += f" WHERE e.status IN ({','.join(['?'] * len(statuses))})"
+        params = list(statuses)
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    names = ["id", "classification", *stored]
+    flips = []
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            break
+        columns = {name: [r[name] for r in rows] for name in names}
+        # the same recurrence-derived tag /submit classified with
+        columns["series_tag"] = [series_tag(recurrence.Recurrence.from_row(r)) for r in rows]
+        new = ruleset.classify_columns(columns)
+        flips += [(i, old, cls) for i, old, cls in zip(columns["id"], columns["classification"], new) if old != cls]
+    return flips
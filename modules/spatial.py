@@ -0,0 +1,103 @@
+# modules/spatial.py
+"""
+Radius queries over event coordinates. A bounding box narrows candidates
+through the spatial index (SQLite R*Tree `events_rtree`, or PostGIS
+`geog` on Postgres); exact great-circle distance then filters the box.
+"""
+import math, sqlite3
+
+from modules.conflicts import to_iso
+
+EARTH_RADIUS_M = 6371008.8
+
+_rtree = None
+_geog = None
+
+
+def point(lat, lon):
+    """(lat, lon) as floats, or None if either is missing or out of range."""
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def bbox(lat, lon, radius_m):
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle."""
+    dlat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def nearby(conn, lat, lon, radius_m, start=None, end=None, statuses=("Approved",), limit=None):
+    """
+    Events within `radius_m` metres of (lat, lon), optionally only those
+    overlapping [start, end) (ISO 'YYYY-MM-DDTHH:MM:SS') and in `statuses`.
+    Returns dicts sorted by distance, each with a `distance_m`.
+    """
+    min_lat, max_lat, min_lon, max_lon = bbox(lat, lon, radius_m)
+    cols = "e.id, e.event_name, e.location, e.status, e.start_date, e.end_date, e.start_time, e.end_time, e.latitude, e.longitude"
+    params = []
+    is_sqlite = isinstance(conn, sqlite3.Connection)
+    if not is_sqlite and _has_geog(conn):
+        sql = f"SELECT {cols} FROM events e WHERE ST_DWithin(e.geog, ST_SetSRID(ST_MakePoint(?, ?), 4326)::geography, ?)"
+        params += [lon, lat, radius_m]
+    elif is_sqlite and _has_rtree(conn):
+        sql = (f"SELECT {cols} FROM events_rtree r JOIN events e ON e.id = r.id"
+               " WHERE r.max_lat >= ? AND r.min_lat <= ? AND r.max_lon >= ? AND r.min_lon <= ?")
+        params += [min_lat, max_lat, min_lon, max_lon]
+    else:
+        sql = f"SELECT {cols} FROM events e WHERE e.latitude BETWEEN ? AND ? AND e.longitude BETWEEN ? AND ?"
+        params += [min_lat, max_lat, min_lon, max_lon]
+    if statuses:
+        sql += f" AND e.status IN ({','.join(['?'] * len(statuses))})"
+        params += list(statuses)
+    if start and end:
+        # whole days first (indexed columns); exact times are checked below
+        sql += " AND e.start_date <= ? AND e.end_date >= ?"
+        params += [end[:10], start[:10]]
+
+    cur = conn.cursor()
+    cur.execute(sql, params)
+    hits = []
+    for r in cur.fetchall():
+        p = point(r["latitude"], r["longitude"])
+        if not p:
+            continue
+        distance = haversine_m(lat, lon, *p)
+        if distance > radius_m:
+            continue
+        ev_start, ev_end = to_iso(r["start_date"], r["start_time"]), to_iso(r["end_date"], r["end_time"])
+        if start and end and not (ev_start < end and ev_end > start):
+            continue
+        hits.append({
+            "id": r["id"], "event_name": r["event_name"], "location": r["location"], "status": r["status"],
+            "start": ev_start, "end": ev_end, "latitude": p[0], "longitude": p[1],
+            "distance_m": round(distance, 1),
+        })
+    hits.sort(key=lambda h: (h["distance_m"], h["id"]))
+    return hits[:limit] if limit else hits
+
+
+def _has_rtree(conn):
+    global _rtree
+    if _rtree is None:
+        _rtree = bool(conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_rtree'").fetchone())
+    return _rtree
+
+def _has_geog(conn):
+    global _geog
+    if _geog is None:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM information_schema.columns WHERE table_name = 'events' AND column_name = 'geog'")
+        _geog = cur.fetchone() is not None
+    return _geog
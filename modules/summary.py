@@ -0,0 +1,73 @@
+# modules/summary.py
+"""
+Dashboard counters: event_summary holds one row per (ISO week of start
+date, status, classification, event type, venue) with its booking count.
+Triggers (migration 014) keep it current on every insert, status change and
+delete; rebuild() recomputes it from events after edits made around them.
+"""
+import sqlite3
+from datetime import date, timedelta
+
+MAX_SUMMARY_WEEKS = 53
+
+# Monday of start_date's ISO week, as the migration's triggers compute it
+_SQLITE_WEEK = ("COALESCE(date(substr(start_date, 1, 10), '-' || "
+                "((CAST(strftime('%w', substr(start_date, 1, 10)) AS INTEGER) + 6) % 7) || ' days'), '')")
+_PG_WEEK = "iso_week_start(start_date)"
+
+_REBUILD = """
+  INSERT INTO event_summary (week, status, classification, event_type, venue_key, venue, bookings)
+  SELECT {week}, COALESCE(status, ''), COALESCE(classification, ''), COALESCE(event_type, ''),
+         COALESCE(lower(trim(location)), ''), MAX(location), COUNT(*)
+  FROM events
+  GROUP BY 1, 2, 3, 4, 5
+"""
+
+
+def week_start(day=None):
+    """Monday of the ISO week containing `day` (a date or YYYY-MM-DD; default today)."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+def week_label(monday):
+    year, week, _ = date.fromisoformat(monday).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def rebuild(conn):
+    """Recompute every counter from events (caller commits). Returns the number of groups."""
+    week = _SQLITE_WEEK if isinstance(conn, sqlite3.Connection) else _PG_WEEK
+    cur = conn.cursor()
+    cur.execute("DELETE FROM event_summary")
+    cur.execute(_REBUILD.format(week=week))
+    cur.execute("SELECT COUNT(*) AS n FROM event_summary")
+    return cur.fetchone()["n"]
+
+def groups(conn, first_week, last_week, **filters):
+    """
+    Counter rows for the weeks starting first_week..last_week (Mondays,
+    YYYY-MM-DD), optionally narrowed by status, classification, event_type
+    or venue_key.
+    """
+    sql = """
+      SELECT week, status, classification, event_type, venue_key, venue, bookings
+      FROM event_summary WHERE week >= ? AND week <= ?
+    """
+    params = [first_week, last_week]
+    for column in ("status", "classification", "event_type", "venue_key"):
+        if filters.get(column):
+            sql += f" AND {column} = ?"
+            params.append(filters[column])
+    cur = conn.cursor()
+    cur.execute(sql + " ORDER BY week, bookings DESC, status, classification, event_type, venue_key", params)
+    return cur.fetchall()
+
+def totals(rows):
+    """{"status": {...}, "classification": {...}, "bookings": n} summed over counter rows."""
+    out = {"status": {}, "classification": {}, "bookings": 0}
+    for r in rows:
+        out["status"][r["status"]] = out["status"].get(r["status"], 0) + r["bookings"]
+        out["classification"][r["classification"]] = out["classification"].get(r["classification"], 0) + r["bookings"]
+        out["bookings"] += r["bookings"]
+    return out
@@ -0,0 +1,148 @@
+# modules/uploads.py
+import hashlib, os, tempfile, time
+from datetime import datetime, timedelta
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.utils import secure_filename
+
+from db import get_conn
+from modules import metrics
+
+try:
+    from config import UPLOAD_GC_GRACE_SECONDS
+except Exception:
+    UPLOAD_GC_GRACE_SECONDS = 86400
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingUpload:
+    """
+    Temp file inside UPLOAD_FOLDER that the multipart parser streams into.
+    Hashes and size-checks every chunk as it arrives, so an oversized file is
+    rejected mid-body and a kept one is renamed into place without a copy.
+    """
+
+    def __init__(self, folder, max_bytes=None):
+        os.makedirs(folder, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=folder, prefix=".upload-")
+        self._file = os.fdopen(fd, "w+b")
+        self._hash = hashlib.sha256()
+        self._max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self._max_bytes and self.size > self._max_bytes:
+            self.close()
+            raise RequestEntityTooLarge(f"Each file must be at most {self._max_bytes // (1024 * 1024)} MB.")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def close(self):
+        """Close and, unless it was stored, delete the temp file."""
+        if not self._file.closed:
+            self._file.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __getattr__(self, name):   # read/seek/tell/flush... for FileStorage
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    """Request whose file parts go straight into a HashingUpload (per-file limit: MAX_UPLOAD_BYTES)."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        cfg = current_app.config
+        return HashingUpload(cfg["UPLOAD_FOLDER"], cfg.get("MAX_UPLOAD_BYTES"))
+
+
+def store(file_storage):
+    """
+    Move an uploaded file into content-addressed storage. Returns its path
+    relative to UPLOAD_FOLDER: '<2 hex>/<sha256><.ext>'. Identical content is
+    stored once however often, and by whoever, it is uploaded; uploads.ref_count
+    counts the events rows naming it (triggers, migration 017).
+    """
+    t0 = time.perf_counter()
+    folder = current_app.config["UPLOAD_FOLDER"]
+    upload = file_storage.stream
+    if not isinstance(upload, HashingUpload):
+        # small parts Werkzeug kept in memory, or a non-UploadRequest caller
+        upload = HashingUpload(folder, current_app.config.get("MAX_UPLOAD_BYTES"))
+        for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b""):
+            upload.write(chunk)
+    upload.flush()
+
+    original = secure_filename(file_storage.filename or "")
+    ext = os.path.splitext(original)[1].lower()[:10]
+    digest = upload.hexdigest()
+    rel = f"{digest[:2]}/{digest}{ext}"
+    dest = os.path.join(folder, digest[:2], digest + ext)
+
+    # row first: a fresh uploaded_at keeps collect() off the file from here on
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_conn() as conn:
+        conn.cursor().execute("""
+            INSERT INTO uploads (path, sha256, size, content_type, original_name, ref_count, created_at, uploaded_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET uploaded_at = EXCLUDED.uploaded_at
+        """, (rel, digest, upload.size, file_storage.mimetype or None, original or None, now, now))
+        conn.commit()
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    duplicate = os.path.exists(dest)
+    if duplicate:
+        upload.close()   # duplicate content: drop the temp copy
+    else:
+        upload._file.close()
+        os.replace(upload.path, dest)
+        upload.path = None
+    metrics.UPLOAD_BYTES.inc(upload.size, deduplicated="yes" if duplicate else "no")
+    metrics.UPLOAD_SECONDS.observe(time.perf_counter() - t0)
+    return rel
+
+def collect(conn, folder, grace_seconds=None):
+    """
+    Delete uploads no events row names (ref_count 0) and nobody has uploaded
+    for grace_seconds (default UPLOAD_GC_GRACE_SECONDS), rows and files.
+    The grace period covers a submission between store() and its INSERT.
+    Returns the paths removed.
+    """
+    grace = UPLOAD_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = (datetime.now() - timedelta(seconds=grace)).strftime("%Y-%m-%d %H:%M:%S")
+    cur = conn.cursor()
+    cur.execute("DELETE FROM uploads WHERE ref_count <= 0 AND COALESCE(uploaded_at, created_at) <= ? RETURNING path",
+                (cutoff,))
+    paths = [r["path"] for r in cur.fetchall()]
+    conn.commit()
+    removed = []
+    for rel in paths:
+        cur.execute("SELECT 1 FROM uploads WHERE path = ?", (rel,))
+        if cur.fetchone():
+            continue   # uploaded again meanwhile
+        try:
+            os.remove(os.path.join(folder, rel))
+        except FileNotFoundError:
+            pass
+        removed.append(rel)
+    return removed
+
+def is_content_addressed(filename):
+    head, _, tail = (filename or "").partition("/")
+    return len(head) == 2 and tail.startswith(head) and len(tail.split(".")[0]) == 64
+
+def original_name(filename):
+    with get_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT original_name FROM uploads WHERE path = ?", (filename,))
+        row = cur.fetchone()
+    return row["original_name"] if row else None
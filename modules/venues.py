@@ -0,0 +1,463 @@
+# modules/venues.py
+import gc, hashlib, json, os, re, threading, time
+
+from db import get_conn
+
+try:
+    from config import VENUE_DATA_PATH
+except Exception:
+    VENUE_DATA_PATH = ""
+
+# How often venue popularity (booking counts) is re-read from the events table
+POPULARITY_TTL = 600
+
+# Precompiled data is only used while both of these files are unchanged (see source_digest)
+_SOURCES = (os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "locations_events.py"),
+            os.path.abspath(__file__))
+
+_BA_RE = re.compile(r"\bBA\s?(\d+)(?:\s*-\s*(\d+))?", re.I)
+_PARENS_RE = re.compile(r"\(([^)]*)\)")
+_BA_SPACE_RE = re.compile(r"\bba\s+(?=\d)", re.I)   # "BA 294" -> "BA294"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lower-case alphanumeric words joined by single spaces ('*Apex Park - Esplanade' -> 'apex park esplanade')."""
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+def display_name(name):
+    return " ".join((name or "").lstrip("*").split())
+
+def beach_access_codes(name):
+    """Beach-access codes in a venue name, expanding ranges: 'BA180-182' -> ['BA180', 'BA181', 'BA182']."""
+    codes = []
+    for m in _BA_RE.finditer(name or ""):
+        first = int(m.group(1))
+        last = int(m.group(2)) if m.group(2) else first
+        if m.group(2) and last < first:
+            # shorthand like BA309-14 keeps the leading digits of the first code
+            last = int(m.group(1)[:len(m.group(1)) - len(m.group(2))] + m.group(2))
+        if last - first > 50:
+            last = first
+        codes += [f"BA{n}" for n in range(first, last + 1)]
+    return codes
+
+def suburb(name):
+    """Trailing ' - Suburb' segment of a venue name, if any."""
+    text = _BA_RE.sub("", _PARENS_RE.sub("", display_name(name)))
+    parts = [p.strip() for p in re.split(r"\s-|-\s", text) if p.strip()]
+    if len(parts) > 1 and parts[-1].lower() != "other":
+        return parts[-1]
+    return ""
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()
+
+
+class VenueIndex:
+    """
+    Search index over venue names: a prefix trie over name tokens (suburb and
+    beach-access codes included) with a trigram index as a typo-tolerant
+    fallback. Results are ranked by match quality, then booking popularity.
+    """
+
+    def __init__(self, names):
+        self.venues = []
+        self._root = _TrieNode()
+        self._trigrams = {}
+        for vid, name in enumerate(names):
+            codes = beach_access_codes(_BA_SPACE_RE.sub("BA", name))
+            sub = suburb(name)
+            norm = normalize(name)
+            self.venues.append({
+                "name": name,
+                "label": display_name(name),
+                "suburb": sub,
+                "codes": codes,
+                "norm": norm,
+            })
+            tokens = set(norm.split()) | {c.lower() for c in codes}
+            for tok in tokens:
+                self._insert(tok, vid)
+                for g in _trigrams(tok):
+                    self._trigrams.setdefault(g, set()).add(vid)
+        self._popularity = {}
+        self._popularity_at = 0.0
+        self._lock = threading.Lock()
+
+    def to_data(self):
+        """The index as plain JSON-able data (trie nodes flattened to a list); see from_data()."""
+        nodes, queue = [], [self._root]
+        for node in queue:
+            children = {}
+            for ch, child in node.children.items():
+                children[ch] = len(queue)
+                queue.append(child)
+            nodes.append([sorted(node.ids), children])
+        return {"venues": self.venues, "trie": nodes,
+                "trigrams": {g: sorted(ids) for g, ids in self._trigrams.items()}}
+
+    @classmethod
+    def from_data(cls, data):
+        self = cls.__new__(cls)
+        self.venues = data["venues"]
+        nodes = [_TrieNode() for _ in data["trie"]]
+        for node, (ids, children) in zip(nodes, data["trie"]):
+            node.ids = set(ids)
+            node.children = {ch: nodes[i] for ch, i in children.items()}
+        self._root = nodes[0]
+        self._trigrams = {g: set(ids) for g, ids in data["trigrams"].items()}
+        self._popularity = {}
+        self._popularity_at = 0.0
+        self._lock = threading.Lock()
+        return self
+
+    def _insert(self, token, vid):
+        node = self._root
+        for ch in token:
+            node = node.children.setdefault(ch, _TrieNode())
+            node.ids.add(vid)
+
+    def _prefixed(self, prefix):
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return set()
+        return node.ids
+
+    def search(self, q, limit=10):
+        terms = normalize(_BA_SPACE_RE.sub("ba", q or "")).split()
+        if not terms:
+            return []
+        candidates = None
+        for term in terms:
+            ids = self._prefixed(term)
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                break
+        if candidates:
+            scored = [(self._score(vid, terms), vid) for vid in candidates]
+        else:
+            scored = self._fuzzy(terms)
+        popularity = self.popularity()
+        scored.sort(key=lambda s: (-s[0], -popularity.get(self.venues[s[1]]["norm"], 0),
+                                   len(self.venues[s[1]]["label"])))
+        return [self._public(vid) for _, vid in scored[:limit]]
+
+    def _score(self, vid, terms):
+        venue = self.venues[vid]
+        query = " ".join(terms)
+        words = venue["norm"].split()
+        codes = {c.lower() for c in venue["codes"]}
+        score = 0.0
+        if venue["norm"].startswith(query):
+            score += 4
+        for term in terms:
+            if term in codes:
+                score += 3 if len(codes) > 1 else 4   # a single-access venue beats a range
+            elif term in words:
+                score += 2
+            else:
+                score += 1
+        if words and words[0].startswith(terms[0]):
+            score += 1
+        return score
+
+    def _fuzzy(self, terms, min_similarity=0.4):
+        grams = set()
+        for term in terms:
+            grams |= _trigrams(term)
+        hits = {}
+        for g in grams:
+            for vid in self._trigrams.get(g, ()):
+                hits[vid] = hits.get(vid, 0) + 1
+        scored = []
+        for vid, shared in hits.items():
+            similarity = shared / len(grams)
+            if similarity >= min_similarity:
+                scored.append((similarity, vid))
+        return scored
+
+    def _public(self, vid):
+        v = self.venues[vid]
+        return {"name": v["name"], "label": v["label"], "suburb": v["suburb"], "codes": v["codes"]}
+
+    def popularity(self):
+        """Booking count per normalized venue name, refreshed every POPULARITY_TTL seconds."""
+        now = time.monotonic()
+        if now - self._popularity_at > POPULARITY_TTL:
+            with self._lock:
+                if now - self._popularity_at > POPULARITY_TTL:
+                    self._popularity_at = now
+                    try:
+                        self._popularity = self._load_popularity()
+                    except Exception as e:
+                        print("[venues] popularity refresh failed:", e)
+        return self._popularity
+
+    @staticmethod
+    def _load_popularity():
+        counts = {}
+        with get_conn() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT location, COUNT(*) AS n FROM events GROUP BY location")
+            for r in cur.fetchall():
+                key = normalize(r["location"])
+                counts[key] = counts.get(key, 0) + r["n"]
+        return counts
+
+
+# ---------- Free-text matching (chatbot) ----------
+
+# Street/place abbreviations used in venue names, expanded on both sides
+_ABBREVIATIONS = {"pk": "park", "esp": "esplanade", "pde": "parade", "tce": "terrace", "st": "street",
+                  "rd": "road", "dr": "drive", "ave": "avenue", "hd": "headland", "res": "reserve"}
+# Below this total only a suburb matched, so a near-miss alias may still be the better guess
+_WEAK_MATCH = 3
+# Words too generic to identify a venue on their own
+_ALIAS_SPLIT_RE = re.compile(r"[&/,]")
+_GENERIC = {"park", "beach", "other", "reserve", "the", "area", "lawn", "oval", "street", "road", "and",
+            "of", "opp", "north", "south", "east", "west", "carpark", "picnic", "foreshore"}
+# Alias kind -> bonus on top of the alias word count
+_ALIAS_BONUS = {"full": 2, "code": 4, "codes": 3, "name": 2, "aside": 1, "suburb": 0}
+
+def _words(text):
+    words = normalize(_BA_SPACE_RE.sub("BA", text or "")).split()
+    return tuple(_ABBREVIATIONS.get(w, w) for w in words)
+
+def venue_aliases(name):
+    """[(kind, words)] a venue can be referred to by: full name, park name(s), bracketed asides, BA codes, suburb."""
+    aliases = [("full", _words(name))]
+    text = _BA_RE.sub("", display_name(name))
+    for aside in _PARENS_RE.findall(text):
+        aliases += [("aside", _words(part)) for part in _ALIAS_SPLIT_RE.split(aside)]
+    segments = [p for p in re.split(r"\s-|-\s", _PARENS_RE.sub("", text)) if p.strip()]
+    if segments:
+        aliases.append(("name", _words(segments[0])))
+        aliases += [("name", _words(part)) for part in _ALIAS_SPLIT_RE.split(segments[0])]
+    codes = beach_access_codes(_BA_SPACE_RE.sub("BA", name))
+    aliases += [("code" if len(codes) == 1 else "codes", (c.lower(),)) for c in codes]
+    sub = suburb(name)
+    if sub:
+        aliases.append(("suburb", _words(sub)))
+    seen, out = set(), []
+    for kind, words in aliases:
+        if words and not set(words) <= _GENERIC and words not in seen:
+            seen.add(words)
+            out.append((kind, words))
+    return out
+
+
+class VenueMatcher:
+    """
+    Finds the venue a free-text message refers to. An Aho-Corasick automaton
+    over the word sequences of every venue alias reports all alias matches in
+    one pass over the message; each match scores its venues (more words and
+    more specific alias kinds score higher) and the best total wins. When no
+    alias matches exactly, short word windows are compared against the aliases
+    by trigram similarity to tolerate typos.
+    """
+
+    def __init__(self, names, index=None):
+        self.names = list(names)
+        self._index = index
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]            # node -> [((venue id, score), ...)] per alias ending here
+        patterns = {}               # alias words -> {venue id: score}
+        for vid, name in enumerate(self.names):
+            for kind, words in venue_aliases(name):
+                scores = patterns.setdefault(words, {})
+                scores[vid] = max(scores.get(vid, 0), len(words) + _ALIAS_BONUS[kind])
+        self._aliases = []
+        self._alias_grams = {}
+        for words, scores in patterns.items():
+            node = 0
+            for w in words:
+                nxt = self._goto[node].get(w)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][w] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            hits = tuple(scores.items())
+            self._out[node].append(hits)
+            aid = len(self._aliases)
+            self._aliases.append((words, hits))
+            for g in _trigrams(" ".join(words)):
+                self._alias_grams.setdefault(g, []).append(aid)
+        self._link()
+
+    def to_data(self):
+        """The automaton as plain JSON-able data; outputs are stored as alias numbers. See from_data()."""
+        alias_of = {id(hits): aid for aid, (_, hits) in enumerate(self._aliases)}
+        return {"names": self.names, "goto": self._goto, "fail": self._fail,
+                "out": [[alias_of[id(hits)] for hits in out] for out in self._out],
+                "aliases": self._aliases, "alias_grams": self._alias_grams}
+
+    @classmethod
+    def from_data(cls, data, index=None):
+        self = cls.__new__(cls)
+        self.names = data["names"]
+        self._index = index
+        self._goto = data["goto"]
+        self._fail = data["fail"]
+        self._aliases = [(tuple(words), tuple(tuple(h) for h in hits)) for words, hits in data["aliases"]]
+        self._out = [[self._aliases[aid][1] for aid in out] for out in data["out"]]
+        self._alias_grams = data["alias_grams"]
+        return self
+
+    def _link(self):
+        """Breadth-first failure links; outputs inherit their failure node's outputs."""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for w, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and w not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(w, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def match(self, text):
+        """Best matching venue name for `text`, or None."""
+        words = _words(text)
+        scores = {}
+        node = 0
+        for w in words:
+            while node and w not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(w, 0)
+            for hits in self._out[node]:
+                for vid, score in hits:
+                    scores[vid] = scores.get(vid, 0) + score
+        if max(scores.values(), default=0) < _WEAK_MATCH:
+            for vid, score in self._fuzzy(words).items():
+                scores[vid] = scores.get(vid, 0) + score
+        if not scores:
+            return None
+        popularity = self._index.popularity() if self._index else {}
+        best = max(scores, key=lambda vid: (scores[vid], popularity.get(normalize(self.names[vid]), 0),
+                                            -len(self.names[vid])))
+        return self.names[best]
+
+    def _fuzzy(self, words, max_window=4, min_similarity=0.6):
+        """Venue scores from the alias most similar to any window of up to `max_window` words."""
+        best_sim, best = 0.0, None
+        for i in range(len(words)):
+            if words[i] in _GENERIC:
+                continue
+            for n in range(1, max_window + 1):
+                window = words[i:i + n]
+                if len(window) < n:
+                    break
+                grams = _trigrams(" ".join(window))
+                shared = {}
+                for g in grams:
+                    for aid in self._alias_grams.get(g, ()):
+                        shared[aid] = shared.get(aid, 0) + 1
+                for aid, count in shared.items():
+                    alias_words = self._aliases[aid][0]
+                    sim = count / max(len(grams), len(_trigrams(" ".join(alias_words))))
+                    if sim > best_sim:
+                        best_sim, best = sim, aid
+        if best is None or best_sim < min_similarity:
+            return {}
+        return dict(self._aliases[best][1])
+
+
+# ---------- Shared data (venue list, event types, index, matcher) ----------
+#
+# Loaded on first use: from the precompiled JSON at VENUE_DATA_PATH when it
+# matches locations_events.py and this module, else built from the source.
+# The file holds plain data only; the objects are rebuilt from it here.
+# Under gunicorn --preload the master loads it once and workers share it.
+
+_data = None
+_index_lock = threading.Lock()
+
+def source_digest():
+    h = hashlib.sha256()
+    for path in _SOURCES:
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+def _build():
+    from locations_events import locations, event_types
+    index = VenueIndex(locations)
+    return {"locations": list(locations), "event_types": list(event_types),
+            "index": index, "matcher": VenueMatcher(locations, index)}
+
+def _load_compiled(path):
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read()
+        gc.disable()   # tens of thousands of small containers: collections mid-load only cost time
+        try:
+            data = json.loads(raw)
+            if data.get("digest") != source_digest():
+                return None
+            index = VenueIndex.from_data(data["index"])
+            return {"locations": data["locations"], "event_types": data["event_types"],
+                    "index": index, "matcher": VenueMatcher.from_data(data["matcher"], index)}
+        finally:
+            gc.enable()
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print("[venues] ignoring precompiled data:", e)
+    return None
+
+def compile_data(path=None):
+    """Build everything from locations_events.py and write it to `path` (default VENUE_DATA_PATH)."""
+    path = path or VENUE_DATA_PATH
+    built = _build()
+    data = {"digest": source_digest(), "locations": built["locations"], "event_types": built["event_types"],
+            "index": built["index"].to_data(), "matcher": built["matcher"].to_data()}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, separators=(",", ":"))
+    os.replace(tmp, path)
+    return path
+
+def _shared():
+    global _data
+    if _data is None:
+        with _index_lock:
+            if _data is None:
+                _data = (VENUE_DATA_PATH and _load_compiled(VENUE_DATA_PATH)) or _build()
+    return _data
+
+def locations():
+    return _shared()["locations"]
+
+def event_types():
+    return _shared()["event_types"]
+
+def get_index():
+    """The shared VenueIndex over locations_events.locations."""
+    return _shared()["index"]
+
+def search(q, limit=10):
+    return get_index().search(q, limit)
+
+def get_matcher():
+    """The shared VenueMatcher over locations_events.locations."""
+    return _shared()["matcher"]
+
+def match(text):
+    return get_matcher().match(text)
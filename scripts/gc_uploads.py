@@ -0,0 +1,13 @@
+# ssc_event_form/scripts/gc_uploads.py
+"""Delete stored uploads that no event refers to (e.g. from cron); see uploads.collect()."""
+from pathlib import Path
+import sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from config import UPLOAD_FOLDER
+from db import get_conn
+from modules import uploads
+
+with get_conn() as conn:
+    removed = uploads.collect(conn, UPLOAD_FOLDER)
+print(f"Removed {len(removed)} unreferenced uploads")
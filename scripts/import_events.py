@@ -0,0 +1,39 @@
+# ssc_event_form/scripts/import_events.py
+"""
+Bulk-import bookings from a CSV or JSON file (same rules as POST /admin/import):
+
+    python scripts/import_events.py fixtures.csv --dry-run
+    python scripts/import_events.py fixtures.csv --status Approved --on-conflict skip
+"""
+from pathlib import Path
+import argparse, sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from db import get_conn
+from modules import importer
+
+ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+ap.add_argument("file")
+ap.add_argument("--dry-run", action="store_true", help="check and report only")
+ap.add_argument("--status", choices=importer.STATUS_MODES, default="auto")
+ap.add_argument("--on-conflict", choices=importer.CONFLICT_MODES, default="pending")
+args = ap.parse_args()
+
+path = Path(args.file)
+rows = importer.parse(path.read_text(encoding="utf-8-sig"), "json" if path.suffix.lower() == ".json" else "csv")
+with get_conn() as conn:
+    ids, report = importer.run(conn, rows, args.dry_run, args.status, args.on_conflict)
+
+for r in report:
+    if r["errors"] or r["skipped"] or r["conflicts"]["events"] or r["conflicts"]["rows"]:
+        notes = "; ".join(r["errors"]) or ("skipped" if r["skipped"] else r["status"])
+        print(f"row {r['row']:>5}: {notes}  conflicts: events {r['conflicts']['events']} rows {r['conflicts']['rows']}")
+invalid = sum(1 for r in report if not r["ok"])
+statuses = {}
+for r in report:
+    if r["status"] and not r["skipped"]:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+print(f"{len(report)} rows: {invalid} invalid, {sum(r['skipped'] for r in report)} skipped, by status {statuses}")
+print("Dry run: nothing written." if args.dry_run else f"Inserted {len(ids)} events." if not invalid
+      else "Nothing written (fix the invalid rows).")
+sys.exit(1 if invalid else 0)
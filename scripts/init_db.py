@@ -0,0 +1,30 @@
+# ssc_event_form/scripts/init_db.py
+"""
+One-off deploy step: apply pending migrations, backfill venue occupancy and
+write the precompiled venue data, so app workers can boot with
+DB_AUTO_MIGRATE=0 and skip all of it.
+
+  python scripts/init_db.py
+  python scripts/init_db.py --skip-venue-data
+"""
+from pathlib import Path
+import argparse, sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+import db
+from modules import calendar, venues
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--skip-venue-data", action="store_true", help="don't (re)write VENUE_DATA_PATH")
+    args = ap.parse_args()
+
+    db.migrate(verbose=True)
+    with db.get_conn() as conn:
+        calendar.ensure_built(conn)
+    print("Schema up to date")
+    if not args.skip_venue_data:
+        print("Wrote", venues.compile_data())
+
+if __name__ == "__main__":
+    main()
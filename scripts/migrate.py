@@ -1,22 +1,40 @@
 # ssc_event_form/scripts/migrate.py
+"""
+Apply pending schema migrations (migrations/sqlite or migrations/postgres).
+
+  python scripts/migrate.py            # apply
+  python scripts/migrate.py --status   # list applied / pending, apply nothing
+"""
 from pathlib import Path
-import sys, sqlite3
+import argparse, sys
 BASE = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(BASE))
-from db import get_conn
+import db
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--status", action="store_true", help="show migration status without applying")
+    args = ap.parse_args()
 
-migs = sorted((BASE / "migrations").glob("*.sql"))
-if not migs:
-    raise SystemExit("No migration files found")
+    files = db.migration_files()
+    if not files:
+        raise SystemExit("No migration files found")
+    if not args.status:
+        db.migrate(verbose=True)
 
-with get_conn() as conn:
-    for p in migs:
+    with db.get_conn() as conn:
         try:
-            conn.executescript(p.read_text(encoding="utf-8"))
-            print("Applied:", p.name)
-        except sqlite3.OperationalError as e:
-            if "duplicate column name" in str(e):
-                print("Skipped (already applied):", p.name, "-", e)
-                continue
-            raise
-    conn.commit()
+            done = db.applied_migrations(conn)
+        except Exception:
+            done = {}   # no ledger yet
+    for version, name, _, checksum in files:
+        if version not in done:
+            state = "pending"
+        elif done[version][1] != checksum:
+            state = "EDITED since applied " + done[version][2]
+        else:
+            state = "applied " + done[version][2]
+        print(f"{name:<40} {state}")
+
+if __name__ == "__main__":
+    main()
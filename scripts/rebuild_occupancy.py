@@ -0,0 +1,13 @@
+# ssc_event_form/scripts/rebuild_occupancy.py
+"""Recompute the venue_occupancy slot maps from events (after bulk edits or imports made outside the app)."""
+from pathlib import Path
+import sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from db import get_conn
+from modules import calendar
+
+with get_conn() as conn:
+    cells = calendar.rebuild(conn)
+    conn.commit()
+print(f"Rebuilt {cells} venue/day occupancy rows")
@@ -0,0 +1,13 @@
+# ssc_event_form/scripts/rebuild_summary.py
+"""Recompute the event_summary dashboard counters from events (after edits made outside the app or with triggers off)."""
+from pathlib import Path
+import sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from db import get_conn
+from modules import summary
+
+with get_conn() as conn:
+    groups = summary.rebuild(conn)
+    conn.commit()
+print(f"Rebuilt {groups} summary counter rows")
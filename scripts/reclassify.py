@@ -0,0 +1,43 @@
+# ssc_event_form/scripts/reclassify.py
+"""
+Re-run the classification rules over stored events, e.g. after council
+changes a threshold:
+
+    python scripts/reclassify.py --max-attendance 250            # report only
+    python scripts/reclassify.py --max-attendance 250 --apply    # write flips
+"""
+from pathlib import Path
+import argparse, sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from db import get_conn
+from modules import rules
+
+ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+ap.add_argument("--status", action="append",
+                help="only rows with this status (repeatable; default Pending, 'all' for every row)")
+ap.add_argument("--max-attendance", type=int)
+ap.add_argument("--max-noise-db", type=int)
+ap.add_argument("--max-days", type=int)
+ap.add_argument("--apply", action="store_true", help="write the new classifications")
+args = ap.parse_args()
+
+overrides = {k: v for k, v in {
+    "max_attendance": args.max_attendance,
+    "max_noise_db": args.max_noise_db,
+    "max_days": args.max_days,
+}.items() if v is not None}
+statuses = args.status or ["Pending"]
+if "all" in statuses:
+    statuses = None
+ruleset = rules.RuleSet(overrides)
+
+with get_conn() as conn:
+    flips = rules.reclassify(conn, ruleset, statuses)
+    for event_id, old, new in flips:
+        print(f"{event_id}: {old} -> {new}")
+    print(f"{len(flips)} row(s) would change" if not args.apply else f"{len(flips)} row(s) updated")
+    if args.apply and flips:
+        conn.cursor().executemany("UPDATE events SET classification=? WHERE id=?",
+                                  [(new, event_id) for event_id, _, new in flips])
+        conn.commit()
@@ -0,0 +1,16 @@
+# ssc_event_form/scripts/send_outbox.py
+"""Drain due emails from the outbox once (e.g. from cron, or against a local debugging SMTP server)."""
+from pathlib import Path
+import sys
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+from modules import messaging
+
+total_sent = total_failed = 0
+while True:
+    sent, failed = messaging.send_pending()
+    total_sent += sent
+    total_failed += failed
+    if not sent and not failed:
+        break
+print(f"Sent: {total_sent}  Failed: {total_failed}")
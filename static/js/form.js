@@ -141,7 +141,11 @@ async function checkConflict() {
     end_time:   v("end_time"),
     venue:      v("venue"),
     location:   v("venue"),
-    arcgis_feature_id: v("arcgis_feature_id")
+    arcgis_feature_id: v("arcgis_feature_id"),
+    rrule:        v("rrule"),
+    repeat_until: v("repeat_until"),
+    rdates:       v("rdates"),
+    exdates:      v("exdates")
   };
   if (!body.start_date || !body.start_time || !body.end_time || (!body.venue && !body.arcgis_feature_id)) {
     showConflict(null);
@@ -183,11 +187,41 @@ function showConflict(conflict) {
 }
 
 // re-check conflict when these change
-["start_date","end_date","start_time","end_time","venue","arcgis_feature_id"].forEach(id => {
+["start_date","end_date","start_time","end_time","venue","arcgis_feature_id","rrule","repeat_until","rdates","exdates"].forEach(id => {
   const el = document.getElementById(id);
   if (el) el.addEventListener("change", checkConflict);
 });
 
+// ------- Venue typeahead (server-side search) -------
+let venueSearchTimer = null;
+let venueSearchSeq = 0;
+
+async function suggestVenues() {
+  const input = document.getElementById("venue");
+  const list = document.getElementById("venue-list");
+  if (!input || !list) return;
+  const q = input.value.trim();
+  if (q.length < 2) { list.innerHTML = ""; return; }
+  const seq = ++venueSearchSeq;
+  try {
+    const resp = await fetch(`/api/venues/search?q=${encodeURIComponent(q)}&limit=12`);
+    const data = await resp.json();
+    if (seq !== venueSearchSeq) return;   // a newer keystroke already answered
+    list.innerHTML = "";
+    (data.venues || []).forEach(v => {
+      const opt = document.createElement("option");
+      opt.value = v.name;
+      opt.label = [v.suburb, (v.codes || []).join(" ")].filter(Boolean).join(" · ");
+      list.appendChild(opt);
+    });
+  } catch { /* keep the previous suggestions */ }
+}
+
+document.getElementById("venue")?.addEventListener("input", () => {
+  clearTimeout(venueSearchTimer);
+  venueSearchTimer = setTimeout(suggestVenues, 150);
+});
+
 // ------- Map: lazy init on Step 2 -------
 let mapInitialized = false;
 let leafletMap = null, leafletMarker = null;
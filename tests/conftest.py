@@ -0,0 +1,57 @@
+# tests/conftest.py
+"""
+Every test runs against a throwaway SQLite database (never events.db):
+SQLITE_PATH must be set before db/app are imported.
+"""
+import os, sys, tempfile
+from pathlib import Path
+
+import pytest
+
+BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE))
+
+_TMP = tempfile.mkdtemp(prefix="ssc-tests-")
+os.environ["SQLITE_PATH"] = os.path.join(_TMP, "test.db")
+os.environ["UPLOAD_FOLDER"] = os.path.join(_TMP, "uploads")
+os.environ.pop("DATABASE_URL", None)
+os.environ["EMAIL_USER"] = ""   # never send real mail
+os.environ["EMAIL_PASS"] = ""
+
+_TABLES = ("event_recurrences", "events", "email_outbox", "venue_occupancy", "event_summary")
+
+
+@pytest.fixture
+def conn():
+    """A migrated, empty database; yields this thread's connection."""
+    import db
+    from modules import conflicts
+    db.init_db_once()
+    with db.get_conn() as c:
+        for table in _TABLES:
+            c.execute(f"DELETE FROM {table}")
+        c.commit()
+        conflicts.INDEX.sync(c)
+        yield c
+
+@pytest.fixture
+def client(conn):
+    import app
+    app.app.config["TESTING"] = True
+    return app.app.test_client()
+
+
+def submit_form(**overrides):
+    """A Self-assessable /submit payload (frontend field names)."""
+    form = {
+        "event_type": "Community Event", "organizer_name": "Test Person",
+        "contact_email": "", "contact_phone": "0400000000",
+        "event_name": "Test booking", "venue": "Kings Beach Park",
+        "start_date": "2031-12-31", "end_date": "2031-12-31",
+        "start_time": "18:00", "end_time": "21:00",
+        "attendance": "20", "alcohol": "No", "high_risk": "No", "traffic_mgmt": "No",
+        "vehicle_access": "No", "amplified_sound": "No", "noise_level": "0",
+        "total_days": "1", "notes": "",
+    }
+    form.update(overrides)
+    return form
@@ -0,0 +1,70 @@
+# tests/test_admin.py
+import pytest
+
+import app
+import db
+from conftest import submit_form
+
+# created_at per booking, in insert order: runs of equal timestamps straddle page boundaries
+STAMPS = ["2031-01-01 10:00:00"] * 3 + ["2031-01-01 09:00:00"] * 4 + ["2031-01-02 08:00:00", "2031-01-01 09:00:00"]
+
+
+@pytest.fixture
+def pages(client, monkeypatch):
+    """Fetch /admin and follow 'Older' links; returns each page's booking ids."""
+    seen = {}
+    def render(template, **context):
+        seen.update(context)
+        return ""
+    monkeypatch.setattr(app, "render_template", render)
+    monkeypatch.setattr(app, "ADMIN_PAGE_SIZE", 2)
+
+    def fetch(**args):
+        out, after = [], ""
+        while True:
+            assert client.get("/admin", query_string=dict(args, after=after)).status_code == 200
+            out.append([r["id"] for r in seen["applications"]])
+            after = seen["next_after"]
+            if not after:
+                return out
+    return fetch
+
+def _book(client, conn, stamp, **overrides):
+    client.post("/submit", data=submit_form(**overrides))
+    event_id = conn.execute("SELECT MAX(id) AS id FROM events").fetchone()["id"]
+    conn.execute("UPDATE events SET created_at = ? WHERE id = ?", (stamp, event_id))
+    conn.commit()
+    return event_id
+
+def test_keyset_pages_with_duplicate_sort_keys(client, conn, pages):
+    ids = [_book(client, conn, stamp, start_date=f"2032-02-{day:02d}", end_date=f"2032-02-{day:02d}")
+           for day, stamp in enumerate(STAMPS, 1)]
+    newest_first = [i for _, i in sorted(zip(STAMPS, ids), reverse=True)]
+    got = pages()
+    assert [len(p) for p in got] == [2, 2, 2, 2, 1]
+    assert sum(got, []) == newest_first
+
+    assert client.get("/admin", query_string={"after": "2031-01-01 09:00:00|notanid"}).status_code == 200
+
+def test_search_index_follows_updates(client, conn, pages, monkeypatch):
+    a = _book(client, conn, STAMPS[0], organizer_name="Alice Brown", event_name="Sunset yoga")
+    b = _book(client, conn, STAMPS[1], organizer_name="Bob Green", event_name="Sunrise yoga",
+              start_date="2032-01-02", end_date="2032-01-02")
+    c = _book(client, conn, STAMPS[2], organizer_name="Carol Brownlow", event_name="Fun run",
+              start_date="2032-01-03", end_date="2032-01-03")
+    assert pages(q="yoga") == [[b, a]]
+    assert pages(q="brown") == [[c, a]]          # prefix match
+    assert pages(q="brown yoga") == [[a]]        # every word must match
+
+    conn.execute("UPDATE events SET applicant_name = 'Alice White', notes = 'bring mats' WHERE id = ?", (a,))
+    conn.commit()
+    assert pages(q="brown") == [[c]]
+    assert pages(q="white mats") == [[a]]
+    conn.execute("DELETE FROM events WHERE id = ?", (c,))
+    conn.commit()
+    assert pages(q="brown") == [[]]
+
+    assert db._has_fts5(conn)
+    monkeypatch.setattr(db, "_fts5", False)      # the LIKE fallback finds the same rows
+    assert pages(q="white mats") == [[a]]
+    assert pages(q="yoga", status="Self-assessable") == [[b, a]]
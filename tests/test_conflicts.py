@@ -0,0 +1,85 @@
+# tests/test_conflicts.py
+import random
+from datetime import date, datetime, timedelta
+
+from modules import conflicts
+from modules.conflicts import _Venue
+
+from conftest import submit_form
+
+
+def _iso(minutes):
+    return (datetime(2031, 1, 1) + timedelta(minutes=minutes)).isoformat()
+
+def _brute(spans, start, end):
+    return sorted(i for s, e, i in spans if s < end and e > start)
+
+def test_venue_matches_brute_force():
+    rng = random.Random(1)
+    venue, spans = _Venue(), []
+    for n in range(400):
+        a = rng.randint(0, 20000)
+        b = a + rng.choice([30, 120, 600, 30000])   # a few long spans keep the running max high
+        venue.add(_iso(a), _iso(b), n)
+        spans.append((_iso(a), _iso(b), n))
+        if rng.random() < 0.2:
+            gone = spans.pop(rng.randrange(len(spans)))
+            venue.remove(gone[2])
+        a = rng.randint(0, 21000)
+        q = (_iso(a), _iso(a + rng.choice([1, 60, 900])))
+        assert sorted(venue.overlapping(*q)) == _brute(spans, *q)
+
+def test_touching_spans_do_not_overlap():
+    venue = _Venue()
+    venue.add("2031-01-01T10:00:00", "2031-01-01T12:00:00", 1)
+    assert venue.overlapping("2031-01-01T12:00:00", "2031-01-01T13:00:00") == []
+    assert venue.overlapping("2031-01-01T09:00:00", "2031-01-01T10:00:00") == []
+    assert venue.overlapping("2031-01-01T11:59:00", "2031-01-01T13:00:00") == [1]
+
+def test_index_follows_approved_submissions(client, conn):
+    first = client.post("/submit", data=submit_form())
+    assert first.status_code < 400
+    keys = conflicts.venue_keys("", "Kings Beach Park")
+    clash = conflicts.INDEX.overlapping(keys, "2031-12-31T20:00:00", "2031-12-31T22:00:00")
+    assert len(clash) == 1
+    client.post("/submit", data=submit_form(start_time="20:00", end_time="22:00"))
+    row = conn.execute("SELECT status FROM events ORDER BY id DESC LIMIT 1").fetchone()
+    assert row["status"] != "Approved"
+
+def test_load_matches_incremental_adds():
+    rng = random.Random(2)
+    spans = []
+    for n in range(300):
+        a = rng.randint(0, 20000)
+        spans.append((_iso(a), _iso(a + rng.choice([30, 600, 30000])), n))
+    added, loaded = _Venue(), _Venue()
+    for span in spans:
+        added.add(*span)
+    loaded.load(spans)
+    for _ in range(200):
+        a = rng.randint(0, 21000)
+        q = (_iso(a), _iso(a + rng.choice([1, 60, 900])))
+        assert sorted(added.overlapping(*q)) == sorted(loaded.overlapping(*q)) == _brute(spans, *q)
+
+def test_date_ordered_appends_stay_correct():
+    venue, spans = _Venue(), []
+    for n in range(100):
+        span = (_iso(n * 60), _iso(n * 60 + (5000 if n == 3 else 90)), n)
+        venue.add(*span)
+        spans.append(span)
+        q = (_iso(n * 60 - 30), _iso(n * 60 + 10))
+        assert sorted(venue.overlapping(*q)) == _brute(spans, *q)
+
+def test_rebuild_of_a_busy_venue_is_fast(conn):
+    import time
+    conn.executemany(
+        "INSERT INTO events (event_type, applicant_name, applicant_email, applicant_phone, event_name, location,"
+        " start_date, end_date, start_time, end_time, classification, status, created_at)"
+        " VALUES ('Community Event', 'x', '', '', 'Busy', 'Busy Park', ?, ?, '10:00', '11:00',"
+        " 'Self-assessable', 'Approved', '2031-01-01 00:00:00')",
+        [((date(2031, 1, 1) + timedelta(days=n // 4)).isoformat(),) * 2 for n in range(8000)])
+    conn.commit()
+    t0 = time.perf_counter()
+    conflicts.INDEX.sync(conn)
+    assert time.perf_counter() - t0 < 2.0
+    assert len(conflicts.INDEX.overlapping(["loc:busy park"], "2031-01-01T10:30:00", "2031-01-01T10:45:00")) == 4
@@ -0,0 +1,64 @@
+# tests/test_db.py
+import db
+from conftest import submit_form
+
+
+def test_placeholders_and_percent():
+    stmt = db._pg_statement("SELECT * FROM events WHERE status = ? AND notes LIKE '%?%' -- 50% off")
+    assert stmt.text == "SELECT * FROM events WHERE status = %s AND notes LIKE '%%?%%' -- 50%% off"
+    assert stmt.raw == "SELECT * FROM events WHERE status = ? AND notes LIKE '%?%' -- 50% off"
+    name, body = stmt.name
+    assert body == "SELECT * FROM events WHERE status = $1 AND notes LIKE '%?%' -- 50% off"
+    assert stmt.execute == f"EXECUTE {name} (%s)"
+
+def test_sqlite_spellings_rewritten():
+    stmt = db._pg_statement("SELECT IFNULL(a, 1), date('now'), datetime( 'now' ) FROM t WHERE b % 2 = ?")
+    assert stmt.text == ("SELECT COALESCE(a, 1), to_char(CURRENT_DATE, 'YYYY-MM-DD'), "
+                         "to_char(LOCALTIMESTAMP, 'YYYY-MM-DD HH24:MI:SS') FROM t WHERE b %% 2 = %s")
+
+def test_quoted_identifiers_untouched():
+    stmt = db._pg_statement('SELECT "why?" FROM t WHERE x = ?')
+    assert stmt.text == 'SELECT "why?" FROM t WHERE x = %s'
+
+def test_only_single_dml_is_prepared():
+    assert db._pg_statement("UPDATE events SET status = ? WHERE id = ?;").name[1] == \
+        "UPDATE events SET status = $1 WHERE id = $2"
+    assert db._pg_statement("DELETE FROM a; DELETE FROM b").name is None
+    assert db._pg_statement("CREATE TABLE t (x TEXT)").name is None
+    assert db._pg_statement("SELECT ';' FROM t").name is not None
+    assert db._pg_statement("SELECT 1").execute.startswith("EXECUTE q_")
+
+def test_table_version_sums_per_key_rows(conn):
+    before, _ = db.table_version(conn)
+    conn.execute("INSERT INTO table_versions (name, version, updated_at) VALUES ('events:x', 5, '2031-01-01 00:00:00')")
+    conn.execute("INSERT INTO table_versions (name, version, updated_at) VALUES ('eventsx', 7, '2031-01-01 00:00:00')")
+    try:
+        assert db.table_version(conn)[0] == before + 5
+    finally:
+        conn.execute("DELETE FROM table_versions WHERE name IN ('events:x', 'eventsx')")
+        conn.commit()
+
+def test_events_feed_etag_follows_writes(client, conn):
+    args = {"start": "2031-12-01", "end": "2032-01-01"}
+    first = client.get("/api/events", query_string=args)
+    etag = first.headers["ETag"]
+    assert first.get_json() == []
+    assert client.get("/api/events", query_string=args, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/submit", data=submit_form(alcohol="Yes"))
+    resp = client.get("/api/events", query_string=args, headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    assert [e["extendedProps"]["status"] for e in resp.get_json()] == ["Pending"]
+    etag = resp.headers["ETag"]
+    assert client.get("/api/events", query_string=args, headers={"If-None-Match": etag}).status_code == 304
+
+    event_id = conn.execute("SELECT MAX(id) AS id FROM events").fetchone()["id"]
+    client.post(f"/api/event/{event_id}/status", json={"status": "Approved"})
+    resp = client.get("/api/events", query_string=args, headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    etag = resp.headers["ETag"]
+
+    conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+    conn.commit()
+    resp = client.get("/api/events", query_string=args, headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.get_json() == []
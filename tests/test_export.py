@@ -0,0 +1,17 @@
+# tests/test_export.py
+import csv, io
+
+import app
+
+from conftest import submit_form
+
+
+def test_csv_has_the_baseline_columns(client, conn):
+    client.post("/submit", data=submit_form())
+    rows = list(csv.reader(io.StringIO(client.get("/export/csv").get_data(as_text=True))))
+    assert tuple(rows[0]) == app.EXPORT_COLUMNS
+    assert len(rows) == 2 and rows[1][app.EXPORT_COLUMNS.index("location")] == "Kings Beach Park"
+
+def test_export_columns_exist(conn):
+    stored = {d[0] for d in conn.execute("SELECT * FROM events WHERE 1=0").description}
+    assert set(app.EXPORT_COLUMNS) <= stored
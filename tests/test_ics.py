@@ -0,0 +1,38 @@
+# tests/test_ics.py
+import db
+from modules import ics
+
+from conftest import submit_form
+
+
+def _vevent(client):
+    text = client.get("/calendar.ics").get_data(as_text=True).replace("\r\n ", "")
+    return text[text.index("BEGIN:VEVENT"):text.index("END:VEVENT")].split("\r\n")
+
+def test_until_is_utc(client, conn):
+    client.post("/submit", data=submit_form(rrule="FREQ=WEEKLY;UNTIL=20320114"))
+    lines = _vevent(client)
+    rrule = next(l for l in lines if l.startswith("RRULE:"))
+    assert "UNTIL=20320114T135959Z" in rrule.split(";")   # 23:59:59 at +1000
+    assert any(l.startswith("DTSTART;TZID=") for l in lines)
+
+def test_edits_bump_sequence(client, conn):
+    client.post("/submit", data=submit_form())
+    lines = _vevent(client)
+    assert "SEQUENCE:0" in lines
+    created = next(l for l in lines if l.startswith("CREATED:"))
+    before, _ = db.table_version(conn)
+    conn.execute("UPDATE events SET event_name = 'Renamed booking'")
+    conn.commit()
+    assert db.table_version(conn)[0] == before + 1   # the stamp isn't counted as a second write
+    lines = _vevent(client)
+    assert "SEQUENCE:1" in lines and "SUMMARY:Renamed booking" in lines
+    assert created in lines and any(l.startswith("LAST-MODIFIED:") for l in lines)
+    conn.execute("UPDATE events SET classification = classification")
+    conn.commit()
+    assert "SEQUENCE:1" in _vevent(client)
+
+def test_to_utc_offset(monkeypatch):
+    monkeypatch.setattr(ics, "ICS_UTC_OFFSET", "-0330")
+    assert ics._utc("2031-01-01 22:00:00") == "20310102T013000Z"
+    assert ics._utc("") == "19700101T000000Z"
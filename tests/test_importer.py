@@ -0,0 +1,24 @@
+# tests/test_importer.py
+import random
+
+from modules import importer
+
+
+def _brute(intervals):
+    return {frozenset((a[2], b[2])) for i, a in enumerate(intervals) for b in intervals[i + 1:]
+            if a[0] < b[1] and b[0] < a[1]}
+
+def test_sweep_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        intervals = []
+        for ref in range(rng.randint(0, 30)):
+            start = rng.randint(0, 100)
+            intervals.append((start, start + rng.randint(1, 30), ref))
+        pairs = importer.sweep(intervals)
+        assert len(pairs) == len({frozenset(p) for p in pairs})
+        assert {frozenset(p) for p in pairs} == _brute(intervals)
+
+def test_sweep_half_open():
+    assert importer.sweep([("10:00", "12:00", "a"), ("12:00", "13:00", "b")]) == []
+    assert importer.sweep([("10:00", "12:00", "a"), ("11:00", "11:30", "b")]) == [("a", "b")]
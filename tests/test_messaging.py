@@ -0,0 +1,41 @@
+# tests/test_messaging.py
+import pytest
+
+from modules import messaging
+
+from conftest import submit_form
+
+
+def _outbox(conn):
+    return conn.execute("SELECT to_addr, subject, status FROM email_outbox").fetchall()
+
+def test_receipt_is_queued_with_the_booking(client, conn, capsys):
+    client.post("/submit", data=submit_form(contact_email="someone@example.com"))
+    rows = _outbox(conn)
+    assert [(r["to_addr"], r["status"]) for r in rows] == [("someone@example.com", "Pending")]
+    assert "skipping email send" not in capsys.readouterr().out
+
+def test_failed_receipt_rolls_back_the_booking(client, conn, monkeypatch):
+    def broken(**kw):
+        raise RuntimeError("template error")
+    monkeypatch.setattr(messaging, "submission_receipt_message", broken)
+    with pytest.raises(RuntimeError):
+        client.post("/submit", data=submit_form(contact_email="someone@example.com"))
+    assert conn.execute("SELECT COUNT(*) AS n FROM events").fetchone()["n"] == 0
+    assert _outbox(conn) == []
+
+def test_sender_drains_before_waiting(monkeypatch):
+    calls = []
+
+    class Stop(Exception):
+        pass
+
+    class Wake:
+        def wait(self, timeout):
+            raise Stop
+
+    monkeypatch.setattr(messaging, "send_pending", lambda: calls.append(1) or (0, 0))
+    monkeypatch.setattr(messaging, "_wake", Wake())
+    with pytest.raises(Stop):
+        messaging._sender_loop()
+    assert calls == [1]
@@ -0,0 +1,72 @@
+# tests/test_occupancy.py
+import os, subprocess, sys
+
+from conftest import BASE, submit_form
+
+
+def _snapshot(conn):
+    rows = conn.execute("SELECT venue_key, day, venue, approved, pending, approved_slots, pending_slots"
+                        " FROM venue_occupancy ORDER BY venue_key, day").fetchall()
+    return [tuple(bytes(v) if isinstance(v, (bytes, memoryview)) else v for v in r) for r in rows]
+
+def _last_id(conn):
+    return conn.execute("SELECT MAX(id) AS id FROM events").fetchone()["id"]
+
+def _book(client, conn, **overrides):
+    client.post("/submit", data=submit_form(**overrides))
+    return _last_id(conn)
+
+def test_incremental_maps_match_a_full_rebuild(client, conn):
+    approved = _book(client, conn)
+    pending = _book(client, conn, alcohol="Yes", start_time="09:00", end_time="10:30")
+    clash = _book(client, conn, alcohol="Yes", start_time="20:00", end_time="22:00")
+    _book(client, conn, venue="Mooloolaba Beach", start_date="2031-12-30", end_date="2032-01-02",
+          start_time="22:00", end_time="02:00", total_days="4")
+    _book(client, conn, venue="Mooloolaba Beach", rrule="FREQ=WEEKLY;COUNT=4", start_time="07:07")
+    rejected = _book(client, conn, alcohol="Yes", start_date="2032-01-03", end_date="2032-01-03")
+
+    assert client.post(f"/api/event/{pending}/status", json={"status": "Approved"}).status_code == 200
+    assert client.post(f"/api/event/{approved}/status", json={"status": "Cancelled"}).status_code == 200
+    assert client.post("/api/events/status", json={"ids": [clash, rejected], "status": "Rejected"}).get_json()["updated"] \
+        == [clash, rejected]
+
+    incremental = _snapshot(conn)
+    assert incremental
+    env = {k: v for k, v in os.environ.items() if k != "DATABASE_URL"}   # app's load_dotenv may have set it
+    subprocess.run([sys.executable, "scripts/rebuild_occupancy.py"], cwd=BASE, env=env, check=True,
+                   capture_output=True)
+    conn.commit()   # end any read snapshot so the rebuilt rows are visible
+    assert _snapshot(conn) == incremental
+
+def test_slots_and_availability(client, conn):
+    _book(client, conn)                                                   # Approved 18:00-21:00
+    _book(client, conn, alcohol="Yes", start_time="09:00", end_time="10:00")
+    day = client.get("/api/occupancy/slots", query_string={"venue": " kings beach park ", "date": "2031-12-31",
+                                                           "start_time": "21:00", "end_time": "22:00"}).get_json()
+    slots = day["days"]["2031-12-31"]
+    assert slots["approved"] == "0" * 72 + "1" * 12 + "0" * 12
+    assert slots["pending"] == "0" * 36 + "1" * 4 + "0" * 56
+    assert day["free"] is True
+
+    def free(start, end, pending="0"):
+        return client.get("/api/occupancy/slots", query_string={
+            "venue": "Kings Beach Park", "date": "2031-12-31", "start_time": start, "end_time": end,
+            "include_pending": pending}).get_json()["free"]
+    assert free("20:45", "21:30") is False
+    assert free("09:30", "09:45") is True
+    assert free("09:30", "09:45", pending="1") is False
+
+def test_heatmap_etag_follows_writes(client, conn):
+    event_id = _book(client, conn, alcohol="Yes")
+    args = {"start": "2031-12-01", "end": "2032-01-01"}
+    first = client.get("/api/occupancy/heatmap", query_string=args)
+    cell = first.get_json()["cells"][0]
+    assert (cell["approved_slots"], cell["pending_slots"]) == (0, 12)
+    etag = first.headers["ETag"]
+    assert client.get("/api/occupancy/heatmap", query_string=args, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/event/{event_id}/status", json={"status": "Approved"})
+    after = client.get("/api/occupancy/heatmap", query_string=args, headers={"If-None-Match": etag})
+    assert after.status_code == 200 and after.headers["ETag"] != etag
+    cell = after.get_json()["cells"][0]
+    assert (cell["approved_slots"], cell["pending_slots"]) == (12, 0)
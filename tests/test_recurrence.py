@@ -0,0 +1,54 @@
+# tests/test_recurrence.py
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from modules import recurrence
+from modules.recurrence import Recurrence
+
+
+def _random_rule(rng):
+    freq = rng.choice(["DAILY", "WEEKLY"])
+    parts = [f"FREQ={freq}", f"INTERVAL={rng.randint(1, 3)}"]
+    if freq == "WEEKLY":
+        parts.append("BYDAY=" + ",".join(rng.sample(recurrence.WEEKDAYS, rng.randint(1, 3))))
+    parts.append(f"COUNT={rng.randint(1, 20)}" if rng.random() < 0.5 else f"UNTIL=2031{rng.randint(2, 9):02d}15")
+    return ";".join(parts)
+
+def test_windowed_expansion_matches_full():
+    rng = random.Random(3)
+    for _ in range(300):
+        start = date(2031, 1, 1) + timedelta(days=rng.randint(0, 30))
+        end = start + timedelta(days=rng.choice([0, 0, 1, 2]))
+        extra = [(start + timedelta(days=rng.randint(1, 200))).isoformat() for _ in range(rng.randint(0, 3))]
+        rec = Recurrence.parse(start.isoformat(), end.isoformat(), _random_rule(rng), ",".join(extra),
+                               ",".join(rng.sample(extra, len(extra) // 2)))
+        every = list(rec.dates())
+        assert every == sorted(set(every))
+        first = start + timedelta(days=rng.randint(0, 200))
+        last = first + timedelta(days=rng.randint(0, 40))
+        expected = [d for d in every if d <= last and d + timedelta(days=rec.length) >= first]
+        assert list(rec.dates(first, last)) == expected
+
+def test_weekly_byday_and_exdates():
+    rec = Recurrence.parse("2031-01-06", "2031-01-06", "FREQ=WEEKLY;BYDAY=MO,WE;COUNT=5", exdates="2031-01-08")
+    assert [d.isoformat() for d in rec.dates()] == ["2031-01-06", "2031-01-13", "2031-01-15", "2031-01-20"]
+
+def test_parse_rejects_runaway_series():
+    with pytest.raises(ValueError):
+        Recurrence.parse("2031-01-01", "2031-01-01", "FREQ=DAILY;COUNT=100000000")
+    with pytest.raises(ValueError):
+        Recurrence.parse("2031-01-01", "2031-01-01", "FREQ=MONTHLY")
+
+def test_from_row_does_not_expand(monkeypatch):
+    rec = Recurrence.parse("2031-01-01", "2031-01-01", "FREQ=DAILY;COUNT=366")
+    rrule, rdates, exdates, first, last, n = rec.to_row()
+    row = {"start_date": "2031-01-01", "end_date": "2031-01-01", "rrule": rrule, "rdates": rdates,
+           "exdates": exdates, "first_date": first, "last_date": last, "occurrences": n}
+    calls = []
+    real = Recurrence._rule_dates
+    monkeypatch.setattr(Recurrence, "_rule_dates", lambda self, skip_to=None: calls.append(1) or real(self, skip_to))
+    loaded = Recurrence.from_row(row)
+    assert calls == []
+    assert list(loaded.spans("2031-06-01", "2031-06-02")) == [("2031-06-01", "2031-06-01"), ("2031-06-02", "2031-06-02")]
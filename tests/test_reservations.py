@@ -0,0 +1,54 @@
+# tests/test_reservations.py
+import random, sys, threading, time
+
+from modules import reservations
+from modules.reservations import METRES_PER_DEGREE
+
+from conftest import submit_form
+
+
+def test_nearby_points_share_a_cell():
+    rng = random.Random(11)
+    radius = 200
+    for _ in range(2000):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-180, 180)
+        dlat = rng.uniform(-1, 1) * radius / METRES_PER_DEGREE
+        dlon = rng.uniform(-1, 1) * radius / METRES_PER_DEGREE / max(reservations.math.cos(reservations.math.radians(lat)), 0.01)
+        a = set(reservations.lock_keys([], (lat, lon), radius))
+        b = set(reservations.lock_keys([], (lat + dlat, lon + dlon), radius))
+        assert a & b
+
+def test_concurrent_submits_approve_one(client, conn, monkeypatch):
+    import app
+    check = app._conflicting_ids
+
+    def slow_check(*args, **kwargs):
+        ids = check(*args, **kwargs)
+        time.sleep(0.005)   # widen the gap between the check and the insert
+        return ids
+
+    monkeypatch.setattr(app, "_conflicting_ids", slow_check)
+    threads, per_thread = 8, 5
+    barrier = threading.Barrier(threads)
+    codes = []
+
+    def submit():
+        c = app.app.test_client()
+        for _ in range(per_thread):
+            barrier.wait()
+            codes.append(c.post("/submit", data=submit_form()).status_code)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)   # interleave the threads as often as possible
+    try:
+        pool = [threading.Thread(target=submit) for _ in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert len(codes) == threads * per_thread and all(code < 400 for code in codes)
+    rows = conn.execute("SELECT status FROM events WHERE event_name = 'Test booking'").fetchall()
+    assert len(rows) == threads * per_thread
+    assert sum(r["status"] == "Approved" for r in rows) == 1
@@ -0,0 +1,53 @@
+# tests/test_rules.py
+import random
+
+from conftest import submit_form
+from modules import recurrence, rules
+
+
+def _random_row(rng):
+    return {
+        "attendance": str(rng.choice([0, 50, 199, 200, 500])),
+        "alcohol": rng.choice(["Yes", "No"]),
+        "high_risk": rng.choice(["No", "No", "Yes"]),
+        "traffic_mgmt": rng.choice(["No", "No", "Yes"]),
+        "vehicle_access": rng.choice(["No", "No", "Yes"]),
+        "amplified_sound": rng.choice(["Yes", "No"]),
+        "noise_level": str(rng.choice([0, 80, 95, 96])),
+        "total_days": str(rng.choice([0, 1, 2, 3, 10, 30])),
+        "series_tag": rng.choice(["", "", rules.DURATION_TAGS[1]]),
+    }
+
+def test_classify_matches_classify_columns():
+    rng = random.Random(7)
+    rows = [_random_row(rng) for _ in range(500)]
+    columns = {c: [r[c] for r in rows] for c in rules.CLASSIFY_COLUMNS}
+    assert rules.DEFAULT.classify_columns(columns) == [rules.classify(r) for r in rows]
+
+def test_request_duration_field_is_ignored():
+    form = _random_row(random.Random(1))
+    form.update(attendance="10", alcohol="No", high_risk="No", traffic_mgmt="No", vehicle_access="No",
+                amplified_sound="No", total_days="30", series_tag="")
+    form["duration"] = "<=2 days"
+    assert rules.classify(form) == "Assessable"
+
+def test_series_tag():
+    weekly = recurrence.Recurrence.parse("2031-01-06", "2031-01-06", "FREQ=WEEKLY;COUNT=10")
+    daily = recurrence.Recurrence.parse("2031-01-06", "2031-01-06", "FREQ=DAILY;COUNT=10")
+    long_weekly = recurrence.Recurrence.parse("2031-01-06", "2031-01-06", "FREQ=WEEKLY;COUNT=20")
+    assert rules.series_tag(weekly) == rules.DURATION_TAGS[1]
+    assert rules.series_tag(daily) == ""          # consecutive days
+    assert rules.series_tag(long_weekly) == ""    # more than 12 days
+    assert rules.series_tag(None) == ""
+
+def test_submit_ignores_posted_duration(client, conn):
+    client.post("/submit", data=submit_form(total_days="30", end_date="2032-01-29", duration="<=2 days",
+                                            series_tag=rules.DURATION_TAGS[1]))
+    row = conn.execute("SELECT classification, status FROM events").fetchone()
+    assert tuple(row) == ("Assessable", "Pending")
+
+def test_reclassify_keeps_tagged_series(client, conn):
+    client.post("/submit", data=submit_form(rrule="FREQ=WEEKLY;COUNT=10"))
+    row = conn.execute("SELECT classification, total_days FROM events").fetchone()
+    assert tuple(row) == ("Self-assessable", 10)
+    assert rules.reclassify(conn, rules.DEFAULT, statuses=None) == []
@@ -0,0 +1,65 @@
+# tests/test_spatial.py
+import app
+from conftest import submit_form
+from modules import spatial
+
+LAT, LON = -26.8030, 153.1400          # Kings Beach
+METRE = 1 / 111195                     # degrees of latitude per metre
+
+
+def _book(client, conn, lat, lon, **overrides):
+    client.post("/submit", data=submit_form(latitude=str(lat), longitude=str(lon), **overrides))
+    return conn.execute("SELECT MAX(id) AS id FROM events").fetchone()["id"]
+
+def _check(client, lat, lon, radius_m=100, **overrides):
+    payload = {"venue": "Bulcock Beach", "start_date": "2031-12-31", "start_time": "19:00", "end_time": "20:00",
+               "latitude": lat, "longitude": lon, "radius_m": radius_m}
+    payload.update(overrides)
+    return client.post("/api/check_conflict", json=payload).get_json()["conflict"]
+
+def test_haversine_and_bbox():
+    assert abs(spatial.haversine_m(LAT, LON, LAT + 20 * METRE, LON) - 20) < 0.1
+    min_lat, max_lat, min_lon, max_lon = spatial.bbox(LAT, LON, 1000)
+    assert min_lat < LAT < max_lat and min_lon < LON < max_lon
+    assert spatial.haversine_m(LAT, LON, LAT, max_lon) > 999.99
+    assert spatial.point("91", "0") is None and spatial.point("", "1") is None
+
+def test_nearby_booking_under_another_name_conflicts(client, conn):
+    event_id = _book(client, conn, LAT, LON)            # Approved, "Kings Beach Park"
+    near = (LAT + 20 * METRE, LON)
+    assert _check(client, *near) is True
+    assert app.has_conflict(app._conflict_form({"venue": "Bulcock Beach", "start_date": "2031-12-31",
+                                                "start_time": "19:00", "end_time": "20:00",
+                                                "latitude": near[0], "longitude": near[1]}), 100)
+    assert _check(client, *near, radius_m=0) is False   # radius off: names differ, so no clash
+    assert _check(client, *near, start_time="21:00", end_time="22:00") is False
+    hits = spatial.nearby(conn, *near, 100)
+    assert [h["id"] for h in hits] == [event_id] and 19 < hits[0]["distance_m"] < 21
+
+def test_distant_booking_does_not_conflict(client, conn):
+    _book(client, conn, LAT, LON)
+    far = (LAT + 2000 * METRE, LON)
+    assert _check(client, *far) is False
+    assert _check(client, *far, radius_m=2500) is True
+    assert spatial.nearby(conn, *far, 100) == []
+
+def test_rtree_follows_moves_and_deletes(client, conn):
+    event_id = _book(client, conn, LAT, LON)
+    far = (LAT + 2000 * METRE, LON + 0.01)
+    conn.execute("UPDATE events SET latitude = ?, longitude = ? WHERE id = ?", (*far, event_id))
+    conn.commit()
+    assert spatial.nearby(conn, LAT, LON, 100) == []
+    assert [h["id"] for h in spatial.nearby(conn, *far, 100)] == [event_id]
+    row = conn.execute("SELECT min_lat, min_lon FROM events_rtree WHERE id = ?", (event_id,)).fetchone()
+    assert abs(row["min_lat"] - far[0]) < 1e-4 and abs(row["min_lon"] - far[1]) < 1e-4
+
+    conn.execute("UPDATE events SET latitude = NULL WHERE id = ?", (event_id,))   # un-geocoded: out of the index
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) AS n FROM events_rtree").fetchone()["n"] == 0
+
+    other = _book(client, conn, LAT, LON, start_date="2032-01-05", end_date="2032-01-05")
+    assert [h["id"] for h in spatial.nearby(conn, LAT, LON, 100, statuses=None)] == [other]
+    conn.execute("DELETE FROM events WHERE id = ?", (other,))
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) AS n FROM events_rtree").fetchone()["n"] == 0
+    assert spatial.nearby(conn, LAT, LON, 100, statuses=None) == []
@@ -0,0 +1,40 @@
+# tests/test_status.py
+from conftest import submit_form
+
+
+def _pending(client, conn, **overrides):
+    client.post("/submit", data=submit_form(alcohol="Yes", **overrides))
+    row = conn.execute("SELECT id, status FROM events ORDER BY id DESC LIMIT 1").fetchone()
+    assert row["status"] == "Pending"
+    return row["id"]
+
+def _status(conn, event_id):
+    return conn.execute("SELECT status FROM events WHERE id = ?", (event_id,)).fetchone()["status"]
+
+def test_bulk_approve_skips_clashes(client, conn):
+    a = _pending(client, conn)
+    b = _pending(client, conn, start_time="20:00", end_time="22:00")
+    c = _pending(client, conn, start_date="2032-01-02", end_date="2032-01-02")
+    resp = client.post("/api/events/status", json={"ids": [a, b, c, 999999], "status": "Approved"}).get_json()
+    assert resp["updated"] == [a, c]
+    skipped = {s["id"]: s for s in resp["skipped"]}
+    assert skipped[b]["status"] == "Pending" and str(a) in skipped[b]["error"]
+    assert skipped[999999]["error"] == "Not found"
+    assert [_status(conn, i) for i in (a, b, c)] == ["Approved", "Pending", "Approved"]
+
+def test_single_approve_checks_conflicts(client, conn):
+    client.post("/submit", data=submit_form())   # Approved
+    clash = _pending(client, conn)
+    resp = client.post(f"/api/event/{clash}/status", json={"status": "Approved"})
+    assert resp.status_code == 400 and "Conflicts" in resp.get_json()["error"]
+    assert client.get(f"/admin/event/{clash}/approve").status_code == 400
+    assert _status(conn, clash) == "Pending"
+
+def test_single_endpoints_follow_transitions(client, conn):
+    event_id = _pending(client, conn)
+    assert client.post(f"/api/event/{event_id}/status", json={"status": "Cancelled"}).status_code == 200
+    resp = client.post(f"/api/event/{event_id}/status", json={"status": "Approved"})
+    assert resp.status_code == 400 and resp.get_json()["error"] == "Cannot change Cancelled to Approved"
+    assert client.get(f"/admin/event/{event_id}/reject").status_code == 400
+    assert client.get("/admin/event/999999/approve").status_code == 404
+    assert _status(conn, event_id) == "Cancelled"
@@ -0,0 +1,61 @@
+# tests/test_summary.py
+from datetime import date, timedelta
+
+from conftest import submit_form
+from modules import summary
+
+FIRST, LAST = "", "9999-12-31"   # every week, including '' for unparseable start dates
+
+
+def _rows(conn):
+    return [tuple(r) for r in summary.groups(conn, FIRST, LAST)]
+
+def _rebuilt(conn):
+    summary.rebuild(conn)
+    return _rows(conn)
+
+def _book(client, conn, **overrides):
+    client.post("/submit", data=submit_form(**overrides))
+    return conn.execute("SELECT MAX(id) AS id FROM events").fetchone()["id"]
+
+def test_triggers_match_rebuild(client, conn):
+    a = _book(client, conn)
+    b = _book(client, conn, alcohol="Yes", start_time="09:00", end_time="10:00")
+    c = _book(client, conn, alcohol="Yes", venue="Mooloolaba Beach", start_date="2032-01-05", end_date="2032-01-05")
+    d = _book(client, conn, event_type="Wedding", venue="Mooloolaba Beach")
+    conn.execute("UPDATE events SET start_date = 'someday', end_date = 'someday' WHERE id = ?", (d,))
+    conn.commit()
+    assert sum(r[-1] for r in _rows(conn)) == 4
+
+    assert client.post(f"/api/event/{b}/status", json={"status": "Approved"}).status_code == 200
+    assert client.post(f"/api/event/{a}/status", json={"status": "Cancelled"}).status_code == 200
+    conn.execute("UPDATE events SET classification = CASE classification WHEN 'Assessable' THEN 'Self-assessable'"
+                 " ELSE 'Assessable' END WHERE id = ?", (c,))
+    conn.execute("UPDATE events SET classification = 'Assessable' WHERE id = ?", (a,))
+    conn.execute("UPDATE events SET location = 'Kings Beach Park' WHERE id = ?", (c,))
+    conn.execute("UPDATE events SET start_date = '2032-01-11' WHERE id = ?", (b,))   # a Sunday: same week as c
+    conn.execute("UPDATE events SET event_name = 'Renamed' WHERE id = ?", (c,))      # not a counted column
+    conn.commit()
+    incremental = _rows(conn)
+    assert incremental == _rebuilt(conn)
+    weeks = {r[0] for r in incremental}
+    assert weeks == {"", "2031-12-29", "2032-01-05"}
+
+    conn.execute("DELETE FROM events WHERE id IN (?, ?)", (a, d))
+    conn.commit()
+    incremental = _rows(conn)
+    assert incremental == _rebuilt(conn)
+    assert [(r[0], r[1], r[4], r[-1]) for r in incremental] == [
+        ("2032-01-05", "Approved", "kings beach park", 1), ("2032-01-05", "Pending", "kings beach park", 1)]
+
+    conn.execute("DELETE FROM events")
+    conn.commit()
+    assert _rows(conn) == []
+
+def test_week_start_matches_sql(conn):
+    day = date(2031, 12, 20)
+    for _ in range(21):
+        sql = conn.execute(f"SELECT {summary._SQLITE_WEEK} AS w FROM (SELECT ? AS start_date)",
+                           (day.isoformat() + "T10:00",)).fetchone()["w"]
+        assert sql == summary.week_start(day).isoformat()
+        day += timedelta(days=1)
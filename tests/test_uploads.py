@@ -0,0 +1,99 @@
+# tests/test_uploads.py
+import io, os, shutil
+
+import pytest
+from werkzeug.exceptions import RequestEntityTooLarge
+
+import app
+from modules import uploads
+
+from conftest import submit_form
+
+PDF = b"%PDF-1.4 insurance certificate " + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def folder(conn):
+    conn.execute("DELETE FROM uploads")
+    conn.commit()
+    shutil.rmtree(app.app.config["UPLOAD_FOLDER"], ignore_errors=True)
+    return app.app.config["UPLOAD_FOLDER"]
+
+def _post(client, content=PDF, **overrides):
+    data = submit_form(**overrides)
+    data["insurance_doc"] = (io.BytesIO(content), "cert.pdf")
+    return client.post("/submit", data=data, content_type="multipart/form-data")
+
+def _files(folder):
+    return sorted(os.path.join(d, f) for d, _, names in os.walk(folder) for f in names)
+
+def _uploads(conn):
+    return conn.execute("SELECT path, ref_count FROM uploads ORDER BY path").fetchall()
+
+def test_same_bytes_are_stored_once(client, conn, folder):
+    _post(client)
+    _post(client, start_date="2032-01-05", end_date="2032-01-05")
+    rows = _uploads(conn)
+    assert [r["ref_count"] for r in rows] == [2]
+    assert _files(folder) == [os.path.join(folder, rows[0]["path"])]
+    with open(_files(folder)[0], "rb") as fh:
+        assert fh.read() == PDF
+    paths = {r["insurance_file"] for r in conn.execute("SELECT insurance_file FROM events").fetchall()}
+    assert paths == {rows[0]["path"]}
+
+def test_rejected_submission_stores_nothing(client, conn, folder):
+    assert _post(client, rrule="FREQ=MONTHLY").status_code == 400
+    assert _uploads(conn) == []
+    assert _files(folder) == []
+
+def test_unreferenced_uploads_are_collected(client, conn, folder):
+    _post(client)
+    _post(client, content=b"site map", start_date="2032-01-05", end_date="2032-01-05")
+    kept, gone = _uploads(conn)[0]["path"], None
+    for r in _uploads(conn):
+        if r["path"] != kept:
+            gone = r["path"]
+    event = conn.execute("SELECT id FROM events WHERE insurance_file = ?", (gone,)).fetchone()
+    conn.execute("DELETE FROM events WHERE id = ?", (event["id"],))
+    conn.commit()
+    assert {r["path"]: r["ref_count"] for r in _uploads(conn)} == {kept: 1, gone: 0}
+    assert uploads.collect(conn, folder) == []                  # inside the grace period
+    assert uploads.collect(conn, folder, grace_seconds=0) == [gone]
+    assert [r["path"] for r in _uploads(conn)] == [kept]
+    assert _files(folder) == [os.path.join(folder, kept)]
+
+def test_replacing_a_file_moves_the_reference(client, conn, folder):
+    _post(client)
+    _post(client, content=b"new certificate", start_date="2032-01-05", end_date="2032-01-05")
+    old, new = (r["insurance_file"] for r in conn.execute("SELECT insurance_file FROM events ORDER BY id").fetchall())
+    conn.execute("UPDATE events SET insurance_file = ?", (new,))
+    conn.commit()
+    assert {r["path"]: r["ref_count"] for r in _uploads(conn)} == {old: 0, new: 2}
+
+def test_oversized_part_is_rejected(folder):
+    upload = uploads.HashingUpload(folder, max_bytes=10)
+    upload.write(b"0123456789")
+    path = upload.path
+    with pytest.raises(RequestEntityTooLarge):
+        upload.write(b"x")
+    assert upload.path is None and not os.path.exists(path)
+
+def test_oversized_upload_gets_413(client, conn, folder, monkeypatch):
+    monkeypatch.setitem(app.app.config, "MAX_UPLOAD_BYTES", 1024)
+    assert _post(client).status_code == 413
+    assert conn.execute("SELECT COUNT(*) AS n FROM events").fetchone()["n"] == 0
+    assert _files(folder) == []
+
+def test_range_and_conditional_get(client, conn, folder):
+    _post(client)
+    path = _uploads(conn)[0]["path"]
+    full = client.get(f"/uploads/{path}")
+    assert full.status_code == 200 and full.data == PDF
+    assert "max-age=31536000" in full.headers["Cache-Control"]
+    part = client.get(f"/uploads/{path}", headers={"Range": "bytes=4-11"})
+    assert part.status_code == 206 and part.data == PDF[4:12]
+    assert part.headers["Content-Range"] == f"bytes 4-11/{len(PDF)}"
+    etag = full.headers["ETag"]
+    assert client.get(f"/uploads/{path}", headers={"If-None-Match": etag}).status_code == 304
+    since = full.headers["Last-Modified"]
+    assert client.get(f"/uploads/{path}", headers={"If-Modified-Since": since}).status_code == 304
@@ -0,0 +1,55 @@
+# tests/test_venues.py
+import random
+
+from modules import venues
+
+
+def _automaton_hits(m, words):
+    hits, node = [], 0
+    for w in words:
+        while node and w not in m._goto[node]:
+            node = m._fail[node]
+        node = m._goto[node].get(w, 0)
+        for out in m._out[node]:
+            hits += out
+    return sorted(hits)
+
+def _naive_hits(m, words):
+    words = tuple(words)
+    hits = []
+    for alias, out in m._aliases:
+        n = len(alias)
+        hits += [h for i in range(len(words) - n + 1) if words[i:i + n] == alias for h in out]
+    return sorted(hits)
+
+def test_automaton_finds_every_alias_occurrence():
+    m = venues.get_matcher()
+    rng = random.Random(5)
+    vocab = sorted({w for alias, _ in m._aliases for w in alias}) + ["the", "party", "at", "on"]
+    for _ in range(300):
+        words = []
+        while len(words) < 12:
+            if rng.random() < 0.3:
+                words += rng.choice(m._aliases)[0]
+            else:
+                words.append(rng.choice(vocab))
+        assert _automaton_hits(m, words) == _naive_hits(m, words)
+
+def test_match_examples():
+    assert venues.match("party at kings beach park on saturday") == "*Kings Beach Park -  Kings Beach"
+    assert venues.match("") is None
+
+def test_precompiled_data_round_trips(tmp_path):
+    path = venues.compile_data(str(tmp_path / "venue_data.json"))
+    loaded, built = venues._load_compiled(path), venues._build()
+    assert loaded["locations"] == built["locations"]
+    for q in ("park", "kings bea", "ba155", "mooloolba", ""):
+        assert loaded["index"].search(q) == built["index"].search(q)
+    for text in ("party at kings beach park", "near BA 155 alex", "cotton tre park", "nothing here"):
+        assert loaded["matcher"].match(text) == built["matcher"].match(text)
+
+def test_stale_precompiled_data_is_ignored(tmp_path):
+    path = tmp_path / "venue_data.json"
+    venues.compile_data(str(path))
+    path.write_text(path.read_text().replace(venues.source_digest(), "0" * 64))
+    assert venues._load_compiled(str(path)) is None